@@ -18,6 +18,27 @@ if not SECRET_KEY:
 
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
+# Pipelined YouTube collector (collectors.iter_youtube_pipelined)
+YOUTUBE_PIPELINED = os.getenv("YOUTUBE_PIPELINED", "False") == "True"
+YOUTUBE_SEARCH_PAGES = int(os.getenv("YOUTUBE_SEARCH_PAGES", "2"))
+YOUTUBE_REQUESTS_PER_SECOND = float(os.getenv("YOUTUBE_REQUESTS_PER_SECOND", "5"))
+
+# Key pool for the quota manager (workflows.quota), comma separated.
+# Falls back to the single YOUTUBE_API_KEY.
+YOUTUBE_API_KEYS = [
+    k.strip() for k in os.getenv("YOUTUBE_API_KEYS", YOUTUBE_API_KEY or "").split(",") if k.strip()
+]
+YOUTUBE_DAILY_QUOTA = int(os.getenv("YOUTUBE_DAILY_QUOTA", "10000"))
+
+# Stats-only refresh (fetch_youtube --refresh-only): (min trending_score,
+# refresh interval in hours), hottest tier first. Rows below every
+# threshold are not refreshed.
+YOUTUBE_REFRESH_TIERS = [
+    (100.0, 1),   # hot: gaining 100+ weighted engagement per hour
+    (5.0, 6),     # warm
+    (0.0, 24),    # cold, including rows without a velocity yet
+]
+
 # ===========================
 # DEBUG & HOSTS
 # ===========================
@@ -52,8 +73,11 @@ INSTALLED_APPS = [
 # MIDDLEWARE
 # ===========================
 MIDDLEWARE = [
+    "workflows.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    # gzip / brotli by Accept-Encoding
+    "workflows.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
 
@@ -67,6 +91,21 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'n8n_popularity.urls'
 
+# Brotli level for CompressionMiddleware: 4 is close to gzip's CPU cost
+# at a smaller size; 11 is only worth it for static assets
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+# ===========================
+# REST FRAMEWORK
+# ===========================
+# orjson for every DRF response (workflows.renderers)
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "workflows.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
+
 # ===========================
 # TEMPLATES
 # ===========================
@@ -108,6 +147,175 @@ else:
         }
     }
 
+# Collectors reserve quota on their own threads while batches are being
+# saved. A DEFERRED transaction that reads first and then writes can't
+# wait for another writer (SQLite returns "database is locked" at once);
+# IMMEDIATE takes the write lock at BEGIN and waits up to `timeout`.
+if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+    DATABASES["default"].setdefault("OPTIONS", {}).update(
+        {"transaction_mode": "IMMEDIATE", "timeout": 20}
+    )
+
+# ===========================
+# CACHE
+# ===========================
+# file (default, shared by every local process), locmem, or redis
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "file")
+
+if CACHE_BACKEND == "redis":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("CACHE_LOCATION", "redis://127.0.0.1:6379/1"),
+        }
+    }
+elif CACHE_BACKEND == "locmem":
+    CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv("CACHE_LOCATION", str(BASE_DIR / ".cache")),
+        }
+    }
+
+# Safety net only; save_items invalidates the leaderboard on every write
+LEADERBOARD_CACHE_TTL = int(os.getenv("LEADERBOARD_CACHE_TTL", "3600"))
+
+# Rows kept per (platform, country) in the /api/insights/ rollup
+INSIGHTS_TOP_N = int(os.getenv("INSIGHTS_TOP_N", "10"))
+
+# Rows per INSERT ... ON CONFLICT statement in tasks.save_items
+SAVE_BATCH_SIZE = int(os.getenv("SAVE_BATCH_SIZE", "500"))
+
+# Item pipeline (workflows.pipeline): titles remembered by the dedupe
+# stage, and pages of items buffered between the pipelined YouTube
+# event loop and the saving thread
+PIPELINE_DEDUPE_WINDOW = int(os.getenv("PIPELINE_DEDUPE_WINDOW", "10000"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "20"))
+
+# Snapshot retention (history.compact_snapshots)
+SNAPSHOT_RAW_HOURS = int(os.getenv("SNAPSHOT_RAW_HOURS", "48"))
+SNAPSHOT_HOURLY_DAYS = int(os.getenv("SNAPSHOT_HOURLY_DAYS", "30"))
+SNAPSHOT_DAILY_DAYS = int(os.getenv("SNAPSHOT_DAILY_DAYS", "365"))
+
+# Retention (workflows.retention, expire_workflows): rows not seen for
+# this many days leave the hot table, either into the ArchivedWorkflow
+# table ("table") or gzipped NDJSON files under WORKFLOW_ARCHIVE_DIR
+# ("ndjson"; include_archived only reads the table). After a successful
+# fetch, at most WORKFLOW_EXPIRE_MAX_BATCHES batches are expired, once
+# per WORKFLOW_EXPIRE_INTERVAL seconds.
+WORKFLOW_RETENTION_DAYS = float(os.getenv("WORKFLOW_RETENTION_DAYS", "60"))
+WORKFLOW_ARCHIVE = os.getenv("WORKFLOW_ARCHIVE", "table")
+WORKFLOW_ARCHIVE_DIR = os.getenv("WORKFLOW_ARCHIVE_DIR", str(BASE_DIR / "archive"))
+WORKFLOW_EXPIRE_BATCH_SIZE = int(os.getenv("WORKFLOW_EXPIRE_BATCH_SIZE", "1000"))
+WORKFLOW_EXPIRE_AFTER_FETCH = os.getenv("WORKFLOW_EXPIRE_AFTER_FETCH", "True") == "True"
+WORKFLOW_EXPIRE_MAX_BATCHES = int(os.getenv("WORKFLOW_EXPIRE_MAX_BATCHES", "10"))
+WORKFLOW_EXPIRE_INTERVAL = int(os.getenv("WORKFLOW_EXPIRE_INTERVAL", "3600"))
+
+# ===========================
+# COLLECTOR HTTP
+# ===========================
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "16"))
+
+# "record" saves every collector response under HTTP_FIXTURES_DIR,
+# "replay" answers from those files instead of the network.
+HTTP_FIXTURES_MODE = os.getenv("HTTP_FIXTURES_MODE", "")
+HTTP_FIXTURES_DIR = os.getenv("HTTP_FIXTURES_DIR", str(BASE_DIR / "fixtures" / "http"))
+
+# Incremental forum crawl (collectors.iter_forum_incremental)
+FORUM_INCREMENTAL = os.getenv("FORUM_INCREMENTAL", "False") == "True"
+FORUM_MAX_PAGES = int(os.getenv("FORUM_MAX_PAGES", "50"))
+
+# ===========================
+# FETCH ORCHESTRATOR
+# ===========================
+FETCH_COUNTRIES = os.getenv("FETCH_COUNTRIES", "US,IN").split(",")
+FETCH_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", "8"))
+FETCH_JOB_DEADLINE = float(os.getenv("FETCH_JOB_DEADLINE", "120"))
+
+# Max jobs of one source in flight at once (YouTube shares one API quota)
+FETCH_SOURCE_CONCURRENCY = {
+    "youtube": int(os.getenv("FETCH_YOUTUBE_CONCURRENCY", "2")),
+    "forum": int(os.getenv("FETCH_FORUM_CONCURRENCY", "2")),
+    "trends": int(os.getenv("FETCH_TRENDS_CONCURRENCY", "4")),
+    "youtube_refresh": int(os.getenv("FETCH_YOUTUBE_CONCURRENCY", "2")),
+}
+
+# ===========================
+# SCHEDULER (workflows.scheduler, run_jobs --schedule)
+# ===========================
+# Per source: (shortest, starting, longest) interval in hours. After each
+# run the interval halves when at least SCHEDULE_HOT_RATE of the items
+# were new or changed, and grows 1.5x at SCHEDULE_COLD_RATE or less.
+SCHEDULE_INTERVALS = {
+    "forum": (0.5, 2, 12),
+    "youtube": (2, 6, 24),
+    "youtube_refresh": (1, 1, 6),
+    "trends": (12, 24, 168),
+}
+SCHEDULE_COUNTRIES = os.getenv("SCHEDULE_COUNTRIES", ",".join(FETCH_COUNTRIES)).split(",")
+SCHEDULE_HOT_RATE = float(os.getenv("SCHEDULE_HOT_RATE", "0.2"))
+SCHEDULE_COLD_RATE = float(os.getenv("SCHEDULE_COLD_RATE", "0.02"))
+# Each next run lands within ± this fraction of the interval
+SCHEDULE_JITTER = float(os.getenv("SCHEDULE_JITTER", "0.1"))
+
+# ===========================
+# JOB QUEUE (workflows.jobs, run_jobs worker)
+# ===========================
+# Run triggered jobs inline instead of queueing (tests / single process)
+JOBS_EAGER = os.getenv("JOBS_EAGER", "False") == "True"
+# A running job older than this is assumed dead and marked failed
+JOBS_STALE_AFTER = int(os.getenv("JOBS_STALE_AFTER", "1800"))
+
+# ===========================
+# SCORING (workflows.scoring)
+# ===========================
+# Raw per-platform score = sum(metric * weight); each platform is then
+# normalized on its own distribution (zscore | percentile | log) to 0..100.
+SCORING = {
+    "method": os.getenv("SCORING_METHOD", "percentile"),
+    "metric_weights": {
+        "YouTube": {"views": 0.6, "likes": 3, "comments": 8},
+        "Forum": {"likes": 4, "replies": 2, "views": 0.1},
+        "GoogleTrends": {"trend_score": 1},
+    },
+    "platform_weights": {"YouTube": 1.0, "Forum": 1.0, "GoogleTrends": 1.0},
+}
+
+# Trending velocity (workflows.trending): weight per counter gained per hour
+TRENDING_WEIGHTS = {"views": 1, "likes": 5, "comments": 10, "replies": 10}
+TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", "24"))
+
+# Entity resolution (workflows.resolution): titles with token Jaccard
+# >= threshold are merged. MinHash uses bands * rows permutations; with
+# 16 x 4 the LSH candidate threshold sits near 0.5.
+RESOLUTION_THRESHOLD = float(os.getenv("RESOLUTION_THRESHOLD", "0.6"))
+RESOLUTION_BANDS = int(os.getenv("RESOLUTION_BANDS", "16"))
+RESOLUTION_ROWS = int(os.getenv("RESOLUTION_ROWS", "4"))
+
+# ===========================
+# LOGGING
+# ===========================
+# workflows.stages: one JSON object per pipeline stage (collect, save,
+# score; per-request "http" lines at DEBUG)
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {"message": {"format": "%(message)s"}},
+    "handlers": {"stages": {"class": "logging.StreamHandler", "formatter": "message"}},
+    "loggers": {
+        "workflows.stages": {
+            "handlers": ["stages"],
+            "level": os.getenv("STAGE_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
+
 # ===========================
 # STATIC FILES
 # ===========================
@@ -1,8 +1,19 @@
 from django.contrib import admin
-from django.urls import path
+from django.urls import path, re_path
 from django.http import JsonResponse
 
-from workflows.views import list_workflows, trigger_fetch, cron_status
+from workflows.views import (
+    list_workflows,
+    export_workflows,
+    search_workflows,
+    workflow_history,
+    list_canonical_workflows,
+    workflow_insights,
+    trigger_fetch,
+    cron_status,
+    prometheus_metrics,
+    job_status,
+)
 
 
 def home(request):
@@ -16,8 +27,15 @@ def health(request):
 urlpatterns = [
     path("", home),
     path("health/", health),
+    path("metrics", prometheus_metrics),
     path("admin/", admin.site.urls),
     path("api/workflows/", list_workflows),
+    path("api/workflows/export/", export_workflows),
+    re_path(r"^api/workflows/search/?$", search_workflows),
+    path("api/workflows/<int:pk>/history/", workflow_history),
+    path("api/canonical/", list_canonical_workflows),
+    path("api/insights/", workflow_insights),
     path("api/status/", cron_status),
+    path("api/jobs/<int:pk>/", job_status),
     path("trigger/<str:source>/<str:country>/", trigger_fetch),
 ]
@@ -1,179 +1,336 @@
-import requests
+import asyncio
+import queue
+import re
+import threading
 import time
+from datetime import timedelta
+from functools import partial
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
+from . import http_client
+from .models import ForumCursor, Workflow
+from .pipeline import Collector, register
+from .quota import IDS_PER_VIDEOS_CALL, QUOTA_COST, KeyPool, plan_searches
 
-# =====================================================================
-# 1. YOUTUBE COLLECTOR — RENDER-SAFE, FAIL-FAST, NO WORKER TIMEOUT
-# =====================================================================
 
-def collect_youtube_for_country(country_code="US", pause=0.4):
-    """
-    Render-safe YouTube collector:
-    - part=id search (cheap)
-    - strict fail-fast if 403/429 (no retry loops)
-    - small keyword set
-    - worker-safe execution time (<6 sec)
-    """
+YOUTUBE_SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
+YOUTUBE_STATS_URL = "https://www.googleapis.com/youtube/v3/videos"
 
-    API = settings.YOUTUBE_API_KEY
-    if not API:
-        print("❌ Missing YouTube API key.")
-        return []
+YOUTUBE_KEYWORDS = [
+    "n8n automation",
+    "n8n workflow",
+    "n8n gmail automation",
+    "n8n google sheets",
+]
 
-    SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
-    STATS_URL  = "https://www.googleapis.com/youtube/v3/videos"
+YOUTUBE_QUOTA_COST = QUOTA_COST
+YOUTUBE_STATS_BATCH = IDS_PER_VIDEOS_CALL
 
-    KEYWORDS = [
-        "n8n automation",
-        "n8n workflow",
-        "n8n gmail automation",
-        "n8n google sheets",
-    ]
+YOUTUBE_VIDEO_ID = re.compile(r"[?&]v=([\w-]{11})")
+
+
+def _youtube_metrics(stats):
+    """videos.list statistics -> (metrics, score)."""
+    views = int(stats.get("viewCount", 0))
+    likes = int(stats.get("likeCount", 0))
+    comments = int(stats.get("commentCount", 0))
+
+    like_ratio = likes / views if views else 0
+    comment_ratio = comments / views if views else 0
+
+    score = round((views * 0.6) + (likes * 3) + (comments * 8), 2)
 
+    metrics = {
+        "views": views,
+        "likes": likes,
+        "comments": comments,
+        "like_to_view_ratio": like_ratio,
+        "comment_to_view_ratio": comment_ratio,
+    }
+    return metrics, score
+
+
+def _youtube_items(response, country_code):
+    """Turn a videos.list (statistics,snippet) response into collector items."""
     results = []
-    video_ids = set()
+    for item in response.get("items", []):
+        title = item["snippet"]["title"]
+        vid = item["id"]
+        url = f"https://www.youtube.com/watch?v={vid}"
+        metrics, score = _youtube_metrics(item.get("statistics", {}))
+
+        results.append({
+            "workflow": title,
+            "source_url": url,
+            "country": country_code,
+            "platform": "YouTube",
+            "metrics": metrics,
+            "score": score,
+        })
+    return results
 
-    # --------------------------
-    # SAFE WRAPPER
-    # --------------------------
-    def yt_fail_fast(url, params):
-        r = requests.get(url, params=params, timeout=8)
 
-        # If API rejects → immediately stop
-        if r.status_code in (403, 429):
-            print("❌ API rejected key — stopping YouTube collector instantly.")
+def youtube_video_id(url):
+    m = YOUTUBE_VIDEO_ID.search(url or "")
+    return m.group(1) if m else None
+
+
+def known_video_ids(country_code, exclude=()):
+    """Stored YouTube ids for a country, least recently seen first."""
+    urls = (
+        Workflow.objects.filter(platform="YouTube", country=country_code)
+        .order_by("last_seen")
+        .values_list("source_url", flat=True)
+    )
+    ids = []
+    for url in urls.iterator(chunk_size=5000):
+        vid = youtube_video_id(url)
+        if vid and vid not in exclude:
+            ids.append(vid)
+    return ids
+
+
+def youtube_call(pool, endpoint, url, params):
+    """
+    One quota-accounted YouTube request.
+
+    The key comes from `pool`; a 403 (quota used up, key disabled) takes
+    the key out of rotation for the day and a 429 skips it for this call,
+    then the request is retried with the next key. Returns parsed JSON,
+    or None when no key can afford the call or the call fails.
+    """
+    tried = set()
+    while True:
+        key = pool.reserve(endpoint, skip=tried)
+        if key is None:
             return None
+        tried.add(key)
+
+        r = http_client.get(url, params={**params, "key": key}, timeout=8)
+        if r.status_code in (403, 429):
+            print(f"⚠️ YouTube key …{key[-4:]} rejected ({r.status_code}), rotating.")
+            if r.status_code == 403:
+                pool.exhaust(key)
+            continue
 
         if r.status_code != 200:
             print("❌ YouTube error:", r.status_code)
             return None
-
         return r.json()
 
-    # --------------------------
-    # (1) SEARCH video IDs cheaply
-    # --------------------------
-    for kw in KEYWORDS:
-        params = {
-            "key": API,
-            "part": "id",         # Cheap search
-            "q": kw,
-            "type": "video",
-            "maxResults": 15,
-            "regionCode": country_code,
-        }
 
-        res = yt_fail_fast(SEARCH_URL, params)
-        if not res:
-            return []  # fail-fast: no crash
+def iter_youtube_stats(pool, video_ids, country_code):
+    """videos.list for the given ids, 50 per call, until the budget runs out."""
+    for i in range(0, len(video_ids), YOUTUBE_STATS_BATCH):
+        res = youtube_call(pool, "videos", YOUTUBE_STATS_URL, {
+            "part": "statistics,snippet",
+            "id": ",".join(video_ids[i:i + YOUTUBE_STATS_BATCH]),
+        })
+        if res is None:
+            return
+        yield from _youtube_items(res, country_code)
 
-        for it in res.get("items", []):
-            vid = it["id"].get("videoId")
-            if vid:
-                video_ids.add(vid)
 
-        time.sleep(pause)
+def _iter_known_refresh(pool, country_code, planned, seen):
+    """Degraded mode: stats of stored ids when not every search fits."""
+    if planned >= len(YOUTUBE_KEYWORDS):
+        return
+    known = known_video_ids(country_code, exclude=seen)
+    print(
+        f"⚠️ YouTube {country_code}: budget covers {planned}/{len(YOUTUBE_KEYWORDS)} "
+        f"searches, refreshing {len(known)} known videos instead."
+    )
+    yield from iter_youtube_stats(pool, known, country_code)
 
-    video_ids = list(video_ids)[:40]  # Hard cap → Render safe
 
-    # --------------------------
-    # (2) Batch Stats Lookup
-    # --------------------------
-    if not video_ids:
-        return []
+# =====================================================================
+# 1. YOUTUBE COLLECTOR — QUOTA-BUDGETED
+# =====================================================================
 
-    params = {
-        "key": API,
-        "part": "statistics,snippet",
-        "id": ",".join(video_ids),
-    }
+def iter_youtube(country_code="US", pause=0.4, pool=None):
+    """
+    Sequential YouTube collector (generator):
+    - keys come from a KeyPool (YOUTUBE_API_KEYS) with per-key daily
+      accounting; rejected keys are rotated out instead of ending the run
+    - keyword searches are planned to fit today's remaining budget
+      (100 units each + 1 for their stats lookup)
+    - stats looked up 50 ids per call (videos.list maximum)
+    - if not every search fits, the rest of the budget refreshes stats of
+      ids already stored for this country (1 unit per 50 videos)
+    """
+    pool = pool or KeyPool()
+    if not pool.keys:
+        print("❌ Missing YouTube API key.")
+        return
 
-    stats = yt_fail_fast(STATS_URL, params)
-    if not stats:
-        return []
+    plan = plan_searches(YOUTUBE_KEYWORDS, [country_code], pool.remaining())
+    video_ids = []
+    seen = set()
 
-    for item in stats.get("items", []):
-        title = item["snippet"]["title"]
-        vid = item["id"]
-        url = f"https://www.youtube.com/watch?v={vid}"
-
-        stats = item.get("statistics", {})
-        views = int(stats.get("viewCount", 0))
-        likes = int(stats.get("likeCount", 0))
-        comments = int(stats.get("commentCount", 0))
+    for kw, region in plan:
+        res = youtube_call(pool, "search", YOUTUBE_SEARCH_URL, {
+            "part": "id",
+            "q": kw,
+            "type": "video",
+            "maxResults": 50,  # same 100 units as 15 results
+            "regionCode": region,
+        })
+        if res is None:
+            break
 
-        like_ratio = likes / views if views else 0
-        comment_ratio = comments / views if views else 0
+        for it in res.get("items", []):
+            vid = it["id"].get("videoId")
+            if vid and vid not in seen:
+                seen.add(vid)
+                video_ids.append(vid)
 
-        score = round((views * 0.6) + (likes * 3) + (comments * 8), 2)
+        time.sleep(pause)
 
-        results.append({
-            "workflow": title,
-            "source_url": url,
-            "country": country_code,
-            "platform": "YouTube",
-            "metrics": {
-                "views": views,
-                "likes": likes,
-                "comments": comments,
-                "like_to_view_ratio": like_ratio,
-                "comment_to_view_ratio": comment_ratio,
-            },
-            "score": score,
-        })
+    yield from iter_youtube_stats(pool, video_ids, country_code)
+    yield from _iter_known_refresh(pool, country_code, len(plan), seen)
 
-    return results
+    print(f"YouTube {country_code}: quota {pool.spent} units ({pool.remaining()} left today)")
 
 
 # =====================================================================
-# 2. FORUM COLLECTOR — RENDER-SAFE, SINGLE CALL
+# 2. FORUM COLLECTOR — SINGLE CALL OR INCREMENTAL CRAWL
 # =====================================================================
 
-def collect_forum(country="US"):
+def iter_forum(country="US"):
     url = "https://community.n8n.io/latest.json"
-    results = []
 
     try:
-        r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
+        r = http_client.conditional_get(url, scope=f"forum:{country}", timeout=10)
+        if r.status_code == 304:
+            print(f"Forum {country}: latest.json not modified, skipping.")
+            return
         r.raise_for_status()
         topics = r.json().get("topic_list", {}).get("topics", [])
     except Exception as e:
         print("Forum collector error:", e)
-        return []
-
-    topics = topics[:40]  # Hard cap to avoid Render 50ms CPU kill
+        return
 
     for t in topics:
-        title = t.get("title", "Untitled")
-        topic_id = t.get("id")
-        likes = t.get("like_count", 0)
-        replies = t.get("reply_count", 0)
-        views = t.get("views", 0)
-
-        score = (likes * 4) + (replies * 2) + (views * 0.1)
+        yield _forum_item(t, country)
+
+    return partial(http_client.store_validators, [r])
+
+
+def _forum_item(t, country):
+    title = t.get("title", "Untitled")
+    topic_id = t.get("id")
+    likes = t.get("like_count", 0)
+    replies = t.get("reply_count", 0)
+    views = t.get("views", 0)
+
+    score = (likes * 4) + (replies * 2) + (views * 0.1)
+
+    return {
+        "workflow": title,
+        "source_url": f"https://community.n8n.io/t/{topic_id}",
+        "platform": "Forum",
+        "country": country,
+        "metrics": {
+            "likes": likes,
+            "replies": replies,
+            "views": views,
+        },
+        "score": round(score, 2),
+    }
 
-        results.append({
-            "workflow": title,
-            "source_url": f"https://community.n8n.io/t/{topic_id}",
-            "platform": "Forum",
-            "country": country,
-            "metrics": {
-                "likes": likes,
-                "replies": replies,
-                "views": views,
-            },
-            "score": round(score, 2),
-        })
 
-    return results
+def iter_forum_incremental(country="US", max_pages=None):
+    """
+    Incremental forum crawl over latest.json?page=N (generator).
+
+    Discourse orders /latest by bumped_at desc, so we page until we reach a
+    topic at or below the stored (bumped_at, topic id) high-water mark for
+    this country and emit only topics bumped since then. Pinned topics sit
+    on top regardless of activity, so they never end the crawl.
+
+    The returned checkpoint moves the mark and stores the page validators
+    once the pipeline has saved every item. It is only returned when the
+    walk covers everything since the mark (mark reached, a 304, or no
+    more pages), or on the first crawl, where there is no mark and the
+    max_pages cutoff just bounds the backfill. A fetch error, or a cutoff
+    before an existing mark, returns nothing, so the next run walks the
+    same pages again.
+    """
+    url = "https://community.n8n.io/latest.json"
+    max_pages = max_pages or settings.FORUM_MAX_PAGES
+
+    cursor, _ = ForumCursor.objects.get_or_create(country=country)
+    mark = cursor.bumped_at and (cursor.bumped_at, cursor.topic_id)
+    newest = mark
+
+    changed = 0
+    fetched = []
+    complete = failed = False
+    for page in range(max_pages):
+        try:
+            r = http_client.conditional_get(
+                url,
+                params={"page": page} if page else None,
+                scope=f"forum:{country}",
+                timeout=10,
+            )
+            if r.status_code == 304:
+                complete = True  # this page is exactly what we saw last time
+                break
+            r.raise_for_status()
+            topic_list = r.json().get("topic_list", {})
+            fetched.append(r)
+        except Exception as e:
+            print("Forum collector error:", e)
+            failed = True
+            break
+
+        topics = topic_list.get("topics", [])
+        reached_mark = False
+        for t in topics:
+            bumped_at = parse_datetime(t.get("bumped_at") or "")
+            if bumped_at is None:
+                continue
+            key = (bumped_at, t.get("id") or 0)
+
+            if mark and key <= mark:
+                if not t.get("pinned"):
+                    reached_mark = True
+                continue
+
+            changed += 1
+            yield _forum_item(t, country)
+            if newest is None or key > newest:
+                newest = key
+
+        if reached_mark or not topics or not topic_list.get("more_topics_url"):
+            complete = True
+            break
+
+    print(f"Forum {country}: {changed} changed topics over {page + 1} page(s)")
+    if failed or not (complete or mark is None):
+        print(f"Forum {country}: crawl stopped early, keeping the previous cursor")
+        return None
+
+    def checkpoint():
+        http_client.store_validators(fetched)
+        if newest and newest != mark:
+            cursor.bumped_at, cursor.topic_id = newest
+            cursor.save(update_fields=["bumped_at", "topic_id", "updated_at"])
+
+    return checkpoint
 
 
 # =====================================================================
 # 3. GOOGLE TRENDS — OFFLINE FALLBACK (RELIABLE)
 # =====================================================================
 
-def collect_trends(country="US"):
+def iter_trends(country="US"):
     keywords = [
         "n8n workflow",
         "n8n automation",
@@ -198,11 +355,10 @@ def collect_trends(country="US"):
 
     multiplier = 1.2 if country == "IN" else 1.0
 
-    results = []
     for kw in keywords:
         score = round(base[kw] * multiplier, 2)
 
-        results.append({
+        yield {
             "workflow": kw,
             "platform": "GoogleTrends",
             "country": country,
@@ -211,6 +367,360 @@ def collect_trends(country="US"):
                 "trend_score": score,
             },
             "score": score,
+        }
+
+
+# =====================================================================
+# 4. YOUTUBE COLLECTOR — PIPELINED (ASYNCIO)
+# =====================================================================
+
+class TokenBucket:
+    """
+    asyncio token bucket: `rate` requests per second, bursts up to `capacity`.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self.tokens = self.capacity
+        self.updated = None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            while True:
+                now = loop.time()
+                if self.updated is not None:
+                    self.tokens = min(
+                        self.capacity, self.tokens + (now - self.updated) * self.rate
+                    )
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class QuotaTracker:
+    """
+    Per-request YouTube quota accounting.
+    Every call is recorded as (endpoint, units, http status).
+    """
+
+    def __init__(self):
+        self.requests = []
+
+    def record(self, endpoint, status):
+        self.requests.append((endpoint, YOUTUBE_QUOTA_COST[endpoint], status))
+
+    @property
+    def units(self):
+        return sum(units for _, units, _ in self.requests)
+
+    def summary(self):
+        calls = {}
+        for endpoint, _, _ in self.requests:
+            calls[endpoint] = calls.get(endpoint, 0) + 1
+        per_endpoint = ", ".join(f"{k}={v}" for k, v in sorted(calls.items()))
+        return f"{self.units} units over {len(self.requests)} requests ({per_endpoint})"
+
+
+async def _collect_youtube_pipelined(country_code, pool, quota, keywords, max_pages, rate,
+                                    emit, cancelled):
+    """
+    Runs every search and stats lookup; each videos.list page of items is
+    handed to `emit` (a coroutine). Returns the set of video ids seen.
+    Setting `cancelled` (threading.Event) stops issuing requests.
+    """
+    bucket = TokenBucket(rate)
+    stopped = asyncio.Event()
+
+    seen = set()
+    pending = []
+    stats_tasks = []
+
+    # The pool talks to the DB; keep it on one thread, off the event loop.
+    reserve = sync_to_async(pool.reserve, thread_sensitive=True)
+    exhaust = sync_to_async(pool.exhaust, thread_sensitive=True)
+
+    async def call(endpoint, url, params):
+        tried = set()
+        while not (stopped.is_set() or cancelled.is_set()):
+            await bucket.acquire()
+            key = await reserve(endpoint, skip=tried)
+            if key is None:
+                # Budget gone: keep what we already have.
+                stopped.set()
+                return None
+            tried.add(key)
+
+            r = await asyncio.to_thread(
+                http_client.get, url, params={**params, "key": key}, timeout=8
+            )
+            quota.record(endpoint, r.status_code)
+
+            if r.status_code in (403, 429):
+                print(f"⚠️ YouTube key …{key[-4:]} rejected ({r.status_code}), rotating.")
+                if r.status_code == 403:
+                    await exhaust(key)
+                continue
+            if r.status_code != 200:
+                print("❌ YouTube error:", r.status_code)
+                return None
+            return r.json()
+        return None
+
+    async def lookup_stats(batch):
+        res = await call("videos", YOUTUBE_STATS_URL, {
+            "part": "statistics,snippet",
+            "id": ",".join(batch),
+        })
+        if res:
+            await emit(_youtube_items(res, country_code))
+
+    def flush(force=False):
+        while len(pending) >= YOUTUBE_STATS_BATCH or (force and pending):
+            batch = pending[:YOUTUBE_STATS_BATCH]
+            del pending[:YOUTUBE_STATS_BATCH]
+            stats_tasks.append(asyncio.create_task(lookup_stats(batch)))
+
+    async def search(kw):
+        page_token = None
+        for _ in range(max_pages):
+            params = {
+                "part": "id",
+                "q": kw,
+                "type": "video",
+                "maxResults": 50,  # same 100 units as 15 results
+                "regionCode": country_code,
+            }
+            if page_token:
+                params["pageToken"] = page_token
+
+            res = await call("search", YOUTUBE_SEARCH_URL, params)
+            if not res:
+                return
+
+            for it in res.get("items", []):
+                vid = it["id"].get("videoId")
+                if vid and vid not in seen:
+                    seen.add(vid)
+                    pending.append(vid)
+
+            # Start stats lookups while other searches are still paging.
+            flush()
+
+            page_token = res.get("nextPageToken")
+            if not page_token:
+                return
+
+    await asyncio.gather(*(search(kw) for kw in keywords))
+    flush(force=True)
+    await asyncio.gather(*stats_tasks)
+    return seen
+
+
+def iter_youtube_pipelined(country_code="US", max_pages=None, rate=None, pool=None):
+    """
+    Pipelined YouTube collector (generator):
+    - all keyword searches run concurrently under a token bucket
+    - each search pages with pageToken, ids are deduped as they arrive
+    - videos.list lookups go out in chunks of 50 while searches continue
+    - the event loop runs on its own thread and hands pages of items over
+      a bounded queue (PIPELINE_QUEUE_SIZE), so a slow consumer pauses
+      the lookups instead of piling items up
+    - keys, budget planning and degraded known-id refresh work as in
+      iter_youtube; quota use is also printed per request
+    """
+    pool = pool or KeyPool()
+    if not pool.keys:
+        print("❌ Missing YouTube API key.")
+        return
+
+    max_pages = max_pages or settings.YOUTUBE_SEARCH_PAGES
+    plan = plan_searches(YOUTUBE_KEYWORDS, [country_code], pool.remaining(), pages=max_pages)
+
+    quota = QuotaTracker()
+    pages = queue.Queue(maxsize=settings.PIPELINE_QUEUE_SIZE)
+    cancelled = threading.Event()
+    done = object()
+    outcome = {}
+
+    async def emit(items):
+        if not cancelled.is_set():
+            await asyncio.to_thread(pages.put, items)
+
+    def produce():
+        try:
+            outcome["seen"] = asyncio.run(_collect_youtube_pipelined(
+                country_code,
+                pool,
+                quota,
+                [kw for kw, _ in plan],
+                max_pages,
+                rate or settings.YOUTUBE_REQUESTS_PER_SECOND,
+                emit,
+                cancelled,
+            ))
+        except Exception as exc:
+            outcome["error"] = exc
+        finally:
+            pages.put(done)
+
+    producer = threading.Thread(target=produce, name=f"youtube-{country_code}", daemon=True)
+    producer.start()
+    try:
+        while (items := pages.get()) is not done:
+            yield from items
+    finally:
+        # Consumer gone early (deadline, error): unblock and stop the producer.
+        cancelled.set()
+        while producer.is_alive():
+            try:
+                pages.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+    if "error" in outcome:
+        raise outcome["error"]
+
+    yield from _iter_known_refresh(pool, country_code, len(plan), outcome["seen"])
+
+    print(
+        f"YouTube {country_code}: pipelined {quota.summary()}, "
+        f"{pool.spent} units charged ({pool.remaining()} left today)"
+    )
+
+
+# =====================================================================
+# 5. YOUTUBE STATS REFRESH — KNOWN IDS ONLY
+# =====================================================================
+
+def due_for_refresh(country_code, now=None):
+    """
+    Stored YouTube rows whose refresh tier says they are due, hottest
+    first. A row's tier is the first YOUTUBE_REFRESH_TIERS entry whose
+    trending_score threshold it reaches; it is due once last_seen is
+    older than that tier's interval.
+    """
+    now = now or timezone.now()
+    due = Q(last_seen__isnull=True)
+    upper = None
+    for threshold, hours in settings.YOUTUBE_REFRESH_TIERS:
+        tier = Q(trending_score__gte=threshold)
+        if upper is not None:
+            tier &= Q(trending_score__lt=upper)
+        due |= tier & Q(last_seen__lt=now - timedelta(hours=hours))
+        upper = threshold
+
+    return (
+        Workflow.objects.filter(platform="YouTube", country=country_code)
+        .filter(due)
+        .order_by("-trending_score", "last_seen")
+    )
+
+
+def iter_youtube_refresh(country_code="US", pool=None, now=None):
+    """
+    Stats-only YouTube refresh (generator): no searches. Ids come from the source_url
+    of rows due per due_for_refresh, 50 per videos.list?part=statistics
+    call (1 unit). Items keep the stored title, so save_items only
+    updates metrics, score and last_seen.
+    """
+    pool = pool or KeyPool()
+    if not pool.keys:
+        print("❌ Missing YouTube API key.")
+        return
+
+    titles = {}
+    rows = due_for_refresh(country_code, now).values_list("workflow", "source_url")
+    for title, url in rows.iterator(chunk_size=5000):
+        vid = youtube_video_id(url)
+        if vid:
+            titles.setdefault(vid, []).append(title)
+
+    video_ids = list(titles)
+    refreshed = 0
+    for i in range(0, len(video_ids), YOUTUBE_STATS_BATCH):
+        res = youtube_call(pool, "videos", YOUTUBE_STATS_URL, {
+            "part": "statistics",
+            "id": ",".join(video_ids[i:i + YOUTUBE_STATS_BATCH]),
         })
+        if res is None:
+            break
+
+        for item in res.get("items", []):
+            metrics, score = _youtube_metrics(item.get("statistics", {}))
+            refreshed += 1
+            for title in titles.get(item["id"], ()):
+                yield {
+                    "workflow": title,
+                    "source_url": f"https://www.youtube.com/watch?v={item['id']}",
+                    "country": country_code,
+                    "platform": "YouTube",
+                    "metrics": metrics,
+                    "score": score,
+                }
+
+    print(
+        f"YouTube {country_code}: refreshed {refreshed} of {len(video_ids)} due videos, "
+        f"quota {pool.spent} units ({pool.remaining()} left today)"
+    )
 
-    return results
+
+# =====================================================================
+# 6. REGISTERED COLLECTORS (workflows.pipeline.REGISTRY)
+# =====================================================================
+
+@register
+class YouTubeCollector(Collector):
+    """
+    Keyword search + stats; pipelined=True/False overrides YOUTUBE_PIPELINED,
+    max_pages/rate tune the pipelined collector.
+    """
+
+    name = "youtube"
+    platform = "YouTube"
+
+    def iter_items(self):
+        if self.options.get("pipelined", settings.YOUTUBE_PIPELINED):
+            return iter_youtube_pipelined(
+                self.country, self.options.get("max_pages"), self.options.get("rate")
+            )
+        return iter_youtube(self.country)
+
+
+@register
+class YouTubeRefreshCollector(Collector):
+    name = "youtube_refresh"
+    platform = "YouTube"
+
+    def iter_items(self):
+        return iter_youtube_refresh(self.country)
+
+
+@register
+class ForumCollector(Collector):
+    """
+    latest.json; incremental=True/False overrides FORUM_INCREMENTAL,
+    max_pages caps the incremental walk.
+    """
+
+    name = "forum"
+    platform = "Forum"
+
+    def iter_items(self):
+        if self.options.get("incremental", settings.FORUM_INCREMENTAL):
+            return iter_forum_incremental(self.country, self.options.get("max_pages"))
+        return iter_forum(self.country)
+
+
+@register
+class TrendsCollector(Collector):
+    name = "trends"
+    platform = "GoogleTrends"
+
+    def iter_items(self):
+        return iter_trends(self.country)
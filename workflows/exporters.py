@@ -0,0 +1,132 @@
+import csv
+import io
+import json
+import zlib
+
+from .leaderboard import archived_workflows, filtered_workflows
+from .models import ArchivedWorkflow, Workflow
+from .renderers import dumps
+from .serializers import INTERNAL_FIELDS
+
+
+_EXPORT_COLUMNS = [f for f in Workflow._meta.concrete_fields if f.name not in INTERNAL_FIELDS]
+EXPORT_FIELDS = [f.name for f in _EXPORT_COLUMNS]
+EXPORT_FORMATS = ("ndjson", "csv", "parquet")
+
+# Flattened to a JSON string in the tabular formats
+JSON_FIELDS = [f.name for f in _EXPORT_COLUMNS if f.get_internal_type() == "JSONField"]
+
+
+def _flatten(row):
+    for name in JSON_FIELDS:
+        row[name] = json.dumps(row[name], ensure_ascii=False)
+    return row
+
+
+# Archived rows carry their hot-table id as original_id and lack the rest
+ARCHIVED_EXPORT_FIELDS = [
+    f for f in EXPORT_FIELDS if f != "id" and hasattr(ArchivedWorkflow, f)
+]
+
+
+def export_rows(platform=None, country=None, chunk_size=2000, include_archived=False):
+    """
+    Yield every matching workflow as a dict, `chunk_size` rows per DB fetch.
+    Ordered by primary key so the scan never needs a sort. With
+    include_archived, expired rows follow (id = their old id, columns the
+    archive doesn't keep are None).
+    """
+    qs = (
+        filtered_workflows(platform, country)
+        .order_by("id")
+        .values_list(*EXPORT_FIELDS)
+    )
+    for values in qs.iterator(chunk_size=chunk_size):
+        yield dict(zip(EXPORT_FIELDS, values))
+
+    if not include_archived:
+        return
+    archived = (
+        archived_workflows(platform, country)
+        .order_by("id")
+        .values_list("original_id", *ARCHIVED_EXPORT_FIELDS)
+    )
+    for original_id, *values in archived.iterator(chunk_size=chunk_size):
+        row = dict.fromkeys(EXPORT_FIELDS)
+        row.update(zip(ARCHIVED_EXPORT_FIELDS, values), id=original_id)
+        yield row
+
+
+def iter_ndjson(rows):
+    for row in rows:
+        yield dumps(row).decode("utf-8") + "\n"
+
+
+def iter_csv(rows):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        row = _flatten(row)
+        writer.writerow([row[name] for name in EXPORT_FIELDS])
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+
+
+def gzip_stream(chunks, min_flush=64 * 1024):
+    """
+    gzip a stream of str chunks, emitting compressed blocks of roughly
+    `min_flush` input bytes so memory stays constant.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31 = gzip container
+    pending = 0
+    for chunk in chunks:
+        data = chunk.encode("utf-8")
+        pending += len(data)
+        out = compressor.compress(data)
+        if pending >= min_flush:
+            out += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def _arrow_type(pa, field):
+    internal = field.get_internal_type()
+    if internal.endswith("AutoField") or "IntegerField" in internal or internal == "ForeignKey":
+        return pa.int64()
+    if internal == "FloatField":
+        return pa.float64()
+    if internal == "DateTimeField":
+        return pa.timestamp("us", tz="UTC")
+    return pa.string()
+
+
+def write_parquet(rows, path, batch_size=10000):
+    """
+    Write rows to a Parquet file one row group per `batch_size` rows.
+    Needs pyarrow, which is optional.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow") from exc
+
+    schema = pa.schema([(f.name, _arrow_type(pa, f)) for f in _EXPORT_COLUMNS])
+
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        batch = []
+        for row in rows:
+            batch.append(_flatten(row))
+            if len(batch) >= batch_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            count += len(batch)
+    return count
@@ -0,0 +1,116 @@
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Max
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from .models import WorkflowSnapshot
+
+
+SNAPSHOT_COUNTERS = ("views", "likes", "comments", "replies")
+
+
+def _as_int(value):
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def build_snapshot(workflow_id, metrics, score, captured_at):
+    return WorkflowSnapshot(
+        workflow_id=workflow_id,
+        captured_at=captured_at,
+        score=score or 0,
+        **{name: _as_int(metrics.get(name)) for name in SNAPSHOT_COUNTERS},
+    )
+
+
+# =====================================================================
+# RETENTION / DOWNSAMPLING
+# =====================================================================
+
+def _floor(dt, resolution):
+    dt = dt.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+    if resolution == WorkflowSnapshot.DAILY:
+        dt = dt.replace(hour=0)
+    return dt
+
+
+def _rollup(source, target, older_than, batch_size):
+    """
+    Collapse `source` rows older than `older_than` into one `target` row
+    per (workflow, bucket). The cutoff is floored to a bucket boundary, so
+    a bucket is only ever rolled up once and never straddles two runs.
+
+    Counters are cumulative, so the bucket keeps their max; score is averaged.
+    """
+    trunc = TruncHour if target == WorkflowSnapshot.HOURLY else TruncDay
+    cutoff = _floor(older_than, target)
+
+    expired = WorkflowSnapshot.objects.filter(resolution=source, captured_at__lt=cutoff)
+    workflow_ids = list(
+        expired.order_by("workflow_id").values_list("workflow_id", flat=True).distinct()
+    )
+
+    created = deleted = 0
+    for i in range(0, len(workflow_ids), batch_size):
+        batch = expired.filter(workflow_id__in=workflow_ids[i:i + batch_size])
+        with transaction.atomic():
+            buckets = (
+                batch.annotate(bucket=trunc("captured_at", tzinfo=dt_timezone.utc))
+                .values("workflow_id", "bucket")
+                .annotate(
+                    score_avg=Avg("score"),
+                    **{f"{name}_max": Max(name) for name in SNAPSHOT_COUNTERS},
+                )
+                .order_by()
+            )
+            rows = [
+                WorkflowSnapshot(
+                    workflow_id=b["workflow_id"],
+                    captured_at=b["bucket"],
+                    resolution=target,
+                    score=b["score_avg"] or 0,
+                    **{name: b[f"{name}_max"] or 0 for name in SNAPSHOT_COUNTERS},
+                )
+                for b in buckets
+            ]
+            deleted += batch.delete()[0]
+            WorkflowSnapshot.objects.bulk_create(rows)
+            created += len(rows)
+
+    return created, deleted
+
+
+def compact_snapshots(now=None, batch_size=1000):
+    """
+    Downsample history so storage stays bounded:
+    - raw    older than SNAPSHOT_RAW_HOURS    -> hourly
+    - hourly older than SNAPSHOT_HOURLY_DAYS  -> daily
+    - daily  older than SNAPSHOT_DAILY_DAYS   -> deleted
+
+    Returns {"hourly": (created, deleted), "daily": (...), "expired": n}.
+    """
+    now = now or timezone.now()
+
+    hourly = _rollup(
+        WorkflowSnapshot.RAW,
+        WorkflowSnapshot.HOURLY,
+        now - timedelta(hours=settings.SNAPSHOT_RAW_HOURS),
+        batch_size,
+    )
+    daily = _rollup(
+        WorkflowSnapshot.HOURLY,
+        WorkflowSnapshot.DAILY,
+        now - timedelta(days=settings.SNAPSHOT_HOURLY_DAYS),
+        batch_size,
+    )
+    expired, _ = WorkflowSnapshot.objects.filter(
+        resolution=WorkflowSnapshot.DAILY,
+        captured_at__lt=now - timedelta(days=settings.SNAPSHOT_DAILY_DAYS),
+    ).delete()
+
+    return {"hourly": hourly, "daily": daily, "expired": expired}
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from django.conf import settings
+
+from . import metrics
+from .models import HttpValidator
+
+
+# =====================================================================
+# SHARED POOLED SESSION
+# =====================================================================
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    One keep-alive Session for every collector, created lazily.
+    Pool sizes come from HTTP_POOL_CONNECTIONS (hosts) and
+    HTTP_POOL_MAXSIZE (sockets per host).
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=settings.HTTP_POOL_CONNECTIONS,
+                pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({
+                "User-Agent": "Mozilla/5.0 (n8n-popularity collector)",
+                "Accept-Encoding": "gzip, deflate",
+            })
+            _session = session
+        return _session
+
+
+# host -> source label for collector_http_* metrics
+SOURCE_HOSTS = {
+    "www.googleapis.com": "youtube",
+    "community.n8n.io": "forum",
+}
+
+
+def _labels(url):
+    parts = urlsplit(url)
+    endpoint = parts.path.rstrip("/").rsplit("/", 1)[-1] or "/"
+    return SOURCE_HOSTS.get(parts.hostname, parts.hostname or ""), endpoint
+
+
+def get(url, params=None, headers=None, timeout=10):
+    """
+    Session GET, timed into collector_http_request_seconds{source, endpoint};
+    403/429 answers also count towards collector_http_rejections_total.
+    """
+    source, endpoint = _labels(url)
+    start = time.perf_counter()
+    try:
+        r = _send(url, params, headers, timeout)
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.HTTP_LATENCY.observe(elapsed, source=source, endpoint=endpoint)
+
+    if r.status_code in (403, 429):
+        metrics.HTTP_REJECTIONS.inc(source=source, endpoint=endpoint, status=r.status_code)
+    metrics.log_stage(
+        "http", logging.DEBUG, source=source, endpoint=endpoint,
+        status=r.status_code, seconds=round(elapsed, 4), bytes=len(r.content),
+    )
+    return r
+
+
+# =====================================================================
+# RECORD / REPLAY (HTTP_FIXTURES_MODE)
+# =====================================================================
+
+FIXTURE_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class FixtureStore:
+    """
+    One JSON file per (url, params) under `directory`/<source>/, keyed
+    like the validator cache (API keys never reach the disk).
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, url, params=None):
+        source, endpoint = _labels(url)
+        name = f"{endpoint}-{cache_key(url, params)[:20]}.json"
+        return os.path.join(self.directory, source, name)
+
+    def save(self, url, params, response):
+        path = self.path(url, params)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fixture = {
+            "url": url,
+            "params": {k: v for k, v in (params or {}).items() if k != "key"},
+            "status": response.status_code,
+            "headers": {h: response.headers[h] for h in FIXTURE_HEADERS if h in response.headers},
+            "body": response.text,
+        }
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(fixture, fh)
+
+    def load(self, url, params=None):
+        path = self.path(url, params)
+        try:
+            with open(path, encoding="utf-8") as fh:
+                fixture = json.load(fh)
+        except FileNotFoundError:
+            raise LookupError(f"No fixture for {url} {params} ({path})") from None
+        return make_response(url, fixture["status"], fixture["body"], fixture["headers"])
+
+    def fixtures(self, source=None):
+        """Every stored fixture dict, optionally for one source."""
+        root = os.path.join(self.directory, source) if source else self.directory
+        for folder, _, files in os.walk(root):
+            for name in sorted(files):
+                if name.endswith(".json"):
+                    with open(os.path.join(folder, name), encoding="utf-8") as fh:
+                        yield json.load(fh)
+
+
+def make_response(url, status, body, headers=None):
+    r = requests.Response()
+    r.url = url
+    r.status_code = status
+    r.headers = CaseInsensitiveDict(headers or {})
+    r.encoding = "utf-8"
+    r._content = body if isinstance(body, bytes) else body.encode("utf-8")
+    return r
+
+
+_responder = None
+
+
+@contextmanager
+def replay(responder):
+    """
+    Answer every get() with responder(url, params) instead of the network,
+    e.g. FixtureStore(...).load or a synthetic generator (benchmarks).
+    """
+    global _responder
+    previous, _responder = _responder, responder
+    try:
+        yield
+    finally:
+        _responder = previous
+
+
+def _send(url, params, headers, timeout):
+    if _responder is not None:
+        return _responder(url, params)
+
+    mode = settings.HTTP_FIXTURES_MODE
+    if mode == "replay":
+        return FixtureStore(settings.HTTP_FIXTURES_DIR).load(url, params)
+
+    r = get_session().get(url, params=params, headers=headers, timeout=timeout)
+    if mode == "record":
+        FixtureStore(settings.HTTP_FIXTURES_DIR).save(url, params, r)
+    return r
+
+
+# =====================================================================
+# CONDITIONAL REQUESTS (ETag / Last-Modified)
+# =====================================================================
+
+def cache_key(url, params=None, scope=""):
+    # Leave API keys out: rotating a key must not invalidate validators.
+    params = {k: v for k, v in (params or {}).items() if k != "key"}
+    raw = json.dumps([url, sorted(params.items()), scope], default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def conditional_get(url, params=None, headers=None, scope="", timeout=10):
+    """
+    GET that revalidates with If-None-Match / If-Modified-Since.
+
+    `scope` separates consumers of the same URL (e.g. one forum fetch per
+    country) so one consumer's 200 never turns into another one's 304.
+
+    A 304 means nothing changed since the last saved 200 for this key;
+    callers should skip parsing and saving. New validators of a 200 are
+    only attached to the response (`r.validators`): callers pass it to
+    store_validators() once its items are saved, so a run that fails
+    before that fetches the full body again next time.
+    """
+    key = cache_key(url, params, scope)
+
+    headers = dict(headers or {})
+    # While recording, always fetch full bodies: a 304 makes a useless fixture.
+    known = {}
+    if settings.HTTP_FIXTURES_MODE != "record":
+        known = HttpValidator.objects.filter(key=key).values("etag", "last_modified").first() or {}
+    if known.get("etag"):
+        headers["If-None-Match"] = known["etag"]
+    if known.get("last_modified"):
+        headers["If-Modified-Since"] = known["last_modified"]
+
+    r = get(url, params=params, headers=headers, timeout=timeout)
+
+    r.validators = None
+    if r.status_code == 200:
+        validators = {
+            "etag": r.headers.get("ETag") or "",
+            "last_modified": r.headers.get("Last-Modified") or "",
+        }
+        if any(validators.values()) and validators != known:
+            r.validators = (key, validators)
+
+    return r
+
+
+def store_validators(responses):
+    """Persist the pending validators of conditional_get responses."""
+    pending = [r.validators for r in responses if getattr(r, "validators", None)]
+    if not pending:
+        return
+    rows = [HttpValidator(key=key, **validators) for key, validators in pending]
+    HttpValidator.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["key"],
+        update_fields=["etag", "last_modified", "updated_at"],
+    )
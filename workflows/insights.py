@@ -0,0 +1,162 @@
+import math
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.functions import Upper
+
+from .history import SNAPSHOT_COUNTERS, _as_int
+from .models import Workflow, WorkflowInsight
+
+
+# Histogram resolution: bucket width is 10^(1/20) ≈ 12% of the score,
+# which bounds the error of the interpolated percentiles.
+BUCKETS_PER_DECADE = 20
+PERCENTILES = (50, 75, 90, 99)
+
+# Columns kept per row in WorkflowInsight.top
+TOP_FIELDS = ("id", "workflow", "source_url", "popularity_score", "popularity_metrics")
+
+
+def _bucket(score):
+    return str(math.floor(math.log10(1 + max(score or 0, 0)) * BUCKETS_PER_DECADE))
+
+
+def _bucket_bounds(bucket):
+    return (
+        10 ** (bucket / BUCKETS_PER_DECADE) - 1,
+        10 ** ((bucket + 1) / BUCKETS_PER_DECADE) - 1,
+    )
+
+
+def _rank(row):
+    return (row["popularity_score"], row["id"])
+
+
+def _group(platform, country):
+    """Workflow rows of one rollup, via the workflow_pc_score_ci index."""
+    return (
+        Workflow.objects.alias(platform_ci=Upper("platform"), country_ci=Upper("country"))
+        .filter(platform_ci=platform.upper(), country_ci=country.upper())
+        .order_by("-popularity_score", "-id")
+    )
+
+
+def _top_rows(platform, country):
+    return list(_group(platform, country).values(*TOP_FIELDS)[: settings.INSIGHTS_TOP_N])
+
+
+def _add(insight, row, sign):
+    insight.workflow_count += sign
+    insight.score_sum += sign * (row["popularity_score"] or 0)
+    for name in SNAPSHOT_COUNTERS:
+        field = f"total_{name}"
+        setattr(insight, field, getattr(insight, field) + sign * _as_int(row["popularity_metrics"].get(name)))
+
+    hist = insight.score_histogram
+    bucket = _bucket(row["popularity_score"])
+    hist[bucket] = hist.get(bucket, 0) + sign
+    if hist[bucket] <= 0:
+        del hist[bucket]
+
+
+def recompute(platform, country):
+    """
+    Rebuild one rollup from its Workflow rows (one streaming pass plus
+    the indexed top-N). Used for the first write to a group and by
+    rebuild_insights. Returns the saved WorkflowInsight.
+    """
+    country = country.upper()
+    insight, _ = WorkflowInsight.objects.get_or_create(platform=platform, country=country)
+    insight.workflow_count = 0
+    insight.score_sum = 0
+    insight.score_histogram = {}
+    for name in SNAPSHOT_COUNTERS:
+        setattr(insight, f"total_{name}", 0)
+
+    rows = _group(platform, country).order_by().values("popularity_score", "popularity_metrics")
+    for row in rows.iterator(chunk_size=2000):
+        _add(insight, row, 1)
+    insight.top = _top_rows(platform, country)
+    insight.save()
+    return insight
+
+
+def rebuild_all():
+    """
+    Recompute every rollup and drop the ones whose rows are gone.
+    Returns the number of (platform, country) groups.
+    """
+    groups = set(
+        Workflow.objects.annotate(country_ci=Upper("country"))
+        .values_list("platform", "country_ci")
+        .distinct()
+    )
+    for platform, country in groups:
+        recompute(platform, country)
+    for pk, platform, country in WorkflowInsight.objects.values_list("id", "platform", "country"):
+        if (platform, country) not in groups:
+            WorkflowInsight.objects.filter(pk=pk).delete()
+    return len(groups)
+
+
+def apply_changes(platform, country, changes):
+    """
+    Fold a save_items call into the (platform, country) rollup.
+
+    `changes` is a list of (old, new) row dicts with TOP_FIELDS keys;
+    old is None for an inserted row, new is None for a removed one.
+    Counters and the histogram move by the difference. The top-N is
+    merged with the touched rows and only re-read from the index when a
+    row that was in it dropped and something untouched could take its
+    place. A group without a rollup yet is computed in full once.
+    """
+    country = country.upper()
+    limit = settings.INSIGHTS_TOP_N
+    with transaction.atomic():
+        insight = WorkflowInsight.objects.select_for_update().filter(
+            platform=platform, country=country
+        ).first()
+        if insight is None:
+            recompute(platform, country)
+            return
+
+        old_top = insight.top
+        candidates = {row["id"]: row for row in old_top}
+        for old, new in changes:
+            if old is not None:
+                _add(insight, old, -1)
+            if new is not None:
+                _add(insight, new, 1)
+                candidates[new["id"]] = new
+            else:
+                candidates.pop(old["id"], None)
+
+        top = sorted(candidates.values(), key=_rank, reverse=True)[:limit]
+        # Untouched rows outside the old top-N all rank at or below its
+        # last entry; if the merged list can't prove it beats them, re-read.
+        if len(old_top) >= limit and (len(top) < limit or _rank(top[-1]) < _rank(old_top[-1])):
+            top = _top_rows(platform, country)
+        insight.top = top
+        insight.save()
+
+
+def score_summary(insight):
+    """{"mean", "max", "p50", "p75", "p90", "p99"} from the histogram."""
+    count = insight.workflow_count
+    summary = {
+        "mean": round(insight.score_sum / count, 2) if count else None,
+        "max": insight.top[0]["popularity_score"] if insight.top else None,
+    }
+
+    buckets = sorted((int(b), n) for b, n in insight.score_histogram.items())
+    for q in PERCENTILES:
+        summary[f"p{q}"] = None
+        target = q / 100 * count
+        seen = 0
+        for bucket, n in buckets:
+            if seen + n >= target:
+                low, high = _bucket_bounds(bucket)
+                summary[f"p{q}"] = round(low + (high - low) * (target - seen) / n, 2)
+                break
+            seen += n
+    return summary
@@ -0,0 +1,129 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import metrics, scheduler
+from .models import FetchJob
+from .orchestrator import after_fetch, changed_platforms, run_source
+
+
+def enqueue(source, country):
+    """
+    Queue a collector run and return (job, created).
+
+    If a queued or running job already exists for (source, country) that
+    job is returned instead; the fetchjob_one_active constraint makes this
+    race-free across web workers. With JOBS_EAGER the job runs inline,
+    which is what tests and single-process setups use.
+    """
+    jobs = FetchJob.objects.filter(source=source, country=country)
+    active = jobs.filter(status__in=FetchJob.ACTIVE)
+
+    for _ in range(3):
+        job = active.first()
+        if job:
+            return job, False
+        try:
+            with transaction.atomic():
+                job = FetchJob.objects.create(source=source, country=country)
+            break
+        except IntegrityError:
+            # Lost the race; the winner may already be done, so look again.
+            continue
+    else:
+        return jobs.order_by("-created_at", "-id").first(), False
+
+    if settings.JOBS_EAGER:
+        run_job(job)
+    return job, True
+
+
+def _reap_stale():
+    """Fail jobs whose worker died mid-run so they stop blocking dedupe."""
+    cutoff = timezone.now() - timedelta(seconds=settings.JOBS_STALE_AFTER)
+    return FetchJob.objects.filter(status=FetchJob.RUNNING, started_at__lt=cutoff).update(
+        status=FetchJob.FAILED,
+        finished_at=timezone.now(),
+        error="worker timed out",
+    )
+
+
+def claim_next():
+    """
+    Atomically move the oldest queued job to running and return it.
+    Uses a conditional UPDATE as the lock, so several workers can poll
+    the same table on SQLite or Postgres without double-running a job.
+    """
+    _reap_stale()
+    while True:
+        job = FetchJob.objects.filter(status=FetchJob.QUEUED).order_by("created_at", "id").first()
+        if job is None:
+            return None
+
+        now = timezone.now()
+        claimed = FetchJob.objects.filter(pk=job.pk, status=FetchJob.QUEUED).update(
+            status=FetchJob.RUNNING, started_at=now
+        )
+        if claimed:
+            job.status, job.started_at = FetchJob.RUNNING, now
+            return job
+
+
+def run_job(job):
+    """
+    Run a claimed (or, with JOBS_EAGER, just created) job and record the
+    outcome. Both writes are conditional on the status, so a job that
+    _reap_stale failed while it was still running keeps FAILED instead of
+    being overwritten, and the lost race is logged.
+    """
+    if job.status != FetchJob.RUNNING:
+        now = timezone.now()
+        if not FetchJob.objects.filter(pk=job.pk, status=FetchJob.QUEUED).update(
+            status=FetchJob.RUNNING, started_at=now
+        ):
+            job.refresh_from_db()
+            return job  # another worker claimed it
+        job.status, job.started_at = FetchJob.RUNNING, now
+
+    try:
+        stats = run_source(job.source, job.country)
+    except Exception as exc:
+        job.status, job.error = FetchJob.FAILED, str(exc)
+    else:
+        job.status, job.result = FetchJob.DONE, stats
+
+    job.finished_at = timezone.now()
+    finished = FetchJob.objects.filter(pk=job.pk, status=FetchJob.RUNNING).update(
+        status=job.status, result=job.result, error=job.error, finished_at=job.finished_at
+    )
+    if not finished:
+        metrics.log_stage(
+            "job", logging.WARNING, job=job.pk, source=job.source, country=job.country,
+            outcome=job.status, error="marked stale while running; outcome dropped",
+        )
+        job.refresh_from_db()
+        return job
+
+    scheduler.record(job)
+
+    if job.status == FetchJob.DONE:
+        # Expiry and rescoring must not fail a fetch that already saved its
+        # rows; their errors are kept on the job instead.
+        errors = after_fetch(changed_platforms(job.source, job.result), f"Job {job.pk}")["errors"]
+        if errors:
+            job.result["post_fetch_errors"] = errors
+            FetchJob.objects.filter(pk=job.pk).update(result=job.result)
+    return job
+
+
+def job_timings(job):
+    def seconds(start, end):
+        return round((end - start).total_seconds(), 2) if start and end else None
+
+    return {
+        "queued_seconds": seconds(job.created_at, job.started_at or timezone.now()),
+        "run_seconds": seconds(job.started_at, job.finished_at or timezone.now()),
+    }
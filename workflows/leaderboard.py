@@ -0,0 +1,112 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.functions import Upper
+
+from .models import ArchivedWorkflow, Workflow
+from .renderers import dumps
+from .serializers import WorkflowSerializer
+
+
+# Requested limits are rounded up to one of these; the cached entry holds
+# that many pre-rendered rows and any smaller limit is a prefix of it.
+LIMIT_BUCKETS = (10, 50, 100, 250, 500, 1000)
+
+GENERATION_KEY = "leaderboard:generation"
+
+# ?sort= value -> column ordered descending (id breaks ties)
+SORT_FIELDS = {
+    "score": "popularity_score",
+    "normalized": "normalized_score",
+    "trending": "trending_score",
+}
+
+# Raw scores are on per-platform scales (YouTube views dwarf forum
+# replies); only the normalized one ranks platforms against each other.
+DEFAULT_SORT = "normalized"
+
+
+def _bucket(limit):
+    for bucket in LIMIT_BUCKETS:
+        if limit <= bucket:
+            return bucket
+    return LIMIT_BUCKETS[-1]
+
+
+def _generation():
+    gen = cache.get(GENERATION_KEY)
+    if gen is None:
+        cache.add(GENERATION_KEY, uuid.uuid4().hex, None)
+        gen = cache.get(GENERATION_KEY)
+    return gen
+
+
+def invalidate():
+    """
+    Drop every cached leaderboard at once by moving to a new generation.
+    Old entries are never read again and age out via LEADERBOARD_CACHE_TTL.
+    """
+    cache.set(GENERATION_KEY, uuid.uuid4().hex, None)
+
+
+def filtered_workflows(platform=None, country=None, sort=DEFAULT_SORT):
+    """
+    Workflows matching platform / country case-insensitively, best first
+    by the SORT_FIELDS column for `sort`.
+
+    UPPER(col) = UPPER(value) is what iexact means, but spelled this way
+    it matches the workflow_pc_*_ci expression indexes on both SQLite
+    and Postgres (SQLite's LIKE-based iexact can't use an index).
+    """
+    qs = Workflow.objects.all()
+    if platform:
+        qs = qs.alias(platform_ci=Upper("platform")).filter(platform_ci=platform.upper())
+    if country:
+        qs = qs.alias(country_ci=Upper("country")).filter(country_ci=country.upper())
+    return qs.order_by(f"-{SORT_FIELDS[sort]}", "-id")
+
+
+def archived_workflows(platform=None, country=None, sort=DEFAULT_SORT):
+    """
+    filtered_workflows() over ArchivedWorkflow (include_archived=true).
+    Ties break on original_id, the id the rows are merged on.
+    """
+    qs = ArchivedWorkflow.objects.all()
+    if platform:
+        qs = qs.alias(platform_ci=Upper("platform")).filter(platform_ci=platform.upper())
+    if country:
+        qs = qs.alias(country_ci=Upper("country")).filter(country_ci=country.upper())
+    return qs.order_by(f"-{SORT_FIELDS[sort]}", "-original_id")
+
+
+def _render_rows(platform, country, sort, bucket):
+    qs = filtered_workflows(platform, country, sort)[:bucket]
+
+    return [dumps(row) for row in WorkflowSerializer(qs, many=True).data]
+
+
+def get_leaderboard(platform, country, limit, sort=DEFAULT_SORT):
+    """
+    Return (json_bytes, etag) for the list_workflows default view.
+
+    Rows are rendered once per (platform, country, sort, limit bucket) and
+    generation, so a cache hit costs two cache reads and a bytes join no
+    matter how large the table is.
+    """
+    limit = max(0, min(limit, LIMIT_BUCKETS[-1]))
+    bucket = _bucket(limit)
+    gen = _generation()
+
+    key = ":".join([
+        "leaderboard", gen, (platform or "*").lower(), (country or "*").lower(), sort, str(bucket),
+    ])
+    rows = cache.get(key)
+    if rows is None:
+        rows = _render_rows(platform, country, sort, bucket)
+        cache.set(key, rows, settings.LEADERBOARD_CACHE_TTL)
+
+    body = b"[" + b",".join(rows[:limit]) + b"]"
+    etag = '"%s"' % hashlib.sha1(f"{key}:{limit}".encode("utf-8")).hexdigest()[:20]
+    return body, etag
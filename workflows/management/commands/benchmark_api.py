@@ -0,0 +1,99 @@
+import json
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.utils.text import compress_string
+from rest_framework.renderers import JSONRenderer
+
+from workflows import leaderboard
+from workflows.management.commands.benchmark_queries import _seed
+from workflows.middleware import brotli
+from workflows.models import Workflow
+from workflows.renderers import ORJSONRenderer
+from workflows.serializers import WorkflowSerializer
+
+
+def _median_ms(fn, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, round(statistics.median(timings), 2)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time serializing list_workflows-shaped responses of 100 / 1k / 10k "
+        "rows with DRF's JSONRenderer vs orjson, and report bytes on the wire "
+        "uncompressed, gzipped and (if installed) brotli'd, plus a cold "
+        "/api/workflows/ request. Seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="100,1000,10000",
+                            help="Comma-separated response sizes in rows")
+        parser.add_argument("--runs", type=int, default=10, help="Repeats per measurement (median)")
+        parser.add_argument("--output", default=None, help="Write the JSON report here")
+
+    def handle(self, *args, **options):
+        sizes = [int(n) for n in options["sizes"].split(",") if n]
+        runs = options["runs"]
+        report = {"database": connection.vendor, "brotli": brotli is not None, "sizes": {}}
+
+        with transaction.atomic():
+            _seed(max(sizes))
+            client = Client()
+
+            for n in sizes:
+                rows = list(Workflow.objects.order_by("-popularity_score", "-id")[:n])
+                data, serializer_ms = _median_ms(lambda: WorkflowSerializer(rows, many=True).data, runs)
+                body, json_ms = _median_ms(lambda: JSONRenderer().render(data), runs)
+                fast, orjson_ms = _median_ms(lambda: ORJSONRenderer().render(data), runs)
+                if json.loads(body) != json.loads(fast):
+                    raise CommandError(f"orjson output differs from JSONRenderer at {n} rows")
+
+                gzipped, gzip_ms = _median_ms(lambda: compress_string(fast), runs)
+                result = {
+                    "serializer_ms": serializer_ms,
+                    "render_json_ms": json_ms,
+                    "render_orjson_ms": orjson_ms,
+                    "bytes": len(fast),
+                    "gzip_bytes": len(gzipped),
+                    "gzip_ms": gzip_ms,
+                }
+                if brotli is not None:
+                    br, br_ms = _median_ms(
+                        lambda: brotli.compress(fast, quality=settings.BROTLI_QUALITY), runs
+                    )
+                    result.update(br_bytes=len(br), br_ms=br_ms)
+
+                # list_workflows tops out at 1000 rows
+                if n <= 1000:
+                    def cold():
+                        leaderboard.invalidate()
+                        return client.get(f"/api/workflows/?limit={n}", HTTP_ACCEPT_ENCODING="gzip")
+
+                    response, request_ms = _median_ms(cold, runs)
+                    result.update(cold_request_ms=request_ms, wire_bytes=len(response.content))
+                report["sizes"][n] = result
+
+                self.stdout.write(
+                    f"  {n:>6} rows  serializer {serializer_ms:8.2f}ms | "
+                    f"render json {json_ms:7.2f}ms  orjson {orjson_ms:6.2f}ms | "
+                    f"{len(fast):>9} B  gzip {len(gzipped):>8} B"
+                    + (f"  br {result['br_bytes']:>8} B" if "br_bytes" in result else "")
+                    + (f" | cold GET {result['cold_request_ms']:7.2f}ms" if "cold_request_ms" in result else "")
+                )
+
+            transaction.set_rollback(True)
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
+        self.stdout.write(self.style.SUCCESS("✔ API serialization benchmark done"))
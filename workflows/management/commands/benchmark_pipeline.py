@@ -0,0 +1,286 @@
+import json
+import platform
+import statistics
+import time
+from datetime import timedelta
+from math import ceil
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.utils import timezone
+
+from workflows import http_client, leaderboard
+from workflows.collectors import (
+    YOUTUBE_KEYWORDS,
+    iter_forum_incremental,
+    iter_youtube_pipelined,
+)
+from workflows.quota import QUOTA_COST
+from workflows.scoring import rescore_all
+from workflows.tasks import save_items
+
+
+COUNTRY = "US"
+TOPICS_PER_PAGE = 100
+
+
+class _BenchPool:
+    """KeyPool stand-in with an unlimited budget and no DB rows."""
+
+    keys = {"bench": "bench"}
+
+    def __init__(self):
+        self.spent = 0
+
+    def remaining(self):
+        return 10 ** 12
+
+    def reserve(self, endpoint, skip=()):
+        if "bench" in skip:
+            return None
+        self.spent += QUOTA_COST[endpoint]
+        return "bench"
+
+    def exhaust(self, key):
+        pass
+
+
+def _load_templates(fixtures_dir):
+    """
+    Video and topic templates from recorded fixtures, falling back to
+    sample_workflows.json when nothing has been recorded yet.
+    """
+    store = http_client.FixtureStore(fixtures_dir)
+    videos, topics = [], []
+    for fixture in store.fixtures("youtube"):
+        if fixture["url"].endswith("/videos") and fixture["status"] == 200:
+            for item in json.loads(fixture["body"]).get("items", []):
+                if "snippet" in item:
+                    videos.append({"title": item["snippet"]["title"], "statistics": item.get("statistics", {})})
+    for fixture in store.fixtures("forum"):
+        if fixture["status"] == 200:
+            topics.extend(json.loads(fixture["body"]).get("topic_list", {}).get("topics", []))
+
+    if videos and topics:
+        return videos, topics, "fixtures"
+
+    with open(settings.BASE_DIR / "sample_workflows.json", encoding="utf-8") as fh:
+        sample = json.load(fh)
+    videos = [
+        {"title": row["workflow"], "statistics": {
+            "viewCount": str(row["popularity_metrics"].get("views", 0)),
+            "likeCount": str(row["popularity_metrics"].get("likes", 0)),
+            "commentCount": str(row["popularity_metrics"].get("comments", 0)),
+        }}
+        for row in sample if row["platform"] == "YouTube"
+    ]
+    topics = [
+        {
+            "title": row["workflow"],
+            "like_count": row["popularity_metrics"].get("likes", 0),
+            "reply_count": row["popularity_metrics"].get("replies", 0),
+            "views": row["popularity_metrics"].get("views", 0),
+        }
+        for row in sample if row["platform"] == "Forum"
+    ]
+    return videos, topics, "sample_workflows.json"
+
+
+class Inflator:
+    """
+    Synthetic responder for http_client.replay(): YouTube search and
+    videos.list plus Discourse latest.json pages, built from templates and
+    scaled to `videos` distinct videos and `topics` distinct topics.
+    """
+
+    def __init__(self, video_templates, topic_templates, videos, topics):
+        self.video_templates = video_templates
+        self.topic_templates = topic_templates
+        self.videos = videos
+        self.topics = topics
+        self.search_pages = max(1, ceil(videos / (len(YOUTUBE_KEYWORDS) * 50)))
+        self.topic_pages = max(1, ceil(topics / TOPICS_PER_PAGE))
+        self.now = timezone.now()
+
+    def __call__(self, url, params):
+        params = params or {}
+        endpoint = url.rstrip("/").rsplit("/", 1)[-1]
+        body = {
+            "search": self._search,
+            "videos": self._videos,
+            "latest.json": self._latest,
+        }[endpoint](params)
+        return http_client.make_response(
+            url, 200, json.dumps(body), {"Content-Type": "application/json"}
+        )
+
+    def _search(self, params):
+        page = int(params.get("pageToken") or 0)
+        start = (YOUTUBE_KEYWORDS.index(params["q"]) * self.search_pages + page) * 50
+        end = min(start + 50, self.videos)
+        body = {"items": [{"id": {"kind": "youtube#video", "videoId": f"{i:011d}"}}
+                          for i in range(start, end)]}
+        if page + 1 < self.search_pages and end < self.videos:
+            body["nextPageToken"] = str(page + 1)
+        return body
+
+    def _videos(self, params):
+        items = []
+        for vid in params["id"].split(","):
+            i = int(vid)
+            t = self.video_templates[i % len(self.video_templates)]
+            factor = 0.5 + (i * 7919 % 1000) / 1000
+            items.append({
+                "id": vid,
+                "snippet": {"title": f"{t['title'][:480]} #{i}"},
+                "statistics": {k: str(int(int(v) * factor)) for k, v in t["statistics"].items()},
+            })
+        return {"items": items}
+
+    def _latest(self, params):
+        page = int(params.get("page") or 0)
+        start = page * TOPICS_PER_PAGE
+        topics = []
+        for i in range(start, min(start + TOPICS_PER_PAGE, self.topics)):
+            t = self.topic_templates[i % len(self.topic_templates)]
+            topics.append({
+                "id": i + 1,
+                "title": f"{t['title'][:480]} #{i}",
+                "like_count": t.get("like_count", 0),
+                "reply_count": t.get("reply_count", 0),
+                "views": t.get("views", 0) + i % 97,
+                "bumped_at": (self.now - timedelta(seconds=i)).isoformat(),
+            })
+        topic_list = {"topics": topics}
+        if page + 1 < self.topic_pages:
+            topic_list["more_topics_url"] = f"/latest?page={page + 1}"
+        return {"topic_list": topic_list}
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, round(time.perf_counter() - start, 4)
+
+
+def _percentiles(timings):
+    timings = sorted(timings)
+    return {
+        "runs": len(timings),
+        "p50_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay collector fixtures inflated to N videos / topics and time "
+        "collection, save_items, scoring and the list/search API end to end "
+        "on the configured DATABASE_URL. Writes a JSON report; everything "
+        "is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--videos", type=int, default=10_000)
+        parser.add_argument("--topics", type=int, default=50_000)
+        parser.add_argument("--runs", type=int, default=50, help="Requests per API scenario")
+        parser.add_argument("--fixtures", default=None,
+                            help="Recorded fixture dir (default: HTTP_FIXTURES_DIR)")
+        parser.add_argument("--output", default=None, help="Write the JSON report here")
+        parser.add_argument("--baseline", default=None,
+                            help="Earlier report to compare stage timings against")
+
+    def handle(self, *args, **options):
+        videos, topics, source = _load_templates(options["fixtures"] or settings.HTTP_FIXTURES_DIR)
+        inflator = Inflator(videos, topics, options["videos"], options["topics"])
+        self.stdout.write(
+            f"Backend: {connection.vendor}, {options['videos']} videos / "
+            f"{options['topics']} topics from {source}"
+        )
+
+        stages = {}
+        api = {}
+        with transaction.atomic(), http_client.replay(inflator):
+            yt_items, t = _timed(lambda: list(iter_youtube_pipelined(
+                COUNTRY, max_pages=inflator.search_pages, rate=10 ** 6, pool=_BenchPool()
+            )))
+            stages["collect_youtube"] = {"seconds": t, "items": len(yt_items)}
+
+            forum_items, t = _timed(lambda: list(iter_forum_incremental(
+                COUNTRY, max_pages=inflator.topic_pages
+            )))
+            stages["collect_forum"] = {"seconds": t, "items": len(forum_items)}
+
+            for label, items, plat in (
+                ("save_youtube", yt_items, "YouTube"),
+                ("save_forum", forum_items, "Forum"),
+            ):
+                res, t = _timed(lambda: save_items(items, plat, COUNTRY))
+                stages[label] = {"seconds": t, **res}
+            res, t = _timed(lambda: save_items(yt_items, "YouTube", COUNTRY))
+            stages["save_youtube_unchanged"] = {"seconds": t, **res}
+
+            rows, t = _timed(rescore_all)
+            stages["scoring"] = {"seconds": t, "rows": rows}
+
+            client = Client()
+            scenarios = {
+                "list_workflows_cold": ("/api/workflows/?limit=100", True),
+                "list_workflows_warm": ("/api/workflows/?limit=100", False),
+                "list_workflows_platform_country": ("/api/workflows/?platform=YouTube&country=US&limit=100", False),
+                "list_workflows_cursor": ("/api/workflows/?limit=100&cursor=", False),
+                "search": ("/api/workflows/search?q=automation&limit=20", False),
+            }
+            for label, (url, cold) in scenarios.items():
+                leaderboard.invalidate()
+                timings = []
+                for _ in range(options["runs"]):
+                    if cold:
+                        leaderboard.invalidate()
+                    start = time.perf_counter()
+                    response = client.get(url)
+                    timings.append((time.perf_counter() - start) * 1000)
+                    assert response.status_code == 200, (url, response.status_code)
+                api[label] = _percentiles(timings)
+
+            transaction.set_rollback(True)
+
+        report = {
+            "generated_at": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "videos": options["videos"],
+            "topics": options["topics"],
+            "templates": source,
+            "stages": stages,
+            "api": api,
+        }
+
+        for label, data in stages.items():
+            self.stdout.write(f"  {label:<24} {data['seconds']:8.3f}s  {data}")
+        for label, data in api.items():
+            self.stdout.write(f"  {label:<32} p50 {data['p50_ms']:7.2f}ms  p95 {data['p95_ms']:7.2f}ms")
+
+        if options["baseline"]:
+            with open(options["baseline"], encoding="utf-8") as fh:
+                baseline = json.load(fh)
+            self.stdout.write(f"Compared to {options['baseline']}:")
+            for label, data in stages.items():
+                before = baseline.get("stages", {}).get(label, {}).get("seconds")
+                if before:
+                    self.stdout.write(f"  {label:<24} {100 * (data['seconds'] / before - 1):+7.1f}%")
+            for label, data in api.items():
+                before = baseline.get("api", {}).get(label, {}).get("p95_ms")
+                if before:
+                    self.stdout.write(f"  {label:<32} p95 {100 * (data['p95_ms'] / before - 1):+7.1f}%")
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"✔ Report written to {options['output']}"))
+        else:
+            self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,133 @@
+import json
+import random
+import re
+import statistics
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from workflows.leaderboard import DEFAULT_SORT, SORT_FIELDS, filtered_workflows
+from workflows.models import Workflow
+
+
+COUNTRIES = ["US", "IN", "DE", "GB", "FR", "BR", "JP", "CA", "AU", "ES"]
+
+# Plan lines that mean "read the whole table"
+FULL_SCAN = {
+    "sqlite": re.compile(r"SCAN workflows_workflow\s*$", re.M),
+    "postgresql": re.compile(r"Seq Scan on workflows_workflow"),
+}
+
+# Plan lines that mean "sort the matches instead of reading the index in order"
+SORTED = {
+    "sqlite": re.compile(r"USE TEMP B-TREE FOR ORDER BY"),
+    "postgresql": re.compile(r"(^|->\s+)(Incremental )?Sort\s+\(", re.M),
+}
+
+
+def _seed(n, batch_size=5000):
+    with open(settings.BASE_DIR / "sample_workflows.json", encoding="utf-8") as fh:
+        template = json.load(fh)
+
+    rng = random.Random(42)
+    now = timezone.now()
+    batch = []
+    for i in range(n):
+        base = template[i % len(template)]
+        batch.append(Workflow(
+            workflow=f"{base['workflow'][:480]} #{i}",
+            platform=base["platform"],
+            country=COUNTRIES[i % len(COUNTRIES)],
+            source_url=base.get("source_url", ""),
+            popularity_metrics=base.get("popularity_metrics", {}),
+            popularity_score=rng.random() * base.get("popularity_score", 1000),
+            normalized_score=rng.random() * 100,
+            last_seen=now - timedelta(minutes=rng.randrange(60 * 24 * 90)),
+        ))
+        if len(batch) >= batch_size:
+            Workflow.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Workflow.objects.bulk_create(batch)
+
+
+def _keys(qs, sort=DEFAULT_SORT):
+    """What the list queries need from the index: id and the sort column."""
+    return qs.values_list("id", SORT_FIELDS[sort])
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed N synthetic workflows (templated on sample_workflows.json) and "
+        "check that list_workflows / status queries are planned as ordered "
+        "index scans (no full scan, no sort step) and stay fast. Timings "
+        "read (id, sort key) only, so they measure the index rather than "
+        "model construction. Everything is rolled back unless --keep is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--runs", type=int, default=20)
+        parser.add_argument("--max-ms", type=float, default=50.0,
+                            help="Fail if any query's p95 (id + sort key only) exceeds this")
+        parser.add_argument("--keep", action="store_true",
+                            help="Commit the seeded rows instead of rolling back")
+
+    def handle(self, *args, **options):
+        scenarios = [
+            ("list platform+country", lambda: _keys(filtered_workflows("youtube", "us"))[:100]),
+            ("list platform", lambda: _keys(filtered_workflows("forum"))[:100]),
+            ("list country", lambda: _keys(filtered_workflows(None, "in"))[:100]),
+            ("list all", lambda: _keys(filtered_workflows())[:1000]),
+            ("list platform+country by score",
+             lambda: _keys(filtered_workflows("youtube", "us", "score"), "score")[:100]),
+            ("list all by score", lambda: _keys(filtered_workflows(sort="score"), "score")[:1000]),
+            ("cron status", lambda: Workflow.objects.exclude(last_seen__isnull=True)
+                                                    .order_by("-last_seen")
+                                                    .values_list("last_seen", flat=True)[:1]),
+        ]
+
+        failures = []
+        with transaction.atomic():
+            start = time.perf_counter()
+            _seed(options["rows"])
+            with connection.cursor() as cur:
+                cur.execute("ANALYZE")
+            self.stdout.write(
+                f"Seeded {options['rows']} rows on {connection.vendor} "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+
+            for label, build in scenarios:
+                plan = build().explain()
+                full_scan = FULL_SCAN.get(connection.vendor)
+                if full_scan and full_scan.search(plan):
+                    failures.append(f"{label}: full table scan\n{plan}")
+                sorted_ = SORTED.get(connection.vendor)
+                if sorted_ and sorted_.search(plan):
+                    failures.append(f"{label}: sorts instead of reading the index in order\n{plan}")
+
+                timings = []
+                for _ in range(options["runs"]):
+                    t = time.perf_counter()
+                    list(build())
+                    timings.append((time.perf_counter() - t) * 1000)
+                timings.sort()
+                p50 = statistics.median(timings)
+                p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                if p95 > options["max_ms"]:
+                    failures.append(f"{label}: p95 {p95:.1f}ms > {options['max_ms']}ms")
+
+                self.stdout.write(f"  {label:<32} p50 {p50:7.2f}ms  p95 {p95:7.2f}ms")
+                self.stdout.write("    " + plan.replace("\n", "\n    "))
+
+            if not options["keep"]:
+                transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError("Query plan regression:\n" + "\n".join(failures))
+        self.stdout.write(self.style.SUCCESS("✔ All queries are ordered index scans and within budget"))
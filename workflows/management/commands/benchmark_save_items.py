@@ -0,0 +1,96 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from workflows.models import Workflow
+from workflows.tasks import save_items
+
+
+def _synthetic_items(n, bump=0):
+    return [
+        {
+            "workflow": f"bench workflow {i}",
+            "source_url": f"https://example.com/{i}",
+            "metrics": {"views": i * 10 + bump, "likes": i, "comments": i // 2},
+            "score": float(i * 6 + bump),
+        }
+        for i in range(n)
+    ]
+
+
+def _legacy_save_items(items, platform, country, now):
+    # The original per-row implementation, kept here as the baseline.
+    for item in items:
+        Workflow.objects.update_or_create(
+            workflow=item["workflow"],
+            platform=platform,
+            country=country,
+            defaults={
+                "source_url": item.get("source_url", ""),
+                "popularity_metrics": item.get("metrics", {}),
+                "popularity_score": item.get("score", 0),
+                "last_seen": now,
+            },
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare DB round trips of per-row update_or_create vs the bulk "
+        "save_items upsert. Runs against the configured DATABASE_URL and "
+        "rolls everything back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=2000)
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def _measure(self, fn):
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+        return queries, elapsed
+
+    def handle(self, *args, **options):
+        n = options["rows"]
+        batch_size = options["batch_size"]
+        fresh = _synthetic_items(n)
+        changed = _synthetic_items(n, bump=1)
+        now = timezone.now()
+
+        self.stdout.write(f"Backend: {connection.vendor}, rows: {n}")
+
+        results = []
+        for label, run in (
+            ("update_or_create", lambda items: _legacy_save_items(items, "YouTube", "ZZ", now)),
+            ("save_items", lambda items: save_items(items, "YouTube", "ZZ", batch_size=batch_size)),
+        ):
+            with transaction.atomic():
+                insert = self._measure(lambda: run(fresh))
+                update = self._measure(lambda: run(changed))
+                # Same items again: nothing changed, so nothing to rewrite
+                repeat = self._measure(lambda: run(changed))
+                transaction.set_rollback(True)
+            results.append((label, insert, update, repeat))
+
+        for label, (iq, it), (uq, ut), (rq, rt) in results:
+            self.stdout.write(
+                f"  {label:<18} insert: {iq:>6} queries {it:8.3f}s | "
+                f"update: {uq:>6} queries {ut:8.3f}s | "
+                f"unchanged: {rq:>6} queries {rt:8.3f}s"
+            )
+
+        (_, (legacy_q, _), _, _), (_, (bulk_q, _), _, _) = results
+        self.stdout.write(self.style.SUCCESS(
+            f"✔ Round trips reduced {legacy_q / max(bulk_q, 1):.0f}x on insert"
+        ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from workflows.history import compact_snapshots
+
+
+class Command(BaseCommand):
+    help = "Roll old workflow snapshots into hourly / daily aggregates"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Workflows per rollup transaction")
+
+    def handle(self, *args, **options):
+        res = compact_snapshots(batch_size=options["batch_size"])
+
+        self.stdout.write(f"  raw → hourly: {res['hourly'][1]} rows into {res['hourly'][0]}")
+        self.stdout.write(f"  hourly → daily: {res['daily'][1]} rows into {res['daily'][0]}")
+        self.stdout.write(f"  expired daily rows: {res['expired']}")
+        self.stdout.write(self.style.SUCCESS("✔ Snapshots compacted"))
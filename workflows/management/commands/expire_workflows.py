@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from workflows.retention import ARCHIVE_TARGETS, expire_workflows, stale_workflows
+
+
+class Command(BaseCommand):
+    help = "Move workflows not seen within the retention window out of the hot table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=float, default=None,
+                            help="Default: WORKFLOW_RETENTION_DAYS")
+        parser.add_argument("--target", choices=ARCHIVE_TARGETS, default=None,
+                            help="Default: WORKFLOW_ARCHIVE")
+        parser.add_argument("--batch-size", type=int, default=None,
+                            help="Rows per transaction (default: WORKFLOW_EXPIRE_BATCH_SIZE)")
+        parser.add_argument("--max-batches", type=int, default=None,
+                            help="Stop after this many batches (default: until none are stale)")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Only count the stale rows")
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            count = stale_workflows(options["days"]).count()
+            self.stdout.write(f"🗄  {count} workflows would be expired")
+            return
+
+        res = expire_workflows(
+            days=options["days"],
+            batch_size=options["batch_size"],
+            max_batches=options["max_batches"],
+            target=options["target"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✔ Expired {res['expired']} workflows in {res['batches']} batches → {res['target']}"
+        ))
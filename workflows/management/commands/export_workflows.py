@@ -0,0 +1,63 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from workflows.exporters import (
+    EXPORT_FORMATS,
+    export_rows,
+    gzip_stream,
+    iter_csv,
+    iter_ndjson,
+    write_parquet,
+)
+
+
+class Command(BaseCommand):
+    help = "Stream every workflow to NDJSON / CSV / Parquet with constant memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+        parser.add_argument("--output", "-o", default="-",
+                            help="File path, or - for stdout (not for parquet)")
+        parser.add_argument("--platform", default=None)
+        parser.add_argument("--country", default=None)
+        parser.add_argument("--gzip", action="store_true", help="gzip ndjson/csv output")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument("--include-archived", action="store_true",
+                            help="Also export rows moved out by expire_workflows")
+
+    def handle(self, *args, **options):
+        fmt = options["format"]
+        output = options["output"]
+        rows = export_rows(
+            options["platform"], options["country"], options["chunk_size"],
+            include_archived=options["include_archived"],
+        )
+
+        if fmt == "parquet":
+            if output == "-":
+                raise CommandError("Parquet needs --output <file>")
+            try:
+                count = write_parquet(rows, output, batch_size=options["chunk_size"])
+            except RuntimeError as exc:
+                raise CommandError(str(exc))
+            self.stderr.write(self.style.SUCCESS(f"✔ Exported {count} workflows to {output}"))
+            return
+
+        chunks = iter_ndjson(rows) if fmt == "ndjson" else iter_csv(rows)
+
+        if options["gzip"]:
+            out = sys.stdout.buffer if output == "-" else open(output, "wb")
+            data = gzip_stream(chunks)
+        else:
+            out = sys.stdout if output == "-" else open(output, "w", encoding="utf-8", newline="")
+            data = chunks
+
+        try:
+            for block in data:
+                out.write(block)
+        finally:
+            if output != "-":
+                out.close()
+
+        if output != "-":
+            self.stderr.write(self.style.SUCCESS(f"✔ Exported workflows to {output}"))
@@ -1,6 +1,5 @@
 from django.core.management.base import BaseCommand
-from workflows.collectors import collect_forum
-from workflows.tasks import save_items
+from workflows.orchestrator import after_fetch, changed_platforms, run_source
 
 
 class Command(BaseCommand):
@@ -8,12 +7,31 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("country", type=str)
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Page latest.json until already-seen topics; save only changed ones",
+        )
 
     def handle(self, *args, **options):
         country = options["country"]
         self.stdout.write(f"Collecting Forum for {country}...")
 
-        items = collect_forum(country)
-        save_items(items, "Forum", country)
+        if options["incremental"]:
+            stats = run_source("forum", country, incremental=True)
+        else:
+            stats = run_source("forum", country)
 
-        self.stdout.write(self.style.SUCCESS(f"Saved {len(items)} forum items"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Saved {stats['items']} forum items "
+            f"(inserted={stats['inserted']}, updated={stats['updated']}, "
+            f"unchanged={stats['unchanged']})"
+        ))
+
+        post = after_fetch(changed_platforms("forum", stats), f"fetch_forum {country}")
+        if post["expired"]:
+            self.stdout.write(f"Expired {post['expired']['expired']} stale workflows → {post['expired']['target']}")
+        if post["rescored"] is not None:
+            self.stdout.write(f"Normalized scores for {post['rescored']} workflows")
+        for step, error in post["errors"].items():
+            self.stdout.write(self.style.WARNING(f"Post-fetch {step} failed: {error}"))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from workflows.orchestrator import SOURCES, after_fetch, changed_platforms, run_source
+
+
+class Command(BaseCommand):
+    help = "Run any registered collector for <country> through the item pipeline"
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", type=str, help=f"One of {', '.join(SOURCES)}")
+        parser.add_argument("country", type=str)
+
+    def handle(self, *args, **options):
+        source, country = options["source"], options["country"]
+        if source not in SOURCES:
+            raise CommandError(f"Unknown source {source!r} (known: {', '.join(SOURCES)})")
+
+        self.stdout.write(f"Collecting {source} for {country}...")
+        stats = run_source(source, country)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Saved {stats['items']} {source} items in {stats['batches']} batch(es) "
+            f"(inserted={stats['inserted']}, updated={stats['updated']}, "
+            f"unchanged={stats['unchanged']})"
+        ))
+
+        post = after_fetch(changed_platforms(source, stats), f"fetch_source {country}")
+        if post["expired"]:
+            self.stdout.write(f"Expired {post['expired']['expired']} stale workflows → {post['expired']['target']}")
+        if post["rescored"] is not None:
+            self.stdout.write(f"Normalized scores for {post['rescored']} workflows")
+        for step, error in post["errors"].items():
+            self.stdout.write(self.style.WARNING(f"Post-fetch {step} failed: {error}"))
@@ -1,6 +1,5 @@
 from django.core.management.base import BaseCommand
-from workflows.collectors import collect_trends
-from workflows.tasks import save_items
+from workflows.orchestrator import after_fetch, changed_platforms, run_source
 
 
 class Command(BaseCommand):
@@ -13,7 +12,18 @@ class Command(BaseCommand):
         country = options["country"]
         self.stdout.write(f"Collecting Trends for {country}...")
 
-        items = collect_trends(country)
-        save_items(items, "GoogleTrends", country)
+        stats = run_source("trends", country)
 
-        self.stdout.write(self.style.SUCCESS(f"Saved {len(items)} trends items"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Saved {stats['items']} trends items "
+            f"(inserted={stats['inserted']}, updated={stats['updated']}, "
+            f"unchanged={stats['unchanged']})"
+        ))
+
+        post = after_fetch(changed_platforms("trends", stats), f"fetch_trends {country}")
+        if post["expired"]:
+            self.stdout.write(f"Expired {post['expired']['expired']} stale workflows → {post['expired']['target']}")
+        if post["rescored"] is not None:
+            self.stdout.write(f"Normalized scores for {post['rescored']} workflows")
+        for step, error in post["errors"].items():
+            self.stdout.write(self.style.WARNING(f"Post-fetch {step} failed: {error}"))
@@ -1,39 +1,85 @@
-from django.core.management.base import BaseCommand
-from workflows.collectors import (
-    collect_youtube_for_country,
-    collect_forum,
-    collect_trends,
-)
-from workflows.tasks import save_items
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from workflows.orchestrator import DEFAULT_SOURCES, SOURCES, after_fetch, changed_platforms, run_fetch
+from workflows.resolution import resolve_workflows
+
+
+ICONS = {"youtube": "🎥", "forum": "💬", "trends": "📈"}
+
+
+def _csv(value):
+    return [v.strip() for v in value.split(",") if v.strip()]
 
 
 class Command(BaseCommand):
-    help = "Fetch workflows from YouTube, Forum, and Google Trends for US + IN"
+    help = "Fetch workflows from YouTube, Forum, and Google Trends concurrently per country"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--countries",
+            type=_csv,
+            default=None,
+            help="Comma-separated country codes (default: FETCH_COUNTRIES, US,IN)",
+        )
+        parser.add_argument(
+            "--sources",
+            type=_csv,
+            default=None,
+            help=f"Comma-separated sources out of {','.join(SOURCES)}",
+        )
+        parser.add_argument("--workers", type=int, default=None)
+        parser.add_argument(
+            "--deadline",
+            type=float,
+            default=None,
+            help="Per-job deadline in seconds (default: FETCH_JOB_DEADLINE)",
+        )
 
     def handle(self, *args, **options):
-        self.stdout.write("🚀 Starting workflow collection...")
+        countries = [c.upper() for c in (options["countries"] or settings.FETCH_COUNTRIES)]
+        sources = options["sources"] or DEFAULT_SOURCES
+
+        unknown = set(sources) - set(SOURCES)
+        if unknown:
+            raise CommandError(f"Unknown source(s): {', '.join(sorted(unknown))}")
+
+        self.stdout.write(
+            f"🚀 Starting workflow collection: {len(sources)} sources × "
+            f"{len(countries)} countries ({','.join(countries)})"
+        )
 
         total = 0
+        changed = set()  # platforms to rescore
+        for res in run_fetch(
+            countries,
+            sources=sources,
+            max_workers=options["workers"],
+            deadline=options["deadline"],
+        ):
+            label = f"  {ICONS.get(res['source'], '•')} {res['platform']} {res['country']}"
+            if res["status"] == "ok":
+                self.stdout.write(
+                    f"{label} → {res['items']} items in {res['elapsed']}s {res['stats']}"
+                )
+                total += res["items"]
+                changed |= changed_platforms(res["source"], res["stats"])
+            else:
+                self.stdout.write(self.style.WARNING(
+                    f"{label} → {res['status']}: {res['error']}"
+                ))
+                changed.add(res["platform"])  # batches saved before it stopped are not counted
+
+        post = after_fetch(changed, "fetch_workflows")
+        if post["expired"]:
+            self.stdout.write(
+                f"  🗄  Expired {post['expired']['expired']} stale workflows → {post['expired']['target']}"
+            )
+        if post["rescored"] is not None:
+            self.stdout.write(f"  ⚖  Normalized scores for {post['rescored']} workflows")
+        for step, error in post["errors"].items():
+            self.stdout.write(self.style.WARNING(f"  ⚠  Post-fetch {step} failed: {error}"))
 
-        for country in ["US", "IN"]:
-            self.stdout.write(f"🌎 Country = {country}")
-
-            self.stdout.write("  🎥 YouTube...")
-            yt = collect_youtube_for_country(country)
-            save_items(yt, "YouTube", country)
-            self.stdout.write(f"    → {len(yt)} youtube items")
-            total += len(yt)
-
-            self.stdout.write("  💬 Forum...")
-            fr = collect_forum(country)
-            save_items(fr, "Forum", country)
-            self.stdout.write(f"    → {len(fr)} forum items")
-            total += len(fr)
-
-            self.stdout.write("  📈 Google Trends...")
-            tr = collect_trends(country)
-            save_items(tr, "GoogleTrends", country)
-            self.stdout.write(f"    → {len(tr)} trends items")
-            total += len(tr)
+        _, clusters = resolve_workflows()
+        self.stdout.write(f"  🔗 Resolved into {clusters} canonical workflows")
 
         self.stdout.write(self.style.SUCCESS(f"✔ Stored {total} workflows"))
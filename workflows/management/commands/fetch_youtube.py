@@ -1,6 +1,5 @@
 from django.core.management.base import BaseCommand
-from workflows.collectors import collect_youtube_for_country
-from workflows.tasks import save_items
+from workflows.orchestrator import after_fetch, changed_platforms, run_source
 
 
 class Command(BaseCommand):
@@ -8,12 +7,37 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("country", type=str)
+        parser.add_argument(
+            "--pipelined",
+            action="store_true",
+            help="Concurrent paged searches + batched stats lookups",
+        )
+        parser.add_argument(
+            "--refresh-only",
+            action="store_true",
+            help="No searches: re-poll stats of stored videos that are due (tiered)",
+        )
 
     def handle(self, *args, **options):
         country = options["country"]
         self.stdout.write(f"Collecting YouTube for {country}...")
 
-        items = collect_youtube_for_country(country)
-        save_items(items, "YouTube", country)
+        source = "youtube_refresh" if options["refresh_only"] else "youtube"
+        if options["pipelined"] and not options["refresh_only"]:
+            stats = run_source(source, country, pipelined=True)
+        else:
+            stats = run_source(source, country)
 
-        self.stdout.write(self.style.SUCCESS(f"Saved {len(items)} youtube items"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Saved {stats['items']} youtube items "
+            f"(inserted={stats['inserted']}, updated={stats['updated']}, "
+            f"unchanged={stats['unchanged']})"
+        ))
+
+        post = after_fetch(changed_platforms(source, stats), f"fetch_youtube {country}")
+        if post["expired"]:
+            self.stdout.write(f"Expired {post['expired']['expired']} stale workflows → {post['expired']['target']}")
+        if post["rescored"] is not None:
+            self.stdout.write(f"Normalized scores for {post['rescored']} workflows")
+        for step, error in post["errors"].items():
+            self.stdout.write(self.style.WARNING(f"Post-fetch {step} failed: {error}"))
@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+from workflows.scoring import SCORING_METHODS, rescore_all
+
+
+class Command(BaseCommand):
+    help = "Recompute normalized_score for every workflow in one vectorized pass"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--method", choices=SCORING_METHODS, default=None,
+                            help="Default: SCORING['method']")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        count = rescore_all(options["method"])
+        self.stdout.write(self.style.SUCCESS(
+            f"✔ Rescored {count} workflows in {time.perf_counter() - start:.2f}s"
+        ))
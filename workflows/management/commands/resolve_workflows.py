@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+from workflows.resolution import resolve_workflows
+
+
+class Command(BaseCommand):
+    help = "Cluster workflows across platforms into CanonicalWorkflow rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threshold", type=float, default=None,
+                            help="Token Jaccard needed to merge (default RESOLUTION_THRESHOLD)")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        rows, clusters = resolve_workflows(options["threshold"])
+        self.stdout.write(self.style.SUCCESS(
+            f"✔ Resolved {rows} workflows into {clusters} canonical workflows "
+            f"in {time.perf_counter() - start:.1f}s"
+        ))
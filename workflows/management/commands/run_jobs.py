@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+from workflows import scheduler
+from workflows.jobs import claim_next, run_job
+
+
+class Command(BaseCommand):
+    help = "Worker: run queued fetch jobs (from /trigger/) until stopped"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--poll", type=float, default=2.0,
+                            help="Seconds to sleep when the queue is empty")
+        parser.add_argument("--once", action="store_true",
+                            help="Drain the queue and exit")
+        parser.add_argument("--schedule", action="store_true",
+                            help="Also queue due jobs from the adaptive fetch schedule")
+
+    def handle(self, *args, **options):
+        self.stdout.write("🛠  Job worker started")
+        if options["schedule"]:
+            scheduler.ensure_schedules()
+
+        while True:
+            if options["schedule"]:
+                for queued in scheduler.enqueue_due():
+                    self.stdout.write(f"  ⏰ scheduled {queued}")
+
+            job = claim_next()
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(options["poll"])
+                continue
+
+            self.stdout.write(f"  ▶ {job}")
+            run_job(job)
+            if job.status == job.DONE:
+                self.stdout.write(self.style.SUCCESS(f"  ✔ {job} {job.result}"))
+            else:
+                self.stdout.write(self.style.ERROR(f"  ✖ {job} {job.error}"))
+
+        self.stdout.write("Queue empty, exiting.")
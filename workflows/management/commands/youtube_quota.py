@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from workflows.collectors import YOUTUBE_KEYWORDS
+from workflows.quota import KeyPool, plan_searches, search_cost
+
+
+class Command(BaseCommand):
+    help = "Show today's YouTube quota use per key and what the budget still covers"
+
+    def handle(self, *args, **options):
+        pool = KeyPool()
+        if not pool.keys:
+            self.stdout.write(self.style.ERROR("❌ No YouTube API keys configured."))
+            return
+
+        self.stdout.write(f"Quota day {pool.day} (limit {pool.daily_limit} units per key)")
+        for row in pool.usage():
+            state = "exhausted" if row["exhausted"] else f"{pool.daily_limit - row['units']} left"
+            self.stdout.write(f"  {row['key_id']}: {row['units']} units ({state})")
+
+        remaining = pool.remaining()
+        searches = len(plan_searches(YOUTUBE_KEYWORDS, ["US"], remaining))
+        self.stdout.write(self.style.SUCCESS(
+            f"✔ {remaining} units left: full searches for {remaining // (len(YOUTUBE_KEYWORDS) * search_cost())} "
+            f"more country runs ({searches}/{len(YOUTUBE_KEYWORDS)} for the next one)"
+        ))
@@ -0,0 +1,167 @@
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from django.utils import timezone
+
+
+# =====================================================================
+# PROMETHEUS-STYLE REGISTRY
+# =====================================================================
+# In-process and dependency free. Every worker process keeps its own
+# numbers, so scrape each process (or run one) as with prometheus_client
+# without multiprocess mode.
+
+REGISTRY = []
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+COUNT_BUCKETS = (0, 1, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key, extra=()):
+        pairs = [*zip(self.labelnames, key), *extra]
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            lines.extend(self._samples(key, value))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self, key, value):
+        yield f"{self.name}{self._labels(key)} {value}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=SECONDS_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total, n = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            if i < len(counts):
+                counts[i] += 1
+            self._values[key] = (counts, total + value, n + 1)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self, key, value):
+        counts, total, n = value
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            yield f"{self.name}_bucket{self._labels(key, [('le', bound)])} {cumulative}"
+        yield f"{self.name}_bucket{self._labels(key, [('le', '+Inf')])} {n}"
+        yield f"{self.name}_sum{self._labels(key)} {total}"
+        yield f"{self.name}_count{self._labels(key)} {n}"
+
+
+def render():
+    """Text exposition format (version 0.0.4) of every registered metric."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+HTTP_LATENCY = Histogram(
+    "collector_http_request_seconds", "Collector HTTP request latency", ["source", "endpoint"]
+)
+HTTP_REJECTIONS = Counter(
+    "collector_http_rejections_total", "Collector requests rejected with 403/429",
+    ["source", "endpoint", "status"],
+)
+COLLECT_SECONDS = Histogram(
+    "collector_run_seconds", "Wall time of one source pipeline run (collect + save)", ["source"]
+)
+ITEMS_COLLECTED = Histogram(
+    "collector_items", "Items saved by one source pipeline run", ["source"], COUNT_BUCKETS
+)
+UPSERT_SECONDS = Histogram("db_upsert_seconds", "save_items wall time", ["platform"])
+ROWS_CHANGED = Histogram(
+    "db_rows_changed", "Rows per save_items call by outcome",
+    ["platform", "change"], COUNT_BUCKETS,
+)
+SCORING_SECONDS = Histogram("scoring_seconds", "Cross-platform rescore wall time", ["method"])
+API_LATENCY = Histogram(
+    "api_request_seconds", "API request latency", ["view", "method", "status"]
+)
+
+
+# =====================================================================
+# STRUCTURED STAGE LOGS
+# =====================================================================
+
+stage_log = logging.getLogger("workflows.stages")
+
+
+def log_stage(stage, level=logging.INFO, **fields):
+    """One JSON object per line: {"ts", "stage", **fields}."""
+    if stage_log.isEnabledFor(level):
+        stage_log.log(level, json.dumps(
+            {"ts": timezone.now().isoformat(), "stage": stage, **fields}, default=str
+        ))
+
+
+@contextmanager
+def stage(name, **fields):
+    """
+    Time a pipeline stage. Yields a dict the caller can add fields to;
+    on exit it gets "seconds" (and "error" if the stage raised) and is
+    logged with log_stage.
+    """
+    info = dict(fields)
+    start = time.perf_counter()
+    try:
+        yield info
+    except Exception as exc:
+        info["error"] = str(exc)
+        raise
+    finally:
+        info["seconds"] = round(time.perf_counter() - start, 4)
+        log_stage(name, **info)
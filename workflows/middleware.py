@@ -0,0 +1,73 @@
+import re
+import time
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+from . import metrics
+
+try:
+    import brotli
+except ImportError:  # in requirements.txt; without it only gzip is offered
+    brotli = None
+
+
+_accepts_br = re.compile(r"\bbr\b")
+
+
+class RequestMetricsMiddleware:
+    """
+    Observe api_request_seconds{view, method, status} for every request.
+    Streaming responses are timed until their first byte is ready.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+
+        match = getattr(request, "resolver_match", None)
+        metrics.API_LATENCY.observe(
+            time.perf_counter() - start,
+            view=match.view_name.rsplit(".", 1)[-1] if match else "unmatched",
+            method=request.method,
+            status=response.status_code,
+        )
+        return response
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compress responses by Accept-Encoding: brotli when the client takes
+    "br" (and the brotli package is importable), gzip otherwise
+    (Django's GZipMiddleware, streaming included). Bodies under 200
+    bytes and responses that already carry a Content-Encoding (e.g. the
+    gzipped export) are left alone.
+    """
+
+    def process_response(self, request, response):
+        if (
+            brotli is None
+            or response.streaming
+            or response.has_header("Content-Encoding")
+            or len(response.content) < 200
+            or not _accepts_br.search(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        compressed = brotli.compress(response.content, quality=settings.BROTLI_QUALITY)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(compressed))
+        # Same as GZipMiddleware: the body differs now, so a strong ETag can't stay
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
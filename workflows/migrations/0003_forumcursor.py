@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflows', '0002_alter_workflow_options_workflow_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForumCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('country', models.CharField(max_length=8, unique=True)),
+                ('bumped_at', models.DateTimeField(blank=True, null=True)),
+                ('topic_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflows', '0003_forumcursor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkflowSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('captured_at', models.DateTimeField()),
+                ('resolution', models.PositiveSmallIntegerField(choices=[(0, 'raw'), (1, 'hourly'), (2, 'daily')], default=0)),
+                ('views', models.BigIntegerField(default=0)),
+                ('likes', models.BigIntegerField(default=0)),
+                ('comments', models.BigIntegerField(default=0)),
+                ('replies', models.BigIntegerField(default=0)),
+                ('score', models.FloatField(default=0)),
+                ('workflow', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='workflows.workflow')),
+            ],
+            options={
+                'ordering': ['captured_at'],
+                'indexes': [models.Index(fields=['workflow', 'captured_at'], name='snapshot_workflow_time')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:33
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflows', '0004_workflowsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='workflow',
+            index=models.Index(django.db.models.functions.text.Upper('platform'), django.db.models.functions.text.Upper('country'), models.OrderBy(models.F('popularity_score'), descending=True), models.OrderBy(models.F('id'), descending=True), name='workflow_pc_score_ci'),
+        ),
+        migrations.AddIndex(
+            model_name='workflow',
+            index=models.Index(fields=['-popularity_score', '-id'], name='workflow_score'),
+        ),
+        migrations.AddIndex(
+            model_name='workflow',
+            index=models.Index(fields=['-last_seen'], name='workflow_last_seen'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflows', '0006_fetchjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workflow',
+            name='normalized_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='workflow',
+            index=models.Index(fields=['-normalized_score', '-id'], name='workflow_normalized'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflows', '0008_workflow_trending_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CanonicalWorkflow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=500, unique=True)),
+                ('name', models.CharField(max_length=500)),
+                ('member_count', models.PositiveIntegerField(default=0)),
+                ('platforms', models.JSONField(blank=True, default=list)),
+                ('score', models.FloatField(default=0)),
+                ('total_popularity', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-score'],
+                'indexes': [models.Index(fields=['-score', '-id'], name='canonical_score')],
+            },
+        ),
+        migrations.AddField(
+            model_name='workflow',
+            name='canonical',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='members', to='workflows.canonicalworkflow'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS workflow_title_fts ON workflows_workflow "
+            "USING gin (to_tsvector('simple'::regconfig, workflow))"
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS workflows_workflow_fts "
+            "USING fts5(workflow, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            "INSERT INTO workflows_workflow_fts (rowid, workflow) "
+            "SELECT id, workflow FROM workflows_workflow"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS workflow_title_fts")
+    elif vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS workflows_workflow_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflows', '0009_canonicalworkflow'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflows', '0010_workflow_title_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='YouTubeQuota',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key_id', models.CharField(max_length=16)),
+                ('day', models.DateField()),
+                ('units', models.PositiveIntegerField(default=0)),
+                ('exhausted', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('key_id', 'day'), name='youtubequota_key_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.9 on 2026-10-18 10:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflows', '0011_youtubequota'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkflowInsight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(max_length=32)),
+                ('country', models.CharField(max_length=8)),
+                ('workflow_count', models.PositiveIntegerField(default=0)),
+                ('total_views', models.BigIntegerField(default=0)),
+                ('total_likes', models.BigIntegerField(default=0)),
+                ('total_comments', models.BigIntegerField(default=0)),
+                ('total_replies', models.BigIntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('score_histogram', models.JSONField(blank=True, default=dict)),
+                ('top', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['platform', 'country'],
+                'constraints': [models.UniqueConstraint(fields=('platform', 'country'), name='insight_platform_country')],
+            },
+        ),
+    ]
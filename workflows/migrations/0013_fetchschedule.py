@@ -0,0 +1,32 @@
+# Generated by Django 5.2.9 on 2026-10-18 10:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflows', '0012_workflowinsight'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FetchSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=32)),
+                ('country', models.CharField(max_length=8)),
+                ('interval_seconds', models.FloatField()),
+                ('next_run_at', models.DateTimeField()),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+                ('last_status', models.CharField(blank=True, max_length=16)),
+                ('change_rate', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['next_run_at'],
+                'indexes': [models.Index(fields=['next_run_at'], name='fetchschedule_next_run')],
+                'constraints': [models.UniqueConstraint(fields=('source', 'country'), name='fetchschedule_source_country')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 10:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflows', '0013_fetchschedule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workflow',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+    ]
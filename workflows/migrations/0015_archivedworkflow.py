@@ -0,0 +1,36 @@
+# Generated by Django 5.2.9 on 2026-10-18 10:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflows', '0014_workflow_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedWorkflow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField()),
+                ('workflow', models.CharField(max_length=500)),
+                ('platform', models.CharField(choices=[('YouTube', 'YouTube'), ('Forum', 'Forum'), ('GoogleTrends', 'GoogleTrends')], max_length=32)),
+                ('country', models.CharField(max_length=8)),
+                ('source_url', models.URLField(blank=True, max_length=1000)),
+                ('popularity_metrics', models.JSONField(blank=True, default=dict)),
+                ('popularity_score', models.FloatField(default=0)),
+                ('normalized_score', models.FloatField(default=0)),
+                ('trending_score', models.FloatField(default=0)),
+                ('last_seen', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ['-popularity_score'],
+                'indexes': [models.Index(fields=['-popularity_score', '-id'], name='archived_score')],
+                'constraints': [models.UniqueConstraint(fields=('workflow', 'platform', 'country'), name='archivedworkflow_key')],
+            },
+        ),
+    ]
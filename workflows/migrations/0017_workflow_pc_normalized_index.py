@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 10:44
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflows', '0016_httpvalidator'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='workflow',
+            index=models.Index(django.db.models.functions.text.Upper('platform'), django.db.models.functions.text.Upper('country'), models.OrderBy(models.F('normalized_score'), descending=True), models.OrderBy(models.F('id'), descending=True), name='workflow_pc_normalized_ci'),
+        ),
+    ]
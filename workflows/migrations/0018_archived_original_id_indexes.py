@@ -0,0 +1,25 @@
+# Generated by Django 5.2.9 on 2026-10-18 10:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflows', '0017_workflow_pc_normalized_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='archivedworkflow',
+            name='archived_score',
+        ),
+        migrations.AddIndex(
+            model_name='archivedworkflow',
+            index=models.Index(fields=['-normalized_score', '-original_id'], name='archived_normalized'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedworkflow',
+            index=models.Index(fields=['-popularity_score', '-original_id'], name='archived_score'),
+        ),
+    ]
@@ -1,4 +1,32 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Upper
+
+
+class CanonicalWorkflow(models.Model):
+    """
+    One real-world automation ("gmail to google sheets") clustered from
+    Workflow rows across platforms and countries by resolve_workflows.
+    """
+
+    key = models.CharField(max_length=500, unique=True)
+    name = models.CharField(max_length=500)
+
+    member_count = models.PositiveIntegerField(default=0)
+    platforms = models.JSONField(default=list, blank=True)
+
+    # Sum over platforms of the best member's normalized_score
+    score = models.FloatField(default=0)
+    total_popularity = models.FloatField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-score"]
+        indexes = [models.Index(fields=["-score", "-id"], name="canonical_score")]
+
+    def __str__(self):
+        return f"{self.name} ({self.member_count} rows, {', '.join(self.platforms)})"
 
 
 class Workflow(models.Model):
@@ -16,14 +44,292 @@ class Workflow(models.Model):
 
     popularity_metrics = models.JSONField(default=dict, blank=True)
     popularity_score = models.FloatField(default=0)
+    # Cross-platform comparable score (the default ranking), written by scoring
+    normalized_score = models.FloatField(default=0)
+    # Decayed metric velocity, updated by save_items (see trending.py)
+    trending_score = models.FloatField(default=0)
+    # Digest of source_url + metrics + score (tasks.content_hash); save_items
+    # skips rewriting rows whose digest hasn't changed
+    content_hash = models.CharField(max_length=32, blank=True, default="")
 
     last_seen = models.DateTimeField(null=True, blank=True)
 
+    canonical = models.ForeignKey(
+        CanonicalWorkflow,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="members",
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         unique_together = ("workflow", "platform", "country")
         ordering = ["-popularity_score"]
+        indexes = [
+            # list_workflows: case-insensitive platform/country filter + top-N
+            models.Index(
+                Upper("platform"),
+                Upper("country"),
+                F("popularity_score").desc(),
+                F("id").desc(),
+                name="workflow_pc_score_ci",
+            ),
+            # ... and the same for the default sort=normalized
+            models.Index(
+                Upper("platform"),
+                Upper("country"),
+                F("normalized_score").desc(),
+                F("id").desc(),
+                name="workflow_pc_normalized_ci",
+            ),
+            # list_workflows without a platform filter
+            models.Index(fields=["-popularity_score", "-id"], name="workflow_score"),
+            # list_workflows?sort=normalized
+            models.Index(fields=["-normalized_score", "-id"], name="workflow_normalized"),
+            # list_workflows?sort=trending
+            models.Index(fields=["-trending_score", "-id"], name="workflow_trending"),
+            # /api/status/ fallback, known_video_ids
+            models.Index(fields=["-last_seen"], name="workflow_last_seen"),
+        ]
 
     def __str__(self):
         return f"{self.workflow} [{self.platform}/{self.country}]"
+
+
+class ForumCursor(models.Model):
+    """
+    High-water mark of the incremental forum crawl, one row per country.
+    """
+
+    country = models.CharField(max_length=8, unique=True)
+    bumped_at = models.DateTimeField(null=True, blank=True)
+    topic_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.country} @ {self.bumped_at} #{self.topic_id}"
+
+
+class HttpValidator(models.Model):
+    """
+    ETag / Last-Modified of the last saved 200 per http_client.cache_key,
+    sent back by conditional_get. Kept in the DB so concurrent workers
+    never overwrite each other's entries.
+    """
+
+    key = models.CharField(max_length=64, unique=True)
+    etag = models.CharField(max_length=255, blank=True, default="")
+    last_modified = models.CharField(max_length=64, blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.key[:12]} {self.etag or self.last_modified}"
+
+
+class WorkflowSnapshot(models.Model):
+    """
+    One compact row per workflow per fetch. Counters are typed columns
+    rather than JSON so history stays small and cheap to aggregate;
+    compact_snapshots rolls old rows into hourly and daily buckets.
+    """
+
+    RAW, HOURLY, DAILY = 0, 1, 2
+    RESOLUTION_CHOICES = [
+        (RAW, "raw"),
+        (HOURLY, "hourly"),
+        (DAILY, "daily"),
+    ]
+
+    # (workflow, captured_at) index below covers lookups by workflow alone
+    workflow = models.ForeignKey(
+        Workflow, on_delete=models.CASCADE, related_name="snapshots", db_index=False
+    )
+    captured_at = models.DateTimeField()
+    resolution = models.PositiveSmallIntegerField(choices=RESOLUTION_CHOICES, default=RAW)
+
+    views = models.BigIntegerField(default=0)
+    likes = models.BigIntegerField(default=0)
+    comments = models.BigIntegerField(default=0)
+    replies = models.BigIntegerField(default=0)
+    score = models.FloatField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["workflow", "captured_at"], name="snapshot_workflow_time"),
+        ]
+        ordering = ["captured_at"]
+
+    def __str__(self):
+        return f"{self.workflow_id} @ {self.captured_at}"
+
+
+class FetchJob(models.Model):
+    """
+    A queued collector run. /trigger/ enqueues, the run_jobs worker executes.
+    At most one queued/running job exists per (source, country).
+    """
+
+    QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "queued"),
+        (RUNNING, "running"),
+        (DONE, "done"),
+        (FAILED, "failed"),
+    ]
+    ACTIVE = (QUEUED, RUNNING)
+
+    source = models.CharField(max_length=32)
+    country = models.CharField(max_length=8)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    result = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source", "country"],
+                condition=models.Q(status__in=["queued", "running"]),
+                name="fetchjob_one_active",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="fetchjob_status_created"),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.source}/{self.country} [{self.status}]"
+
+
+class YouTubeQuota(models.Model):
+    """
+    Units spent per YouTube API key per quota day (midnight Pacific).
+    Keys are stored as a short sha256 fingerprint, never in clear.
+    """
+
+    key_id = models.CharField(max_length=16)
+    day = models.DateField()
+    units = models.PositiveIntegerField(default=0)
+    exhausted = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["key_id", "day"], name="youtubequota_key_day"),
+        ]
+
+    def __str__(self):
+        return f"{self.key_id} {self.day}: {self.units}"
+
+
+class WorkflowInsight(models.Model):
+    """
+    Dashboard rollup for one (platform, country): row count, counter
+    totals, a log-bucketed score histogram (for percentiles) and the
+    top-N rows. save_items keeps it current from the rows it touches;
+    see insights.py.
+    """
+
+    platform = models.CharField(max_length=32)
+    # Stored upper-case; rows saved as "us" and "US" share one rollup
+    country = models.CharField(max_length=8)
+
+    workflow_count = models.PositiveIntegerField(default=0)
+    total_views = models.BigIntegerField(default=0)
+    total_likes = models.BigIntegerField(default=0)
+    total_comments = models.BigIntegerField(default=0)
+    total_replies = models.BigIntegerField(default=0)
+
+    score_sum = models.FloatField(default=0)
+    # {bucket: rows}, bucket = floor(log10(1 + score) * BUCKETS_PER_DECADE)
+    score_histogram = models.JSONField(default=dict, blank=True)
+    top = models.JSONField(default=list, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["platform", "country"]
+        constraints = [
+            models.UniqueConstraint(fields=["platform", "country"], name="insight_platform_country"),
+        ]
+
+    def __str__(self):
+        return f"{self.platform}/{self.country}: {self.workflow_count} rows"
+
+
+class FetchSchedule(models.Model):
+    """
+    When a (source, country) is fetched next. The interval adapts to how
+    much of each run was new or changed; see scheduler.py.
+    """
+
+    source = models.CharField(max_length=32)
+    country = models.CharField(max_length=8)
+
+    interval_seconds = models.FloatField()
+    next_run_at = models.DateTimeField()
+
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    last_status = models.CharField(max_length=16, blank=True)
+    # (inserted + updated) / items of the last successful run
+    change_rate = models.FloatField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["next_run_at"]
+        constraints = [
+            models.UniqueConstraint(fields=["source", "country"], name="fetchschedule_source_country"),
+        ]
+        indexes = [
+            models.Index(fields=["next_run_at"], name="fetchschedule_next_run"),
+        ]
+
+    def __str__(self):
+        return f"{self.source}/{self.country} every {self.interval_seconds / 3600:.1f}h, next {self.next_run_at}"
+
+
+class ArchivedWorkflow(models.Model):
+    """
+    A Workflow row that expire_workflows moved out of the hot table after
+    it went unseen for WORKFLOW_RETENTION_DAYS. Same key and scores;
+    snapshots and the canonical link are not kept. save_items deletes the
+    archived copy if the workflow shows up again.
+    """
+
+    original_id = models.BigIntegerField()
+    workflow = models.CharField(max_length=500)
+    platform = models.CharField(max_length=32, choices=Workflow.PLATFORM_CHOICES)
+    country = models.CharField(max_length=8)
+
+    source_url = models.URLField(max_length=1000, blank=True)
+    popularity_metrics = models.JSONField(default=dict, blank=True)
+    popularity_score = models.FloatField(default=0)
+    normalized_score = models.FloatField(default=0)
+    trending_score = models.FloatField(default=0)
+
+    last_seen = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-popularity_score"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["workflow", "platform", "country"], name="archivedworkflow_key"
+            ),
+        ]
+        indexes = [
+            # list_workflows?include_archived=true, ties on original_id
+            models.Index(fields=["-normalized_score", "-original_id"], name="archived_normalized"),
+            models.Index(fields=["-popularity_score", "-original_id"], name="archived_score"),
+        ]
+
+    def __str__(self):
+        return f"{self.workflow} [{self.platform}/{self.country}] (archived)"
@@ -0,0 +1,173 @@
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import connections
+from . import collectors  # noqa: F401  (registers the collectors)
+from . import metrics, pipeline, retention, scoring
+from .tasks import save_items
+
+
+logger = logging.getLogger(__name__)
+
+
+# source name -> Collector class (see collectors.py, section 6)
+SOURCES = pipeline.REGISTRY
+
+# What a run covers unless sources are named explicitly
+DEFAULT_SOURCES = ["youtube", "forum", "trends"]
+
+# One save_items at a time across worker threads (SQLite has one writer)
+_save_lock = threading.Lock()
+
+
+def _locked_save(items, platform, country):
+    with _save_lock:
+        return save_items(items, platform, country)
+
+
+def run_source(source, country, stop=None, save=save_items, **options):
+    """
+    Run one registered collector through the item pipeline (collect →
+    normalize → dedupe → score → batch-save), timed and logged as
+    "pipeline". Returns the pipeline stats.
+    """
+    collector = SOURCES[source](country, **options)
+    with metrics.stage("pipeline", source=source, country=country) as info:
+        stats = pipeline.run(collector, save=save, stop=stop)
+        info.update(stats)
+    metrics.COLLECT_SECONDS.observe(info["seconds"], source=source)
+    metrics.ITEMS_COLLECTED.observe(stats["items"], source=source)
+    return stats
+
+
+def changed_platforms(source, stats):
+    """The platform of `source` if its run inserted or updated rows."""
+    if stats.get("inserted", 0) + stats.get("updated", 0):
+        return {SOURCES[source].platform}
+    return set()
+
+
+def after_fetch(platforms, context="fetch"):
+    """
+    Post-fetch hook shared by run_job and every fetch_* command: expire
+    stale rows (retention.after_fetch), then rescore `platforms` plus the
+    platforms that lost rows to expiry (scoring.after_fetch).
+
+    The fetch has already saved its rows, so a failing step is logged
+    with `context` and reported instead of raised. Returns
+    {"expired": stats or None, "rescored": rows or None,
+     "errors": {"expire" | "score": message}}.
+    """
+    done = {"expired": None, "rescored": None, "errors": {}}
+    changed = set(platforms)
+    try:
+        done["expired"] = retention.after_fetch()
+    except Exception as exc:
+        logger.exception("%s: post-fetch expiry failed", context)
+        done["errors"]["expire"] = str(exc)
+    else:
+        if done["expired"]:
+            changed.update(done["expired"]["platforms"])
+    try:
+        done["rescored"] = scoring.after_fetch(changed)
+    except Exception as exc:
+        logger.exception("%s: post-fetch rescoring failed", context)
+        done["errors"]["score"] = str(exc)
+    return done
+
+
+def _run_job(source, country, limiter, started, stop):
+    with limiter:
+        started[(source, country)] = time.monotonic()
+        try:
+            return run_source(source, country, stop=stop, save=_locked_save)
+        finally:
+            # Collectors and saves touch the DB; don't leak one connection per thread.
+            connections.close_all()
+
+
+def run_fetch(countries, sources=None, max_workers=None, deadline=None):
+    """
+    Run every source x country pipeline concurrently on a bounded thread
+    pool. Each job streams its items into save_items batch by batch.
+
+    Generator: yields one dict per job, in completion order:
+    {"source", "country", "platform", "status", "items", "stats",
+     "elapsed", "error"} where status is "ok", "error" or "timeout".
+
+    - FETCH_SOURCE_CONCURRENCY caps parallel jobs per source
+    - `deadline` (seconds, FETCH_JOB_DEADLINE) counts from when a job
+      actually starts; a late job is told to stop pulling items, and the
+      batches it saved before that are kept
+    - saves are serialized across jobs by a lock
+    """
+    sources = sources or DEFAULT_SOURCES
+    max_workers = max_workers or settings.FETCH_MAX_WORKERS
+    deadline = deadline or settings.FETCH_JOB_DEADLINE
+
+    limiters = {
+        source: threading.BoundedSemaphore(
+            settings.FETCH_SOURCE_CONCURRENCY.get(source, max_workers)
+        )
+        for source in sources
+    }
+    started = {}
+    stops = {}
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+    pending = {}
+    for country in countries:
+        for source in sources:
+            stop = stops[(source, country)] = threading.Event()
+            fut = executor.submit(_run_job, source, country, limiters[source], started, stop)
+            pending[fut] = (source, country)
+
+    try:
+        while pending:
+            done, _ = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+
+            for fut in done:
+                source, country = pending.pop(fut)
+                yield _finish(fut, source, country, started)
+
+            now = time.monotonic()
+            for fut, (source, country) in list(pending.items()):
+                start = started.get((source, country))
+                if start is not None and now - start > deadline:
+                    del pending[fut]
+                    stops[(source, country)].set()
+                    yield _result(source, country, "timeout", elapsed=now - start,
+                                  error=f"exceeded {deadline}s deadline")
+    finally:
+        # Stopped jobs exit at their next item (or once a blocked HTTP
+        # call times out); nothing waits for them.
+        for stop in stops.values():
+            stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _finish(fut, source, country, started):
+    elapsed = time.monotonic() - started.get((source, country), time.monotonic())
+    try:
+        stats = fut.result()
+    except Exception as exc:
+        return _result(source, country, "error", elapsed=elapsed, error=str(exc))
+
+    items = stats.pop("items")
+    return _result(source, country, "ok", items=items, stats=stats, elapsed=elapsed)
+
+
+def _result(source, country, status, items=0, stats=None, elapsed=0.0, error=""):
+    return {
+        "source": source,
+        "country": country,
+        "platform": SOURCES[source].platform,
+        "status": status,
+        "items": items,
+        "stats": stats or {},
+        "elapsed": round(elapsed, 2),
+        "error": error,
+    }
@@ -0,0 +1,156 @@
+from collections import OrderedDict
+from itertools import islice
+
+from django.conf import settings
+
+from .tasks import save_items
+
+
+# =====================================================================
+# COLLECTOR REGISTRY
+# =====================================================================
+
+# registry name -> Collector subclass; filled by @register in collectors.py
+REGISTRY = {}
+
+
+def register(cls):
+    REGISTRY[cls.name] = cls
+    return cls
+
+
+class Collector:
+    """
+    One data source.
+
+    Subclasses set `name` (registry key used by the commands, the
+    orchestrator and /trigger/) and `platform` (label stored on Workflow),
+    and implement iter_items() as a generator of raw items:
+    {"workflow", "source_url", "metrics", optional "score"}.
+    The generator may `return` a checkpoint callable that persists what
+    the run has seen (validators, crawl cursors); run() calls it only
+    once every item has been saved.
+    Per-run options (e.g. pipelined=True) arrive as keyword arguments.
+    """
+
+    name = None
+    platform = None
+
+    def __init__(self, country, **options):
+        self.country = country
+        self.options = options
+
+    def iter_items(self):
+        raise NotImplementedError
+
+    def normalize(self, item):
+        """Clean one raw item; None drops it."""
+        title = (item.get("workflow") or "").strip()
+        if not title:
+            return None
+        return {
+            "workflow": title[:500],
+            "source_url": (item.get("source_url") or "")[:1000],
+            "metrics": item.get("metrics") or {},
+            "score": item.get("score"),
+        }
+
+    def score(self, item):
+        """Raw score: the collector's own, else SCORING metric_weights."""
+        if item["score"] is not None:
+            return round(float(item["score"]), 2)
+        weights = settings.SCORING["metric_weights"].get(self.platform, {})
+        return round(
+            sum(float(item["metrics"].get(metric) or 0) * w for metric, w in weights.items()), 2
+        )
+
+
+# =====================================================================
+# STAGES — generators, one item in flight at a time
+# =====================================================================
+
+def checkpointed(items, done):
+    """Pass items through and keep the generator's return value in `done`."""
+    done.append((yield from items))
+
+
+def until(items, stop):
+    """Stop pulling from the collector once `stop` (threading.Event) is set."""
+    for item in items:
+        if stop is not None and stop.is_set():
+            return
+        yield item
+
+
+def normalize(items, collector):
+    for item in items:
+        item = collector.normalize(item)
+        if item is not None:
+            yield item
+
+
+def dedupe(items, window=None):
+    """
+    Drop titles already seen among the last `window` distinct titles
+    (first wins, like save_items within one call). Memory stays bounded;
+    a repeat from further back just upserts the same row again.
+    """
+    window = window or settings.PIPELINE_DEDUPE_WINDOW
+    seen = OrderedDict()
+    for item in items:
+        title = item["workflow"]
+        if title in seen:
+            continue
+        seen[title] = None
+        if len(seen) > window:
+            seen.popitem(last=False)
+        yield item
+
+
+def score(items, collector):
+    for item in items:
+        item["score"] = collector.score(item)
+        yield item
+
+
+def batches(items, size):
+    items = iter(items)
+    while batch := list(islice(items, size)):
+        yield batch
+
+
+def batch_save(items, platform, country, batch_size=None, save=save_items):
+    """
+    save_items() every `batch_size` items (SAVE_BATCH_SIZE), so at most
+    one batch is held in memory. Pulling the next batch is what drives
+    the collector, so a slow save slows collection down (backpressure).
+    """
+    stats = {"items": 0, "batches": 0, "inserted": 0, "updated": 0, "unchanged": 0}
+    for batch in batches(items, batch_size or settings.SAVE_BATCH_SIZE):
+        for key, n in save(batch, platform, country).items():
+            stats[key] += n
+        stats["items"] += len(batch)
+        stats["batches"] += 1
+    return stats
+
+
+def run(collector, batch_size=None, save=save_items, stop=None):
+    """
+    collect → normalize → dedupe → score → batch-save for one collector.
+    Returns {"items", "batches", "inserted", "updated", "unchanged"}.
+
+    The collector's checkpoint runs after the last batch is saved; a
+    collector that was stopped early or a save that raised leaves it
+    untouched, so the next run fetches the same data again.
+    """
+    items = collector.iter_items()
+    done = []
+    try:
+        stream = score(dedupe(normalize(until(checkpointed(items, done), stop), collector)), collector)
+        stats = batch_save(stream, collector.platform, collector.country, batch_size, save)
+    finally:
+        items.close()
+
+    if done and done[0] is not None:
+        done[0]()
+    return stats
@@ -0,0 +1,97 @@
+import hashlib
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import YouTubeQuota
+
+
+# Quota units per call, see https://developers.google.com/youtube/v3/determine_quota_cost
+QUOTA_COST = {"search": 100, "videos": 1}
+IDS_PER_VIDEOS_CALL = 50  # videos.list accepts at most 50 ids
+
+# YouTube daily quotas reset at midnight Pacific time.
+QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+
+
+def quota_day(now=None):
+    return (now or timezone.now()).astimezone(QUOTA_TZ).date()
+
+
+def key_id(key):
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+class KeyPool:
+    """
+    YouTube API keys with per-key daily unit accounting in YouTubeQuota.
+
+    Units are reserved with a conditional UPDATE before every call, so
+    concurrent collectors (one per country) share the budget without
+    overspending a key. The least used key that can afford a call wins.
+    """
+
+    def __init__(self, keys=None, daily_limit=None, day=None):
+        keys = settings.YOUTUBE_API_KEYS if keys is None else keys
+        self.keys = {key_id(k): k for k in keys}
+        self.daily_limit = daily_limit or settings.YOUTUBE_DAILY_QUOTA
+        self.day = day or quota_day()
+        self.spent = 0
+
+        YouTubeQuota.objects.bulk_create(
+            [YouTubeQuota(key_id=k, day=self.day) for k in self.keys],
+            ignore_conflicts=True,
+        )
+
+    def _rows(self):
+        return YouTubeQuota.objects.filter(day=self.day, key_id__in=list(self.keys))
+
+    def remaining(self):
+        return sum(
+            max(self.daily_limit - units, 0)
+            for units in self._rows().filter(exhausted=False).values_list("units", flat=True)
+        )
+
+    def reserve(self, endpoint, skip=()):
+        """
+        Charge one `endpoint` call to a key and return that key, or None
+        if no key (outside `skip`) has enough units left today.
+        """
+        cost = QUOTA_COST[endpoint]
+        affordable = self._rows().filter(exhausted=False, units__lte=self.daily_limit - cost)
+        for kid in affordable.order_by("units").values_list("key_id", flat=True):
+            if self.keys[kid] in skip:
+                continue
+            if affordable.filter(key_id=kid).update(units=F("units") + cost):
+                self.spent += cost
+                return self.keys[kid]
+        return None
+
+    def exhaust(self, key):
+        """Take a key out of rotation until the next quota day."""
+        self._rows().filter(key_id=key_id(key)).update(exhausted=True)
+
+    def usage(self):
+        return list(self._rows().order_by("key_id").values("key_id", "units", "exhausted"))
+
+
+def search_cost(pages=1):
+    """Units for one keyword x region search of `pages` pages, stats included."""
+    return pages * (QUOTA_COST["search"] + QUOTA_COST["videos"])
+
+
+def plan_searches(keywords, regions, budget, pages=1, day=None):
+    """
+    The (keyword, region) searches that fit in `budget` units, each charged
+    with the videos.list call its results need. When the budget can't
+    cover every pair, the starting pair rotates daily so all pairs still
+    get searched over a few days.
+    """
+    pairs = [(kw, region) for region in regions for kw in keywords]
+    n = min(len(pairs), budget // search_cost(pages))
+    if not n:
+        return []
+    offset = (day or quota_day()).toordinal() % len(pairs)
+    return (pairs[offset:] + pairs[:offset])[:n]
@@ -0,0 +1,47 @@
+from decimal import Decimal
+
+from django.utils.functional import Promise
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to DRF's json-based renderer
+    orjson = None
+
+
+def _default(obj):
+    # What orjson doesn't know natively but DRF's encoder does
+    if isinstance(obj, Promise):
+        return str(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(data):
+    """
+    Compact UTF-8 JSON bytes, as JSONRenderer would write them.
+    Datetimes end in "Z" like DRF's encoder.
+    """
+    if orjson is None:
+        return JSONRenderer().render(data)
+    return orjson.dumps(data, default=_default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    Drop-in for DRF's JSONRenderer that serializes with orjson (several
+    times faster on large row lists). Used by every DRF view through
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"].
+    """
+
+    media_type = "application/json"
+    format = "json"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return dumps(data)
@@ -0,0 +1,230 @@
+import re
+import unicodedata
+from itertools import combinations
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from . import leaderboard
+from .models import CanonicalWorkflow, Workflow
+from .tasks import bulk_update_column
+
+
+# Words that say nothing about *which* automation a title is about
+STOPWORDS = {
+    "n8n", "a", "an", "and", "the", "to", "in", "on", "of", "for", "with",
+    "using", "via", "how", "your", "you", "my", "is", "it", "this", "from",
+    "tutorial", "guide", "step", "by", "easy", "full", "complete", "beginner",
+    "beginners", "free", "new", "workflow", "workflows", "automate",
+}
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+_MERSENNE = (1 << 31) - 1  # keeps (a * x + b) inside uint64
+
+
+def _words(text):
+    """
+    Words of a lowercased title in any script. Letters, digits and
+    combining marks make up words; \\W alone would split Hindi words at
+    their vowel signs. ASCII titles take the regex fast path.
+    """
+    if text.isascii():
+        return _NON_WORD.sub(" ", text).split()
+    return "".join(
+        c if c.isalnum() or unicodedata.category(c)[0] == "M" else " " for c in text
+    ).split()
+
+
+def title_tokens(title):
+    """
+    Normalized token set of a title: lowercase, punctuation/emoji
+    stripped, stopwords and bare numbers dropped, naive plural folding.
+    """
+    tokens = set()
+    for word in _words(title.lower()):
+        if word in STOPWORDS or word.isdigit():
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.add(word)
+    return frozenset(tokens)
+
+
+def minhash_signatures(token_sets, num_perm, seed=1, chunk_size=20000):
+    """
+    (num_perm, n) uint64 MinHash matrix. Each permutation is
+    (a * x + b) mod (2^31 - 1) over per-token random ids, and the minimum
+    per document comes from one np.minimum.reduceat per chunk.
+    Empty token sets get an all-max column, which only matches itself.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _MERSENNE, num_perm, dtype=np.uint64)[:, None]
+    b = rng.integers(0, _MERSENNE, num_perm, dtype=np.uint64)[:, None]
+
+    vocab = {}
+    for tokens in token_sets:
+        for token in tokens:
+            vocab.setdefault(token, len(vocab))
+    token_values = rng.integers(0, _MERSENNE, max(len(vocab), 1), dtype=np.uint64)
+
+    sigs = np.full((num_perm, len(token_sets)), np.iinfo(np.uint64).max, dtype=np.uint64)
+    for start in range(0, len(token_sets), chunk_size):
+        chunk = token_sets[start:start + chunk_size]
+        lengths = np.fromiter((len(t) for t in chunk), dtype=np.int64, count=len(chunk))
+        nonempty = np.flatnonzero(lengths)
+        if not len(nonempty):
+            continue
+
+        flat = np.fromiter(
+            (vocab[token] for i in nonempty for token in chunk[i]),
+            dtype=np.int64,
+            count=int(lengths.sum()),
+        )
+        offsets = np.concatenate(([0], np.cumsum(lengths[nonempty])[:-1]))
+        hashed = (a * token_values[flat][None, :] + b) % _MERSENNE
+        sigs[:, start + nonempty] = np.minimum.reduceat(hashed, offsets, axis=1)
+    return sigs
+
+
+def _candidate_groups(sigs, bands, max_bucket):
+    """
+    LSH banding: rows that agree on every value of some band share a
+    bucket. Buckets bigger than `max_bucket` are skipped (they come from
+    near-empty titles and would make verification quadratic).
+    """
+    rows = sigs.shape[0] // bands
+    mult = np.random.default_rng(7).integers(1, 1 << 61, rows, dtype=np.uint64)[:, None]
+
+    for band in range(bands):
+        with np.errstate(over="ignore"):
+            keys = (sigs[band * rows:(band + 1) * rows] * mult).sum(axis=0)
+        order = np.argsort(keys, kind="stable")
+        bounds = np.flatnonzero(np.diff(keys[order])) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [len(order)]))
+        sizes = ends - starts
+        for g in np.flatnonzero((sizes > 1) & (sizes <= max_bucket)):
+            yield order[starts[g]:ends[g]]
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i, j):
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            self.parent[rj] = ri
+            return True
+        return False
+
+
+def cluster_titles(titles, threshold=None, bands=None, rows=None, max_bucket=200):
+    """
+    Cluster titles whose token Jaccard similarity >= threshold.
+    Returns one cluster label (root index) per title.
+    """
+    threshold = threshold or settings.RESOLUTION_THRESHOLD
+    bands = bands or settings.RESOLUTION_BANDS
+    rows = rows or settings.RESOLUTION_ROWS
+
+    token_sets = [title_tokens(t) for t in titles]
+    uf = _UnionFind(len(titles))
+
+    # Identical token sets never need hashing or verification.
+    first = {}
+    for i, tokens in enumerate(token_sets):
+        if tokens:
+            uf.union(first.setdefault(tokens, i), i)
+
+    reps = list(first.values())
+    sigs = minhash_signatures([token_sets[i] for i in reps], bands * rows)
+    for group in _candidate_groups(sigs, bands, max_bucket):
+        for x, y in combinations(group.tolist(), 2):
+            i, j = reps[x], reps[y]
+            if uf.find(i) == uf.find(j):
+                continue
+            ti, tj = token_sets[i], token_sets[j]
+            if len(ti & tj) / len(ti | tj) >= threshold:
+                uf.union(i, j)
+
+    return [uf.find(i) for i in range(len(titles))]
+
+
+def resolve_workflows(threshold=None):
+    """
+    Rebuild CanonicalWorkflow from every Workflow row and point each row
+    at its cluster. Returns (rows, clusters).
+    """
+    rows = list(
+        Workflow.objects.order_by("id").values_list(
+            "id", "workflow", "platform", "popularity_score", "normalized_score"
+        )
+    )
+    if not rows:
+        CanonicalWorkflow.objects.all().delete()
+        return 0, 0
+
+    labels = cluster_titles([r[1] for r in rows], threshold)
+
+    clusters = {}
+    for row, label in zip(rows, labels):
+        clusters.setdefault(label, []).append(row)
+
+    canon = {}
+    member_keys = {}
+    for members in clusters.values():
+        best = max(members, key=lambda r: r[3])
+        key = " ".join(sorted(title_tokens(best[1]))) or best[1].lower()
+        key = key[:500]
+
+        best_by_platform = {}
+        for _, _, platform, _, normalized in members:
+            best_by_platform[platform] = max(best_by_platform.get(platform, 0), normalized)
+
+        entry = canon.setdefault(key, {
+            "name": best[1][:500], "members": 0, "platforms": {}, "popularity": 0.0,
+        })
+        entry["members"] += len(members)
+        entry["popularity"] += sum(r[3] for r in members)
+        for platform, normalized in best_by_platform.items():
+            entry["platforms"][platform] = max(entry["platforms"].get(platform, 0), normalized)
+        for r in members:
+            member_keys[r[0]] = key
+
+    with transaction.atomic():
+        CanonicalWorkflow.objects.bulk_create(
+            [
+                CanonicalWorkflow(
+                    key=key,
+                    name=e["name"],
+                    member_count=e["members"],
+                    platforms=sorted(e["platforms"]),
+                    score=round(sum(e["platforms"].values()), 4),
+                    total_popularity=round(e["popularity"], 4),
+                )
+                for key, e in canon.items()
+            ],
+            batch_size=5000,
+            update_conflicts=True,
+            unique_fields=["key"],
+            update_fields=["name", "member_count", "platforms", "score", "total_popularity", "updated_at"],
+        )
+        ids = dict(CanonicalWorkflow.objects.values_list("key", "id"))
+
+        workflow_ids = list(member_keys)
+        bulk_update_column(
+            "canonical_id", workflow_ids, [ids[member_keys[w]] for w in workflow_ids], "bigint"
+        )
+        CanonicalWorkflow.objects.filter(members__isnull=True).delete()
+        # Cached leaderboard rows carry the canonical id
+        transaction.on_commit(leaderboard.invalidate)
+
+    return len(rows), len(canon)
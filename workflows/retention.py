@@ -0,0 +1,137 @@
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import insights, leaderboard, search
+from .exporters import gzip_stream, iter_ndjson
+from .metrics import stage
+from .models import ArchivedWorkflow, Workflow
+
+
+ARCHIVE_TARGETS = ("table", "ndjson")
+
+# Columns copied into ArchivedWorkflow / the NDJSON files (plus "id")
+ARCHIVE_FIELDS = [
+    "workflow", "platform", "country", "source_url", "popularity_metrics",
+    "popularity_score", "normalized_score", "trending_score", "last_seen", "created_at",
+]
+ARCHIVE_KEY = ["workflow", "platform", "country"]
+
+# Holds the "expired recently" marker for after_fetch
+EXPIRE_LOCK_KEY = "retention:after-fetch"
+
+
+def stale_workflows(days=None, now=None):
+    """Rows not seen within `days` (WORKFLOW_RETENTION_DAYS); never-seen rows count from created_at."""
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=days or settings.WORKFLOW_RETENTION_DAYS)
+    return Workflow.objects.filter(
+        Q(last_seen__lt=cutoff) | Q(last_seen__isnull=True, created_at__lt=cutoff)
+    )
+
+
+def _archive_table(rows, now):
+    ArchivedWorkflow.objects.bulk_create(
+        [
+            ArchivedWorkflow(original_id=row["id"], archived_at=now,
+                             **{name: row[name] for name in ARCHIVE_FIELDS})
+            for row in rows
+        ],
+        update_conflicts=True,
+        unique_fields=ARCHIVE_KEY,
+        update_fields=[f for f in ARCHIVE_FIELDS if f not in ARCHIVE_KEY] + ["original_id", "archived_at"],
+    )
+
+
+def _archive_ndjson(rows, now, directory):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"workflows-{now:%Y%m%dT%H%M%S}-{rows[0]['id']}.ndjson.gz")
+    with open(path, "wb") as fh:
+        for block in gzip_stream(iter_ndjson(rows)):
+            fh.write(block)
+    return path
+
+
+def expire_workflows(days=None, batch_size=None, max_batches=None, target=None, now=None):
+    """
+    Move stale rows out of the hot table, `batch_size` rows
+    (WORKFLOW_EXPIRE_BATCH_SIZE) per transaction, oldest last_seen first.
+
+    Rows are read again inside the transaction with the staleness filter,
+    so one that a concurrent fetch has just seen is never archived.
+    target="table" upserts them into ArchivedWorkflow; "ndjson" writes
+    one gzipped NDJSON file per batch under WORKFLOW_ARCHIVE_DIR before
+    the rows are deleted, so a failed delete can only duplicate, never
+    lose, a row. Either way the rows leave the SQLite search table and
+    the insights rollups, their snapshots go with them, and the cached
+    leaderboards are invalidated.
+
+    Returns {"expired": n, "batches": n, "target": target, "platforms": [...]}.
+    """
+    target = target or settings.WORKFLOW_ARCHIVE
+    if target not in ARCHIVE_TARGETS:
+        raise ValueError(f"Unknown archive target {target!r}")
+    batch_size = batch_size or settings.WORKFLOW_EXPIRE_BATCH_SIZE
+    now = now or timezone.now()
+    stale = stale_workflows(days, now).order_by("last_seen", "id")
+
+    stats = {"expired": 0, "batches": 0, "target": target}
+    platforms = set()
+    with stage("expire", target=target) as info:
+        while max_batches is None or stats["batches"] < max_batches:
+            ids = list(stale.values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+
+            with transaction.atomic():
+                # Re-check under the write lock (row locks on Postgres, the
+                # IMMEDIATE transaction on SQLite): a save_items that bumped
+                # last_seen since the id scan keeps its row.
+                rows = list(
+                    stale.filter(id__in=ids).select_for_update().values("id", *ARCHIVE_FIELDS)
+                )
+                if not rows:
+                    continue
+                ids = [row["id"] for row in rows]
+
+                if target == "ndjson":
+                    _archive_ndjson(rows, now, settings.WORKFLOW_ARCHIVE_DIR)
+                else:
+                    _archive_table(rows, now)
+                search.unindex(ids)
+                Workflow.objects.filter(id__in=ids).delete()
+
+                # After the delete, so a rollup rebuilt from scratch is right too
+                groups = {}
+                for row in rows:
+                    old = {name: row[name] for name in insights.TOP_FIELDS}
+                    groups.setdefault((row["platform"], row["country"].upper()), []).append((old, None))
+                for (platform, country), changes in groups.items():
+                    insights.apply_changes(platform, country, changes)
+
+                transaction.on_commit(leaderboard.invalidate)
+
+            stats["expired"] += len(rows)
+            stats["batches"] += 1
+            platforms.update(platform for platform, _ in groups)
+        info.update(stats)
+    stats["platforms"] = sorted(platforms)
+    return stats
+
+
+def after_fetch():
+    """
+    Post-fetch hook: expire up to WORKFLOW_EXPIRE_MAX_BATCHES batches,
+    at most once per WORKFLOW_EXPIRE_INTERVAL across every process that
+    shares the cache. Returns the expire stats, or None when skipped.
+    """
+    if not settings.WORKFLOW_EXPIRE_AFTER_FETCH:
+        return None
+    if not cache.add(EXPIRE_LOCK_KEY, timezone.now().isoformat(), settings.WORKFLOW_EXPIRE_INTERVAL):
+        return None
+    return expire_workflows(max_batches=settings.WORKFLOW_EXPIRE_MAX_BATCHES)
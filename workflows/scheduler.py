@@ -0,0 +1,130 @@
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import jobs
+from .models import FetchJob, FetchSchedule, Workflow
+
+
+def _bounds(source):
+    """(shortest, starting, longest) interval of a source, in seconds."""
+    return tuple(hours * 3600 for hours in settings.SCHEDULE_INTERVALS[source])
+
+
+def _jittered(seconds):
+    jitter = settings.SCHEDULE_JITTER
+    return timedelta(seconds=seconds * random.uniform(1 - jitter, 1 + jitter))
+
+
+def change_rate(stats):
+    """Share of a run's items that were new or changed (0 when it saw nothing)."""
+    items = stats.get("items") or 0
+    if not items:
+        return 0.0
+    return (stats.get("inserted", 0) + stats.get("updated", 0)) / items
+
+
+def adapt_interval(source, interval, rate):
+    """Halve the interval for hot data, stretch it 1.5x for static data."""
+    shortest, _, longest = _bounds(source)
+    if rate >= settings.SCHEDULE_HOT_RATE:
+        interval /= 2
+    elif rate <= settings.SCHEDULE_COLD_RATE:
+        interval *= 1.5
+    return min(max(interval, shortest), longest)
+
+
+def ensure_schedules(countries=None, now=None):
+    """
+    Create the missing (source, country) rows for SCHEDULE_INTERVALS x
+    SCHEDULE_COUNTRIES. First runs are spread over one jitter window so
+    a fresh deployment doesn't fire every job at once.
+    """
+    countries = countries or settings.SCHEDULE_COUNTRIES
+    now = now or timezone.now()
+    rows = []
+    for source in settings.SCHEDULE_INTERVALS:
+        start = _bounds(source)[1]
+        for country in countries:
+            rows.append(FetchSchedule(
+                source=source,
+                country=country,
+                interval_seconds=start,
+                next_run_at=now + timedelta(seconds=random.uniform(0, start * settings.SCHEDULE_JITTER)),
+            ))
+    FetchSchedule.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+def enqueue_due(now=None):
+    """
+    Queue a job for every schedule whose next_run_at has passed.
+
+    Each row is claimed with a conditional UPDATE that moves next_run_at
+    one interval ahead, so two schedulers never queue it twice and a job
+    whose worker dies is still retried later. A (source, country) that
+    already has a queued or running job (e.g. from /trigger/) coalesces
+    into it instead of overlapping. Returns the newly queued jobs.
+    """
+    now = now or timezone.now()
+    due = FetchSchedule.objects.filter(next_run_at__lte=now).values_list(
+        "id", "source", "country", "interval_seconds", "next_run_at"
+    )
+
+    queued = []
+    for pk, source, country, interval, next_run_at in due:
+        claimed = FetchSchedule.objects.filter(pk=pk, next_run_at=next_run_at).update(
+            next_run_at=now + _jittered(interval)
+        )
+        if not claimed:
+            continue
+        job, created = jobs.enqueue(source, country)
+        if created:
+            queued.append(job)
+    return queued
+
+
+def record(job):
+    """
+    Feed a finished job back into its schedule: adapt the interval from
+    the run's change rate and set the next run one (jittered) interval
+    after it. Failed runs keep their interval. Jobs without a schedule
+    (manual triggers for other pairs) are ignored.
+    """
+    schedule = FetchSchedule.objects.filter(source=job.source, country=job.country).first()
+    if schedule is None:
+        return None
+
+    if job.status == FetchJob.DONE:
+        schedule.change_rate = round(change_rate(job.result), 4)
+        schedule.interval_seconds = adapt_interval(
+            job.source, schedule.interval_seconds, schedule.change_rate
+        )
+
+    finished = job.finished_at or timezone.now()
+    schedule.last_run_at = finished
+    schedule.last_status = job.status
+    schedule.next_run_at = finished + _jittered(schedule.interval_seconds)
+    schedule.save()
+    return schedule
+
+
+def schedule_status():
+    """
+    (last_run, next_run, schedules) for /api/status/. Without any
+    scheduled run yet, last_run falls back to the newest last_seen
+    (fetches from fetch_workflows or an external cron).
+    """
+    schedules = list(FetchSchedule.objects.order_by("next_run_at", "source", "country"))
+    next_run = schedules[0].next_run_at if schedules else None
+
+    last_run = max((s.last_run_at for s in schedules if s.last_run_at), default=None)
+    if last_run is None:
+        last_run = (
+            Workflow.objects.exclude(last_seen__isnull=True)
+            .order_by("-last_seen")
+            .values_list("last_seen", flat=True)
+            .first()
+        )
+    return last_run, next_run, schedules
@@ -0,0 +1,124 @@
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from . import leaderboard
+from .metrics import SCORING_SECONDS, stage
+from .models import Workflow
+from .tasks import bulk_update_column
+
+
+SCORING_METHODS = ("zscore", "percentile", "log")
+SCORING_METRICS = ("views", "likes", "comments", "replies", "trend_score")
+
+
+def load_metrics(qs=None):
+    """
+    Pull (id, platform, metric matrix) for every row in one query.
+    JSON keys are extracted by the database, not in Python.
+
+    Returns (ids int64[n], platforms object[n], metrics float64[n, m]).
+    """
+    qs = Workflow.objects.all() if qs is None else qs
+    rows = list(
+        qs.order_by().values_list(
+            "id", "platform", *(f"popularity_metrics__{m}" for m in SCORING_METRICS)
+        )
+    )
+    if not rows:
+        return np.empty(0, np.int64), np.empty(0, object), np.empty((0, len(SCORING_METRICS)))
+
+    table = np.array(rows, dtype=object)
+    ids = table[:, 0].astype(np.int64)
+    platforms = table[:, 1]
+    metrics = np.array(
+        np.where(table[:, 2:] == None, 0, table[:, 2:]),  # noqa: E711 (elementwise)
+        dtype=np.float64,
+    )
+    return ids, platforms, np.nan_to_num(metrics)
+
+
+def _percentile(x):
+    if len(x) == 1:
+        return np.full(1, 100.0)
+    ordered = np.sort(x)
+    # mid-rank, so ties share one percentile
+    ranks = (np.searchsorted(ordered, x, "left") + np.searchsorted(ordered, x, "right") - 1) / 2
+    return 100.0 * ranks / (len(x) - 1)
+
+
+def _zscore(x):
+    x = np.log1p(x)
+    std = x.std()
+    z = (x - x.mean()) / std if std > 0 else np.zeros_like(x)
+    return 100.0 / (1.0 + np.exp(-z))  # squash to 0..100
+
+
+def _log(x):
+    top = np.log1p(x.max())
+    return 100.0 * np.log1p(x) / top if top > 0 else np.zeros_like(x)
+
+
+NORMALIZERS = {"zscore": _zscore, "percentile": _percentile, "log": _log}
+
+
+def compute_scores(platforms, metrics, method=None, config=None):
+    """
+    Vectorized normalization: one weighted sum per row, then each platform
+    is normalized on its own distribution to 0..100 and multiplied by its
+    platform weight. The only Python loop is over platforms.
+    """
+    config = config or settings.SCORING
+    method = method or config["method"]
+    normalize = NORMALIZERS[method]
+
+    names = sorted(config["metric_weights"])
+    codes = np.searchsorted(names, platforms.astype(str)) if len(platforms) else np.empty(0, int)
+    known = np.isin(platforms.astype(str), names)
+
+    weights = np.array([
+        [config["metric_weights"][name].get(m, 0.0) for m in SCORING_METRICS]
+        for name in names
+    ])
+    raw = np.zeros(len(platforms))
+    raw[known] = (np.clip(metrics[known], 0, None) * weights[codes[known]]).sum(axis=1)
+
+    scores = np.zeros(len(platforms))
+    for i, name in enumerate(names):
+        mask = known & (codes == i)
+        if mask.any():
+            scores[mask] = normalize(raw[mask]) * config["platform_weights"].get(name, 1.0)
+    return np.round(scores, 4)
+
+
+def write_scores(ids, scores):
+    with transaction.atomic():
+        bulk_update_column("normalized_score", ids.tolist(), scores.tolist(), "float8")
+        transaction.on_commit(leaderboard.invalidate)
+
+
+def rescore_all(method=None, platforms=None):
+    """Rewrite normalized_score of every row, or only of `platforms`."""
+    method = method or settings.SCORING["method"]
+    with stage("score", method=method, platforms=platforms) as info:
+        qs = Workflow.objects.filter(platform__in=platforms) if platforms else None
+        ids, row_platforms, metrics = load_metrics(qs)
+        scores = compute_scores(row_platforms, metrics, method)
+        write_scores(ids, scores)
+        info["rows"] = len(ids)
+    SCORING_SECONDS.observe(info["seconds"], method=method)
+    return len(ids)
+
+
+def after_fetch(platforms):
+    """
+    Post-fetch hook: rescore the platforms a fetch inserted, updated or
+    expired rows of. A platform is normalized on its whole distribution
+    across countries, so that is the smallest partition one changed row
+    can move; the other platforms keep their scores. Returns the number
+    of rows rescored, or None when nothing changed.
+    """
+    platforms = sorted(set(platforms))
+    if not platforms:
+        return None
+    return rescore_all(platforms=platforms)
@@ -0,0 +1,157 @@
+import math
+import re
+
+from django.db import connection
+
+from .models import Workflow
+
+
+# SQLite FTS5 shadow table (rowid = Workflow.id), created in migration 0010.
+# On Postgres the GIN index on to_tsvector('simple', workflow) is enough.
+FTS_TABLE = "workflows_workflow_fts"
+PG_TSVECTOR = "to_tsvector('simple'::regconfig, workflow)"
+
+# Relevance picks this many candidates per requested row; popularity then
+# re-ranks only those, so common terms never sort the whole match set.
+CANDIDATES_PER_ROW = 10
+BROAD_MATCHES = 5000
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _fts5_query(q):
+    words = _WORD.findall(q.lower())
+    if not words:
+        return None
+    # Quote every term (no FTS syntax injection); prefix-match the last one.
+    return " ".join(f'"{w}"' for w in words[:-1]) + f' "{words[-1]}"*'
+
+
+def index_titles(pairs):
+    """
+    Add (workflow id, title) pairs to the SQLite shadow table. Titles are
+    part of the upsert key, so only newly inserted rows ever need this.
+    """
+    if connection.vendor != "sqlite" or not pairs:
+        return
+    with connection.cursor() as cur:
+        cur.executemany(
+            f"INSERT OR REPLACE INTO {FTS_TABLE} (rowid, workflow) VALUES (%s, %s)",
+            [(pk, title) for pk, title in pairs],
+        )
+
+
+def unindex(ids):
+    if connection.vendor != "sqlite" or not ids:
+        return
+    with connection.cursor() as cur:
+        cur.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk in ids])
+
+
+def _filters(platform, country):
+    sql, params = "", []
+    if platform:
+        sql += " AND UPPER(w.platform) = %s"
+        params.append(platform.upper())
+    if country:
+        sql += " AND UPPER(w.country) = %s"
+        params.append(country.upper())
+    return sql, params
+
+
+def _fetch(sql, params):
+    with connection.cursor() as cur:
+        cur.execute(sql, params)
+        return cur.fetchall()
+
+
+def _candidates(q, platform, country, limit):
+    """
+    [(id, relevance, popularity_score)] for up to `limit` matches.
+
+    Narrow queries take the most relevant rows. Broad ones (more than
+    BROAD_MATCHES hits) are made of terms so common that relevance barely
+    differs, so they skip text scoring and walk the popularity index
+    instead; the cost then stays bounded by `limit`, not the match count.
+    """
+    extra, extra_params = _filters(platform, country)
+
+    if connection.vendor == "postgresql":
+        match_from = (
+            "FROM workflows_workflow w, websearch_to_tsquery('simple', %s) query "
+            f"WHERE {PG_TSVECTOR} @@ query{extra}"
+        )
+        match_params = [q, *extra_params]
+        relevance = f"ts_rank({PG_TSVECTOR}, query)"
+        by_relevance = "relevance DESC"
+        broad_from = count_from = match_from
+        count_params = match_params
+    elif connection.vendor == "sqlite":
+        match = _fts5_query(q)
+        if match is None:
+            return []
+        # CROSS JOIN pins the FTS table as the outer loop; otherwise a
+        # platform/country filter makes SQLite run one MATCH per row.
+        match_from = (
+            f"FROM {FTS_TABLE} CROSS JOIN workflows_workflow w ON w.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s{extra}"
+        )
+        match_params = [match, *extra_params]
+        count_from, count_params = f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]
+        # bm25() is lower-is-better; negate it so higher means more relevant.
+        relevance = f"-bm25({FTS_TABLE})"
+        by_relevance = f"{FTS_TABLE}.rank"
+        # Left alone, the planner sorts every match; unfiltered, walking
+        # the score index and probing the match set is far cheaper.
+        hint = "" if extra else " INDEXED BY workflow_score"
+        broad_from = (
+            f"FROM workflows_workflow w{hint} WHERE w.id IN "
+            f"(SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s){extra}"
+        )
+    else:
+        qs = Workflow.objects.filter(workflow__icontains=q)
+        if platform:
+            qs = qs.filter(platform__iexact=platform)
+        if country:
+            qs = qs.filter(country__iexact=country)
+        return [(pk, 1.0, score) for pk, score in qs.values_list("id", "popularity_score")[:limit]]
+
+    (matches,), = _fetch(
+        f"SELECT COUNT(*) FROM (SELECT 1 {count_from} LIMIT %s) m",
+        [*count_params, BROAD_MATCHES + 1],
+    )
+    if matches <= BROAD_MATCHES:
+        return _fetch(
+            f"SELECT w.id, {relevance} AS relevance, w.popularity_score {match_from} "
+            f"ORDER BY {by_relevance}, w.popularity_score DESC LIMIT %s",
+            [*match_params, limit],
+        )
+    return _fetch(
+        f"SELECT w.id, 1.0, w.popularity_score {broad_from} "
+        f"ORDER BY w.popularity_score DESC, w.id DESC LIMIT %s",
+        [*match_params, limit],
+    )
+
+
+def search_workflows(q, platform=None, country=None, limit=20):
+    """
+    Full-text search over titles.
+
+    Returns [(Workflow, rank)], best first, where
+    rank = relevance / best relevance * (1 + log10(1 + popularity_score)).
+    Relevance is scaled to the best candidate because bm25 and ts_rank
+    live on different scales (and bm25 tends to 0 for very common terms).
+    """
+    rows = _candidates(q, platform, country, limit * CANDIDATES_PER_ROW)
+    best = max((r[1] for r in rows), default=0)
+    ranked = sorted(
+        (
+            (pk, (relevance / best if best > 0 else 1.0) * (1 + math.log10(1 + max(score, 0))))
+            for pk, relevance, score in rows
+        ),
+        key=lambda r: r[1],
+        reverse=True,
+    )[:limit]
+
+    objs = Workflow.objects.in_bulk([pk for pk, _ in ranked])
+    return [(objs[pk], round(rank, 4)) for pk, rank in ranked if pk in objs]
@@ -1,7 +1,43 @@
 from rest_framework import serializers
-from .models import Workflow
+from .history import SNAPSHOT_COUNTERS
+from .insights import score_summary
+from .models import CanonicalWorkflow, Workflow, WorkflowInsight, WorkflowSnapshot
+
+# Change-detection state (tasks.content_hash), not data: kept out of the
+# API, fields= projections and exports
+INTERNAL_FIELDS = ["content_hash"]
+
 
 class WorkflowSerializer(serializers.ModelSerializer):
     class Meta:
         model = Workflow
-        fields = "__all__"
+        exclude = INTERNAL_FIELDS
+
+
+class WorkflowSnapshotSerializer(serializers.ModelSerializer):
+    resolution = serializers.CharField(source="get_resolution_display")
+
+    class Meta:
+        model = WorkflowSnapshot
+        fields = ["captured_at", "resolution", "views", "likes", "comments", "replies", "score"]
+
+
+class CanonicalWorkflowSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CanonicalWorkflow
+        fields = ["id", "name", "member_count", "platforms", "score", "total_popularity", "updated_at"]
+
+
+class WorkflowInsightSerializer(serializers.ModelSerializer):
+    totals = serializers.SerializerMethodField()
+    score = serializers.SerializerMethodField()
+
+    class Meta:
+        model = WorkflowInsight
+        fields = ["platform", "country", "workflow_count", "totals", "score", "top", "updated_at"]
+
+    def get_totals(self, obj):
+        return {name: getattr(obj, f"total_{name}") for name in SNAPSHOT_COUNTERS}
+
+    def get_score(self, obj):
+        return score_summary(obj)
@@ -1,9 +1,46 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
 from django.utils import timezone
-from datetime import timedelta
-from .models import Workflow
+from . import insights, leaderboard, search
+from .history import build_snapshot
+from .metrics import ROWS_CHANGED, UPSERT_SECONDS, log_stage
+from .models import ArchivedWorkflow, Workflow, WorkflowSnapshot
+from .trending import trending_score
+
+
+UPSERT_KEY = ["workflow", "platform", "country"]
+UPSERT_FIELDS = [
+    "source_url", "popularity_metrics", "popularity_score", "trending_score", "last_seen",
+    "content_hash",
+]
+
+
+def _chunks(seq, size):
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
 
 
-def save_items(items, platform, country):
+def content_hash(source_url, metrics, score):
+    """
+    128-bit digest of what an upsert writes besides last_seen. Metrics
+    are serialized with sorted keys, so key order doesn't matter.
+    """
+    payload = json.dumps([source_url, metrics, score], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _insight_row(pk, title, url, metrics, score):
+    return {
+        "id": pk, "workflow": title, "source_url": url,
+        "popularity_metrics": metrics, "popularity_score": score,
+    }
+
+
+def save_items(items, platform, country, batch_size=None):
     """
     items: list of dicts like:
     {
@@ -12,34 +49,187 @@ def save_items(items, platform, country):
         "metrics": {...},
         "score": 123.4
     }
+
+    Each chunk of `batch_size` (SAVE_BATCH_SIZE by default) is compared
+    against the stored content_hash in one query. Only new and changed
+    rows are written, with INSERT ... ON CONFLICT on (workflow, platform,
+    country), and get a WorkflowSnapshot. Unchanged rows just get
+    last_seen bumped by one bulk UPDATE (plus their decaying
+    trending_score while it is above 0), so repeated fetches of static
+    data are read-mostly. Everything runs inside one transaction. The
+    cached leaderboards are invalidated once it commits. New titles are
+    added to the SQLite search table, and any expired copy of them is
+    dropped from ArchivedWorkflow. trending_score of changed rows
+    is advanced from their previous metrics and last_seen, so its cost
+    follows the change volume. The (platform, country) insights rollup
+    is moved by the same rows.
+
+    Returns {"inserted": n, "updated": n, "unchanged": n}.
     """
+    batch_size = batch_size or settings.SAVE_BATCH_SIZE
     now = timezone.now()
+    start = time.perf_counter()
+
+    # First item wins for duplicate titles, as in pipeline.dedupe. ON
+    # CONFLICT cannot touch the same row twice in one statement anyway.
+    rows = {}
     for item in items:
-        Workflow.objects.update_or_create(
+        if item["workflow"] in rows:
+            continue
+        url = item.get("source_url", "")
+        metrics = item.get("metrics", {})
+        score = item.get("score", 0)
+        rows[item["workflow"]] = Workflow(
             workflow=item["workflow"],
             platform=platform,
             country=country,
-            defaults={
-                "source_url": item.get("source_url", ""),
-                "popularity_metrics": item.get("metrics", {}),
-                "popularity_score": item.get("score", 0),
-                "last_seen": now,
-            },
+            source_url=url,
+            popularity_metrics=metrics,
+            popularity_score=score,
+            content_hash=content_hash(url, metrics, score),
+            last_seen=now,
         )
+    rows = list(rows.values())
+
+    stats = {"inserted": 0, "updated": 0, "unchanged": 0}
+    if not rows:
+        return stats
+
+    # (old, new) rows for the insights rollup; unchanged rows don't move it
+    changes = []
 
+    # Unchanged rows only get last_seen bumped (and their trending_score
+    # decayed when it isn't 0 yet), after the loop
+    unchanged_ids, decayed = [], []
 
-def get_cron_status():
+    with transaction.atomic():
+        for chunk in _chunks(rows, batch_size):
+            existing = {
+                title: (pk, digest, seen, trending)
+                for title, pk, digest, seen, trending in Workflow.objects.filter(
+                    platform=platform,
+                    country=country,
+                    workflow__in=[row.workflow for row in chunk],
+                ).values_list("workflow", "id", "content_hash", "last_seen", "trending_score")
+            }
+
+            write = []
+            for row in chunk:
+                prev = existing.get(row.workflow)
+                if prev is None:
+                    stats["inserted"] += 1
+                    write.append(row)
+                elif prev[1] != row.content_hash:
+                    stats["updated"] += 1
+                    write.append(row)
+                else:
+                    stats["unchanged"] += 1
+                    pk, _, seen, trending = prev
+                    unchanged_ids.append(pk)
+                    value = trending_score(trending, {}, seen, {}, now)
+                    if value != trending:
+                        decayed.append((pk, value))
+
+            if not write:
+                continue
+
+            # Previous values, read only for the rows that actually changed
+            changed_ids = [existing[row.workflow][0] for row in write if row.workflow in existing]
+            previous = {
+                pk: (url, metrics, score)
+                for pk, url, metrics, score in Workflow.objects.filter(id__in=changed_ids).values_list(
+                    "id", "source_url", "popularity_metrics", "popularity_score"
+                )
+            } if changed_ids else {}
+
+            for row in write:
+                if row.workflow in existing:
+                    pk, _, seen, trending = existing[row.workflow]
+                    row.trending_score = trending_score(
+                        trending, previous[pk][1], seen, row.popularity_metrics, now
+                    )
+
+            Workflow.objects.bulk_create(
+                write,
+                update_conflicts=True,
+                unique_fields=UPSERT_KEY,
+                update_fields=UPSERT_FIELDS,
+            )
+
+            ids = {title: prev[0] for title, prev in existing.items()}
+            new_titles = [row.workflow for row in write if row.workflow not in ids]
+            if new_titles:
+                created = list(
+                    Workflow.objects.filter(
+                        platform=platform, country=country, workflow__in=new_titles
+                    ).values_list("workflow", "id")
+                )
+                ids.update(created)
+                search.index_titles([(pk, title) for title, pk in created])
+                # Back in the hot table: drop the expired copy
+                ArchivedWorkflow.objects.filter(
+                    platform=platform, country=country, workflow__in=new_titles
+                ).delete()
+
+            WorkflowSnapshot.objects.bulk_create([
+                build_snapshot(ids[row.workflow], row.popularity_metrics, row.popularity_score, now)
+                for row in write
+            ])
+
+            for row in write:
+                pk = ids[row.workflow]
+                new = _insight_row(pk, row.workflow, row.source_url,
+                                   row.popularity_metrics, row.popularity_score)
+                old = _insight_row(pk, row.workflow, *previous[pk]) if pk in previous else None
+                changes.append((old, new))
+
+        for batch in _chunks(unchanged_ids, 10000):
+            Workflow.objects.filter(id__in=batch).update(last_seen=now)
+        if decayed:
+            bulk_update_column(
+                "trending_score", [pk for pk, _ in decayed], [v for _, v in decayed], "float8"
+            )
+
+        if changes:
+            insights.apply_changes(platform, country, changes)
+        transaction.on_commit(leaderboard.invalidate)
+
+    elapsed = time.perf_counter() - start
+    UPSERT_SECONDS.observe(elapsed, platform=platform)
+    for change, n in stats.items():
+        ROWS_CHANGED.observe(n, platform=platform, change=change)
+    log_stage(
+        "save", platform=platform, country=country, items=len(rows),
+        seconds=round(elapsed, 4), **stats,
+    )
+    return stats
+
+
+def bulk_update_column(column, ids, values, pg_type, batch_size=50000):
     """
-    Infer cron status from latest last_seen.
+    Set Workflow.<column> = values[i] for ids[i] without per-row queries.
+
+    Postgres joins against unnest()ed arrays (one statement per batch);
+    other backends run one prepared UPDATE through executemany.
+    `pg_type` is the Postgres array element type, e.g. "float8".
     """
-    last = (
-        Workflow.objects.exclude(last_seen__isnull=True)
-        .order_by("-last_seen")
-        .first()
-    )
-    if not last:
-        return None, None
+    table = connection.ops.quote_name(Workflow._meta.db_table)
+    column = connection.ops.quote_name(column)
+
+    with transaction.atomic(), connection.cursor() as cur:
+        for i in range(0, len(ids), batch_size):
+            batch_ids = ids[i:i + batch_size]
+            batch_values = values[i:i + batch_size]
+            if connection.vendor == "postgresql":
+                cur.execute(
+                    f"UPDATE {table} AS w SET {column} = v.value "
+                    f"FROM unnest(%s::bigint[], %s::{pg_type}[]) AS v(id, value) "
+                    f"WHERE w.id = v.id",
+                    [batch_ids, batch_values],
+                )
+            else:
+                cur.executemany(
+                    f"UPDATE {table} SET {column} = %s WHERE id = %s",
+                    list(zip(batch_values, batch_ids)),
+                )
 
-    last_run = last.last_seen
-    next_run = last_run + timedelta(hours=6)
-    return last_run, next_run
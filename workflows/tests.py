@@ -1,3 +1,1174 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import itertools
+import json
+import math
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock, skipIf
 
-# Create your tests here.
+import numpy as np
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from . import (
+    collectors, http_client, insights, jobs, metrics, orchestrator, pipeline, retention, scheduler,
+    scoring,
+)
+from .collectors import (
+    YOUTUBE_KEYWORDS,
+    YOUTUBE_SEARCH_URL,
+    YOUTUBE_STATS_URL,
+    ForumCollector,
+    YouTubeCollector,
+    youtube_call,
+)
+from .exporters import EXPORT_FIELDS
+from .history import compact_snapshots
+from .http_client import FixtureStore, cache_key, make_response
+from .middleware import brotli
+from .models import (
+    ArchivedWorkflow,
+    CanonicalWorkflow,
+    FetchJob,
+    FetchSchedule,
+    ForumCursor,
+    HttpValidator,
+    Workflow,
+    WorkflowInsight,
+    WorkflowSnapshot,
+    YouTubeQuota,
+)
+from .pipeline import Collector
+from .quota import QUOTA_COST, KeyPool, plan_searches
+from .renderers import ORJSONRenderer
+from .resolution import resolve_workflows, title_tokens
+from .scoring import SCORING_METHODS, SCORING_METRICS, compute_scores
+from .tasks import save_items
+
+
+# Three recorded latest.json pages: a pinned 2024 topic on top of page 0,
+# then nine topics bumped 5h apart, newest #4100 at 2026-10-01 12:00 UTC.
+FORUM_FIXTURES = Path(__file__).resolve().parent / "testdata" / "http"
+FORUM_URL = "https://community.n8n.io/latest.json"
+
+
+def _item(title, views, score=None):
+    return {
+        "workflow": title,
+        "source_url": f"https://www.youtube.com/watch?v={title[:11]:_<11}",
+        "metrics": {"views": views, "likes": views // 10, "comments": 1},
+        "score": views if score is None else score,
+    }
+
+
+def _rollup(platform, country):
+    insight = WorkflowInsight.objects.get(platform=platform, country=country)
+    return {
+        "count": insight.workflow_count,
+        "views": insight.total_views,
+        "likes": insight.total_likes,
+        "score_sum": round(insight.score_sum, 4),
+        "histogram": insight.score_histogram,
+        "top": [row["id"] for row in insight.top],
+    }
+
+
+class SaveItemsTests(TestCase):
+    def test_counts_inserted_updated_unchanged(self):
+        items = [_item("a", 100), _item("b", 200), _item("c", 300)]
+        self.assertEqual(save_items(items, "YouTube", "US"),
+                         {"inserted": 3, "updated": 0, "unchanged": 0})
+        self.assertEqual(WorkflowSnapshot.objects.count(), 3)
+
+        self.assertEqual(save_items(items, "YouTube", "US"),
+                         {"inserted": 0, "updated": 0, "unchanged": 3})
+        # Unchanged rows get no snapshot
+        self.assertEqual(WorkflowSnapshot.objects.count(), 3)
+
+        items[1] = _item("b", 250)
+        self.assertEqual(save_items(items, "YouTube", "US"),
+                         {"inserted": 0, "updated": 1, "unchanged": 2})
+        self.assertEqual(WorkflowSnapshot.objects.count(), 4)
+        self.assertEqual(Workflow.objects.get(workflow="b").popularity_metrics["views"], 250)
+
+    def test_unchanged_rows_only_bump_last_seen(self):
+        save_items([_item("a", 100)], "YouTube", "US")
+        old = timezone.now() - timedelta(hours=3)
+        Workflow.objects.update(last_seen=old)
+
+        save_items([_item("a", 100)], "YouTube", "US")
+        self.assertGreater(Workflow.objects.get().last_seen, old)
+
+    def test_trending_score_follows_growth_since_last_seen(self):
+        save_items([_item("a", 1000)], "YouTube", "US")
+        self.assertEqual(Workflow.objects.get().trending_score, 0)
+
+        Workflow.objects.update(last_seen=timezone.now() - timedelta(hours=2))
+        save_items([_item("a", 1200)], "YouTube", "US")
+
+        # +200 views and +20 likes (weights 1 and 5) over 2h = 150/h, half-life 24h
+        decay = 0.5 ** (2 / 24)
+        self.assertAlmostEqual(Workflow.objects.get().trending_score, (1 - decay) * 150, places=1)
+
+        # Unchanged afterwards: the score decays instead of staying put
+        before = Workflow.objects.get().trending_score
+        Workflow.objects.update(last_seen=timezone.now() - timedelta(hours=24))
+        save_items([_item("a", 1200)], "YouTube", "US")
+        self.assertAlmostEqual(Workflow.objects.get().trending_score, before / 2, places=1)
+
+    def test_insights_deltas_match_a_full_recompute(self):
+        save_items([_item(f"w{i}", 100 * i) for i in range(1, 16)], "YouTube", "US")
+        save_items([_item("w3", 5000), _item("w4", 10), _item("new", 700)], "YouTube", "US")
+
+        incremental = _rollup("YouTube", "US")
+        self.assertEqual(incremental["count"], 16)
+        self.assertEqual(incremental["views"], sum(
+            w.popularity_metrics["views"] for w in Workflow.objects.all()
+        ))
+
+        insights.recompute("YouTube", "US")
+        self.assertEqual(incremental, _rollup("YouTube", "US"))
+
+
+class _FastCollector(Collector):
+    name = "fast"
+    platform = "Forum"
+
+    def iter_items(self):
+        for _ in range(3):
+            yield {"workflow": f"fast {self.country}"}
+
+
+class _SlowCollector(Collector):
+    """Yields forever, one item per 10 ms; `closed` is set once it is shut down."""
+
+    name = "slow"
+    platform = "Forum"
+    closed = None
+
+    def iter_items(self):
+        try:
+            for i in itertools.count():
+                time.sleep(0.01)
+                yield {"workflow": f"slow {i}"}
+        finally:
+            self.closed.set()
+
+
+class _BrokenCollector(Collector):
+    name = "broken"
+    platform = "Forum"
+
+    def iter_items(self):
+        raise RuntimeError("source is down")
+        yield
+
+
+@override_settings(SAVE_BATCH_SIZE=5)
+class OrchestratorTests(TestCase):
+    def setUp(self):
+        self.saved = []
+        _SlowCollector.closed = threading.Event()
+
+        def fake_save(items, platform, country):
+            # Jobs run on worker threads; keep them off the test's transaction.
+            self.saved.extend(item["workflow"] for item in items)
+            return {"inserted": len(items), "updated": 0, "unchanged": 0}
+
+        for patch in [
+            mock.patch.object(orchestrator, "save_items", fake_save),
+            mock.patch.dict(orchestrator.SOURCES, {
+                c.name: c for c in (_FastCollector, _SlowCollector, _BrokenCollector)
+            }),
+        ]:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def run_fetch(self, sources, countries=("US", "IN"), **kwargs):
+        return {
+            (r["source"], r["country"]): r
+            for r in orchestrator.run_fetch(countries, sources=sources, **kwargs)
+        }
+
+    def test_every_source_and_country_runs(self):
+        results = self.run_fetch(["fast", "broken"])
+
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results[("fast", "US")]["status"], "ok")
+        self.assertEqual(results[("fast", "US")]["items"], 1)  # deduped
+        self.assertEqual(results[("broken", "IN")]["status"], "error")
+        self.assertEqual(results[("broken", "IN")]["error"], "source is down")
+        self.assertEqual(sorted(self.saved), ["fast IN", "fast US"])
+
+    def test_deadline_stops_the_collector_and_keeps_saved_batches(self):
+        results = self.run_fetch(["slow"], countries=["US"], deadline=0.3)
+
+        self.assertEqual(results[("slow", "US")]["status"], "timeout")
+        self.assertTrue(_SlowCollector.closed.wait(2), "collector kept running after its deadline")
+        # The partial batch in hand when it stopped was saved too
+        saved = len(self.saved)
+        self.assertGreater(saved, 0)
+        time.sleep(0.1)
+        self.assertEqual(len(self.saved), saved)
+
+
+class _FakeKeyPool:
+    """KeyPool without the DB: the pipelined producer runs off the test thread."""
+
+    def __init__(self):
+        self.keys = {"test": "test-key"}
+        self.spent = 0
+
+    def remaining(self):
+        return 10000 - self.spent
+
+    def reserve(self, endpoint, skip=()):
+        if "test-key" in skip:
+            return None
+        self.spent += QUOTA_COST[endpoint]
+        return "test-key"
+
+    def exhaust(self, key):
+        pass
+
+
+class PipelinedYouTubeTests(TestCase):
+    """Two search pages of 50 ids per keyword; the first 10 ids are the same for every keyword."""
+
+    def setUp(self):
+        self.calls = []
+        patch = mock.patch.object(collectors, "KeyPool", _FakeKeyPool)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def youtube_api(self, url, params):
+        self.calls.append((url, params))
+        if url == YOUTUBE_SEARCH_URL:
+            kw = YOUTUBE_KEYWORDS.index(params["q"])
+            page = int(params.get("pageToken", 0))
+            ids = [f"v{kw if n >= 10 or page else 0}{page}{n:08d}" for n in range(50)]
+            body = {"items": [{"id": {"videoId": vid}} for vid in ids]}
+            if page == 0:
+                body["nextPageToken"] = "1"
+        else:
+            body = {"items": [
+                {"id": vid, "snippet": {"title": f"video {vid}"}, "statistics": {"viewCount": "10"}}
+                for vid in params["id"].split(",")
+            ]}
+        return make_response(url, 200, json.dumps(body))
+
+    def test_searches_feed_batched_stats_lookups(self):
+        with http_client.replay(self.youtube_api):
+            stats = pipeline.run(YouTubeCollector("US", pipelined=True, max_pages=2, rate=1000))
+
+        unique = len(YOUTUBE_KEYWORDS) * 100 - (len(YOUTUBE_KEYWORDS) - 1) * 10
+        self.assertEqual(stats["inserted"], unique)
+        lookups = [p["id"].split(",") for url, p in self.calls if url == YOUTUBE_STATS_URL]
+        self.assertEqual(len(lookups), math.ceil(unique / 50))
+        self.assertTrue(all(len(ids) <= 50 for ids in lookups))
+        self.assertEqual(len({vid for ids in lookups for vid in ids}), unique)
+
+    @override_settings(PIPELINE_QUEUE_SIZE=1)
+    def test_closing_the_consumer_stops_the_producer(self):
+        with http_client.replay(self.youtube_api):
+            items = collectors.iter_youtube_pipelined("US", max_pages=2, rate=1000)
+            next(items)
+            items.close()
+
+        self.assertFalse(any(t.name == "youtube-US" for t in threading.enumerate()))
+
+
+@override_settings(HTTP_FIXTURES_MODE="replay", HTTP_FIXTURES_DIR=str(FORUM_FIXTURES))
+class ConditionalGetTests(TestCase):
+    def crawl(self):
+        return pipeline.run(ForumCollector("US", incremental=False))
+
+    def test_not_modified_page_is_skipped(self):
+        self.assertEqual(self.crawl()["inserted"], 4)
+        self.assertEqual(HttpValidator.objects.get().etag, 'W/"latest-page-0"')
+
+        sent = []
+
+        def not_modified(url, params=None, headers=None, timeout=10):
+            sent.append(headers)
+            return make_response(url, 304, b"")
+
+        with mock.patch.object(http_client, "get", not_modified):
+            stats = self.crawl()
+        self.assertEqual(sent[0]["If-None-Match"], 'W/"latest-page-0"')
+        self.assertEqual(stats["items"], 0)
+
+    def test_validators_are_stored_after_the_save(self):
+        def failing_save(items, platform, country):
+            raise RuntimeError("database went away")
+
+        with self.assertRaises(RuntimeError):
+            pipeline.run(ForumCollector("US", incremental=False), save=failing_save)
+        self.assertFalse(HttpValidator.objects.exists())
+
+    @override_settings(HTTP_FIXTURES_MODE="record")
+    def test_recording_never_sends_validators(self):
+        HttpValidator.objects.create(key=cache_key(FORUM_URL, scope="forum:US"), etag='W/"old"')
+        sent = []
+
+        def fresh(url, params=None, headers=None, timeout=10):
+            sent.append(headers)
+            return make_response(url, 200, b'{"topic_list": {"topics": []}}', {"ETag": 'W/"new"'})
+
+        with mock.patch.object(http_client, "get", fresh):
+            self.crawl()
+        self.assertNotIn("If-None-Match", sent[0])
+
+
+@override_settings(HTTP_FIXTURES_MODE="replay", HTTP_FIXTURES_DIR=str(FORUM_FIXTURES))
+class ForumCursorTests(TestCase):
+    def crawl(self, **options):
+        return pipeline.run(ForumCollector("US", incremental=True, **options))
+
+    def cursor(self):
+        cursor = ForumCursor.objects.filter(country="US", bumped_at__isnull=False).first()
+        return cursor and (cursor.bumped_at, cursor.topic_id)
+
+    def test_complete_crawl_moves_cursor_and_stores_validators(self):
+        stats = self.crawl()
+        self.assertEqual(stats["items"], 10)
+        bumped_at, topic_id = self.cursor()
+        self.assertEqual((bumped_at.isoformat(), topic_id), ("2026-10-01T12:00:00+00:00", 4100))
+        self.assertEqual(HttpValidator.objects.count(), 3)
+
+        # Everything is at or below the mark now; the pinned topic doesn't stop the walk
+        self.assertEqual(self.crawl()["items"], 0)
+
+    def test_max_pages_cutoff_on_first_crawl_sets_cursor(self):
+        stats = self.crawl(max_pages=2)
+        self.assertEqual(stats["inserted"], 7)
+        bumped_at, topic_id = self.cursor()
+        self.assertEqual((bumped_at.isoformat(), topic_id), ("2026-10-01T12:00:00+00:00", 4100))
+        self.assertEqual(HttpValidator.objects.count(), 2)
+
+    def test_max_pages_cutoff_before_the_mark_keeps_cursor(self):
+        mark = parse_datetime("2026-09-30T01:00:00+00:00")
+        ForumCursor.objects.create(country="US", bumped_at=mark, topic_id=4093)
+
+        # Pages 0 and 1 stop at #4095; #4094 on page 2 is never seen
+        stats = self.crawl(max_pages=2)
+        self.assertEqual(stats["inserted"], 6)
+        self.assertEqual(self.cursor(), (mark, 4093))
+        self.assertFalse(HttpValidator.objects.exists())
+
+    def test_fetch_error_keeps_cursor(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            shutil.copytree(FORUM_FIXTURES, tmp, dirs_exist_ok=True)
+            Path(FixtureStore(tmp).path(FORUM_URL, {"page": 1})).unlink()
+
+            with override_settings(HTTP_FIXTURES_DIR=tmp):
+                stats = self.crawl()
+
+        self.assertEqual(stats["inserted"], 4)
+        self.assertIsNone(self.cursor())
+        self.assertFalse(HttpValidator.objects.exists())
+
+    def test_failed_save_keeps_cursor(self):
+        def failing_save(items, platform, country):
+            raise RuntimeError("database went away")
+
+        with self.assertRaises(RuntimeError):
+            pipeline.run(ForumCollector("US", incremental=True), save=failing_save)
+        self.assertIsNone(self.cursor())
+        self.assertFalse(HttpValidator.objects.exists())
+
+        # The next run starts over and saves everything
+        self.assertEqual(self.crawl()["inserted"], 10)
+
+
+class HistoryTests(TestCase):
+    now = datetime(2026, 10, 18, 12, tzinfo=dt_timezone.utc)
+
+    def setUp(self):
+        save_items([_item("a", 100)], "YouTube", "US")
+        self.workflow = Workflow.objects.get()
+
+    def snapshot(self, captured_at, views, score=0, resolution=WorkflowSnapshot.RAW):
+        WorkflowSnapshot.objects.create(
+            workflow=self.workflow, captured_at=captured_at, resolution=resolution,
+            views=views, score=score,
+        )
+
+    def history(self, **params):
+        return self.client.get(f"/api/workflows/{self.workflow.pk}/history/", params)
+
+    def test_history_filters_by_resolution_and_since(self):
+        self.snapshot(self.now - timedelta(days=40), 10, resolution=WorkflowSnapshot.DAILY)
+        self.snapshot(self.now - timedelta(days=2), 50)
+
+        points = self.history().json()["history"]
+        self.assertEqual([p["views"] for p in points], [10, 50, 100])
+        self.assertEqual(points[0]["resolution"], "daily")
+
+        raw = self.history(resolution="raw").json()["history"]
+        self.assertEqual([p["views"] for p in raw], [50, 100])
+
+        since = self.history(since="2026-10-01T00:00:00").json()["history"]
+        self.assertEqual([p["views"] for p in since], [50, 100])
+
+    def test_bad_parameters_are_rejected(self):
+        self.assertEqual(self.history(resolution="weekly").status_code, 400)
+        self.assertEqual(self.history(since="yesterday").status_code, 400)
+        self.assertEqual(self.history(since="2026-13-01T00:00:00").status_code, 400)
+        self.assertEqual(self.client.get("/api/workflows/999/history/").status_code, 404)
+
+    def test_compaction_downsamples_by_age(self):
+        WorkflowSnapshot.objects.all().delete()
+        self.snapshot(self.now - timedelta(hours=1), 900)  # recent raw stays
+        self.snapshot(datetime(2026, 10, 15, 10, 5, tzinfo=dt_timezone.utc), 100, score=10)
+        self.snapshot(datetime(2026, 10, 15, 10, 35, tzinfo=dt_timezone.utc), 150, score=20)
+        self.snapshot(datetime(2026, 9, 1, 3, tzinfo=dt_timezone.utc), 60, resolution=WorkflowSnapshot.HOURLY)
+        self.snapshot(datetime(2026, 9, 1, 5, tzinfo=dt_timezone.utc), 70, resolution=WorkflowSnapshot.HOURLY)
+        self.snapshot(datetime(2025, 1, 1, tzinfo=dt_timezone.utc), 1, resolution=WorkflowSnapshot.DAILY)
+
+        result = compact_snapshots(now=self.now)
+        self.assertEqual(result, {"hourly": (1, 2), "daily": (1, 2), "expired": 1})
+
+        rows = list(WorkflowSnapshot.objects.values_list("resolution", "captured_at", "views", "score"))
+        self.assertEqual(rows, [
+            (WorkflowSnapshot.DAILY, datetime(2026, 9, 1, tzinfo=dt_timezone.utc), 70, 0),
+            (WorkflowSnapshot.HOURLY, datetime(2026, 10, 15, 10, tzinfo=dt_timezone.utc), 150, 15),
+            (WorkflowSnapshot.RAW, self.now - timedelta(hours=1), 900, 0),
+        ])
+
+        # Buckets already rolled up are left alone on the next run
+        self.assertEqual(compact_snapshots(now=self.now), {"hourly": (0, 0), "daily": (0, 0), "expired": 0})
+
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        save_items([_item(f"w{i}", 100 * i) for i in range(1, 6)], "YouTube", "US")
+        save_items([_item("forum", 250)], "Forum", "IN")
+
+    def workflows(self, headers=None, **params):
+        # Raw scores: nothing rescores these rows
+        return self.client.get("/api/workflows/", {"sort": "score", **params}, headers=headers)
+
+    def test_filters_sort_and_limit(self):
+        rows = self.workflows(platform="youtube", country="us", limit=3).json()
+        self.assertEqual([r["workflow"] for r in rows], ["w5", "w4", "w3"])
+
+        rows = self.workflows(limit=3).json()
+        self.assertEqual([r["workflow"] for r in rows], ["w5", "w4", "w3"])
+        self.assertEqual(len(self.workflows().json()), 6)
+        self.assertEqual(self.workflows(sort="hot").status_code, 400)
+
+    def test_hits_are_served_from_the_cache(self):
+        first = self.workflows(limit=3)
+        with self.assertNumQueries(0):
+            second = self.workflows(limit=2)
+        self.assertEqual(second.json(), first.json()[:2])
+
+    def test_etag_revalidation(self):
+        first = self.workflows(limit=3)
+        etag = first["ETag"]
+
+        again = self.workflows(limit=3, headers={"If-None-Match": etag})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again["ETag"], etag)
+        self.assertNotEqual(self.workflows(limit=2)["ETag"], etag)
+
+    def test_writes_move_to_a_new_generation(self):
+        etag = self.workflows(limit=3)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            save_items([_item("w1", 9000)], "YouTube", "US")
+
+        fresh = self.workflows(limit=3, headers={"If-None-Match": etag})
+        self.assertEqual(fresh.status_code, 200)
+        self.assertEqual(fresh.json()[0]["workflow"], "w1")
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        # Three rows per score, so pages have to break ties by id
+        save_items([_item(f"w{i}", 10, score=i // 3) for i in range(10)], "YouTube", "US")
+
+    def workflows(self, **params):
+        return self.client.get("/api/workflows/", params)
+
+    def test_cursor_walks_every_row_once(self):
+        seen, cursor = [], ""
+        for _ in range(10):
+            body = self.workflows(cursor=cursor, limit=3, fields="workflow", sort="score").json()
+            seen += [row["workflow"] for row in body["results"]]
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+
+        expected = Workflow.objects.order_by("-popularity_score", "-id").values_list("workflow", flat=True)
+        self.assertEqual(seen, list(expected))
+
+    def test_cursor_is_bound_to_its_sort(self):
+        cursor = self.workflows(cursor="", limit=3).json()["next_cursor"]
+        self.assertEqual(self.workflows(cursor=cursor, limit=3).status_code, 200)
+        self.assertEqual(self.workflows(cursor=cursor, sort="trending").status_code, 400)
+        self.assertEqual(self.workflows(cursor="not-a-cursor").status_code, 400)
+
+    def test_fields_projection(self):
+        rows = self.workflows(fields="workflow,popularity_score", limit=2).json()
+        self.assertEqual([set(row) for row in rows], [{"workflow", "popularity_score"}] * 2)
+        self.assertEqual(self.workflows(fields="workflow,secret").status_code, 400)
+
+    def test_projected_rows_match_the_serializer(self):
+        lean = self.workflows(fields="id,workflow,last_seen,created_at", limit=1).json()[0]
+        full = self.workflows(limit=1).json()[0]
+        self.assertEqual(lean, {name: full[name] for name in lean})
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        save_items([_item("a", 100), _item("b, with comma", 200)], "YouTube", "US")
+        save_items([_item("c", 300)], "Forum", "IN")
+
+    def export(self, headers=None, **params):
+        response = self.client.get("/api/workflows/export/", params, headers=headers)
+        return response, b"".join(response.streaming_content)
+
+    def test_ndjson(self):
+        response, body = self.export(platform="youtube")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in body.decode("utf-8").splitlines()]
+        self.assertEqual([row["workflow"] for row in rows], ["a", "b, with comma"])
+        self.assertEqual(rows[1]["popularity_metrics"]["views"], 200)
+
+    def test_csv(self):
+        response, body = self.export(format="csv")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        header, *rows = csv.reader(io.StringIO(body.decode("utf-8")))
+        self.assertEqual(header, EXPORT_FIELDS)
+        self.assertEqual(len(rows), 3)
+        row = dict(zip(header, rows[1]))
+        self.assertEqual(row["workflow"], "b, with comma")
+        self.assertEqual(json.loads(row["popularity_metrics"])["views"], 200)
+
+    def test_gzip_when_accepted(self):
+        response, body = self.export(format="csv", headers={"Accept-Encoding": "gzip, br"})
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(body), self.export(format="csv")[1])
+
+    def test_unknown_format(self):
+        response = self.client.get("/api/workflows/export/", {"format": "xml"})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(JOBS_EAGER=False)
+class EnqueueTests(TestCase):
+    def test_active_job_is_reused(self):
+        job, created = jobs.enqueue("forum", "US")
+        self.assertTrue(created)
+        self.assertEqual(jobs.enqueue("forum", "US"), (job, False))
+
+        FetchJob.objects.filter(pk=job.pk).update(status=FetchJob.RUNNING)
+        self.assertEqual(jobs.enqueue("forum", "US"), (job, False))
+
+        FetchJob.objects.filter(pk=job.pk).update(status=FetchJob.DONE)
+        again, created = jobs.enqueue("forum", "US")
+        self.assertTrue(created)
+        self.assertNotEqual(again.pk, job.pk)
+
+    def test_lost_race_with_a_finished_job_retries(self):
+        create = FetchJob.objects.create
+        attempts = []
+
+        def racing_create(**kwargs):
+            attempts.append(kwargs)
+            if len(attempts) == 1:
+                # Another worker won, and its job finished before we looked again
+                raise IntegrityError("fetchjob_one_active")
+            return create(**kwargs)
+
+        with mock.patch.object(FetchJob.objects, "create", side_effect=racing_create):
+            job, created = jobs.enqueue("forum", "US")
+
+        self.assertTrue(created)
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(job.status, FetchJob.QUEUED)
+
+    def test_lost_race_falls_back_to_newest_job(self):
+        done = FetchJob.objects.create(source="forum", country="US", status=FetchJob.DONE)
+        with mock.patch.object(FetchJob.objects, "create", side_effect=IntegrityError("busy")):
+            job, created = jobs.enqueue("forum", "US")
+        self.assertEqual((job, created), (done, False))
+
+    def test_reaped_job_keeps_failed_status(self):
+        job, _ = jobs.enqueue("trends", "US")
+        job = jobs.claim_next()
+
+        def slow_run(source, country):
+            FetchJob.objects.filter(pk=job.pk).update(started_at=timezone.now() - timedelta(days=1))
+            jobs._reap_stale()
+            return {"items": 0, "inserted": 0, "updated": 0, "unchanged": 0}
+
+        with mock.patch.object(jobs, "run_source", side_effect=slow_run):
+            finished = jobs.run_job(job)
+
+        self.assertEqual(finished.status, FetchJob.FAILED)
+        self.assertEqual(FetchJob.objects.get(pk=job.pk).error, "worker timed out")
+
+    def test_post_fetch_errors_are_logged_and_kept_on_the_job(self):
+        job, _ = jobs.enqueue("trends", "US")
+
+        with mock.patch.object(retention, "after_fetch", side_effect=RuntimeError("disk full")), \
+                mock.patch.object(scoring, "after_fetch") as rescore, \
+                self.assertLogs("workflows.orchestrator", "ERROR") as logs:
+            finished = jobs.run_job(job)
+
+        self.assertEqual(finished.status, FetchJob.DONE)
+        self.assertEqual(FetchJob.objects.get(pk=job.pk).result["post_fetch_errors"], {"expire": "disk full"})
+        self.assertIn("post-fetch expiry failed", logs.output[0])
+        rescore.assert_called_once()
+
+
+class PostFetchTests(TestCase):
+    def setUp(self):
+        patch = mock.patch.dict(orchestrator.SOURCES, {_FastCollector.name: _FastCollector})
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_first_duplicate_wins_everywhere(self):
+        items = [_item("a", 100), _item("a", 200)]
+        self.assertEqual([item["score"] for item in pipeline.dedupe(items)], [100])
+        self.assertEqual(save_items(items, "YouTube", "US")["inserted"], 1)
+        self.assertEqual(Workflow.objects.get().popularity_score, 100)
+
+    def test_fetch_commands_rescore_the_platforms_they_changed(self):
+        with mock.patch.object(scoring, "after_fetch", return_value=1) as rescore:
+            call_command("fetch_source", "fast", "US", stdout=io.StringIO())
+            call_command("fetch_source", "fast", "US", stdout=io.StringIO())
+        self.assertEqual([c.args[0] for c in rescore.call_args_list], [{"Forum"}, set()])
+
+    def test_hook_failures_are_reported_not_raised(self):
+        with mock.patch.object(retention, "after_fetch", side_effect=RuntimeError("disk full")), \
+                mock.patch.object(scoring, "after_fetch", return_value=3) as rescore, \
+                self.assertLogs("workflows.orchestrator", "ERROR"):
+            post = orchestrator.after_fetch({"Forum"}, "test")
+        self.assertEqual(post, {"expired": None, "rescored": 3, "errors": {"expire": "disk full"}})
+        rescore.assert_called_once_with({"Forum"})
+
+
+class ScoringTests(TestCase):
+    def test_each_platform_is_normalized_on_its_own(self):
+        platforms = np.array(["YouTube", "YouTube", "YouTube", "Forum", "Forum", "Myspace"], dtype=object)
+        metrics = np.zeros((6, len(SCORING_METRICS)))
+        metrics[:, 0] = [100, 200, 300, 5, 10, 99]  # views
+
+        self.assertEqual(compute_scores(platforms, metrics, "percentile").tolist(),
+                         [0, 50, 100, 0, 100, 0])
+        for method in SCORING_METHODS:
+            scores = compute_scores(platforms, metrics, method)
+            self.assertTrue(((scores >= 0) & (scores <= 100)).all(), method)
+            self.assertGreater(scores[2], scores[0], method)
+
+        config = {**settings.SCORING, "platform_weights": {"Forum": 0.5}}
+        self.assertEqual(compute_scores(platforms, metrics, "percentile", config)[4], 50)
+
+    def test_after_fetch_rescores_only_the_changed_platforms(self):
+        save_items([_item("a", 100), _item("b", 200)], "YouTube", "US")
+        save_items([_item("x", 5)], "Forum", "IN")
+        save_items([_item("y", 10)], "Forum", "US")
+        Workflow.objects.update(normalized_score=-1)
+
+        self.assertIsNone(scoring.after_fetch([]))
+        self.assertEqual(scoring.after_fetch(["Forum"]), 2)
+        scores = dict(Workflow.objects.values_list("workflow", "normalized_score"))
+        # Both Forum countries share one distribution
+        self.assertEqual(scores, {"a": -1, "b": -1, "x": 0, "y": 100})
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_normalized_is_the_default_ranking(self):
+        cache.clear()
+        save_items([_item("a", 100), _item("b", 200), _item("c", 300)], "YouTube", "US")
+        save_items([_item("x", 5), _item("y", 10)], "Forum", "US")
+        scoring.rescore_all()
+
+        def ranking(**params):
+            return [row["workflow"] for row in self.client.get("/api/workflows/", params).json()]
+
+        # Each platform's leader scores 100; id breaks the tie
+        self.assertEqual(ranking(), ["y", "c", "b", "x", "a"])
+        self.assertEqual(ranking(sort="score"), ["c", "b", "a", "y", "x"])
+
+
+class ResolutionTests(TestCase):
+    def setUp(self):
+        save_items([_item("Gmail to Google Sheets automation with n8n", 900),
+                    _item("Slack bot tutorial", 300)], "YouTube", "US")
+        save_items([_item("Automate Gmail → Google Sheets", 50)], "Forum", "US")
+        save_items([_item("n8n जीमेल ऑटोमेशन", 400)], "YouTube", "IN")
+        save_items([_item("जीमेल ऑटोमेशन वर्कफ़्लो", 20)], "Forum", "IN")
+        scoring.rescore_all()
+        resolve_workflows()
+
+    def test_title_tokens(self):
+        self.assertEqual(title_tokens("How to automate Gmail → Google Sheets workflows 🚀 (2024)"),
+                         {"gmail", "google", "sheet"})
+        # Vowel signs stay inside their words
+        self.assertEqual(title_tokens("n8n से जीमेल ऑटोमेशन"), {"से", "जीमेल", "ऑटोमेशन"})
+
+    def test_titles_cluster_across_platforms(self):
+        canonical = dict(Workflow.objects.values_list("workflow", "canonical_id"))
+        self.assertEqual(canonical["Gmail to Google Sheets automation with n8n"],
+                         canonical["Automate Gmail → Google Sheets"])
+        self.assertEqual(canonical["n8n जीमेल ऑटोमेशन"], canonical["जीमेल ऑटोमेशन वर्कफ़्लो"])
+        self.assertEqual(len(set(canonical.values())), 3)
+
+        gmail = CanonicalWorkflow.objects.get(pk=canonical["Automate Gmail → Google Sheets"])
+        self.assertEqual(gmail.name, "Gmail to Google Sheets automation with n8n")
+        self.assertEqual((gmail.member_count, gmail.platforms), (2, ["Forum", "YouTube"]))
+
+    def test_canonical_endpoint(self):
+        rows = self.client.get("/api/canonical/").json()
+        self.assertEqual(len(rows), 3)
+        self.assertEqual([r["name"] for r in self.client.get("/api/canonical/", {"platform": "forum"}).json()],
+                         [r["name"] for r in rows if "Forum" in r["platforms"]])
+        self.assertEqual(len(self.client.get("/api/canonical/", {"limit": -5}).json()), 1)
+        self.assertEqual(self.client.get("/api/canonical/", {"limit": "ten"}).status_code, 400)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        save_items([_item("Slack alerts from Google Sheets", 5000),
+                    _item("Slack bot in ten minutes", 50),
+                    _item("Notion CRM sync", 900)], "YouTube", "US")
+        save_items([_item("Slack approval flow", 10)], "Forum", "US")
+
+    def search(self, **params):
+        return self.client.get("/api/workflows/search", params)
+
+    def titles(self, **params):
+        return [row["workflow"] for row in self.search(**params).json()]
+
+    def test_matches_rank_by_relevance_and_popularity(self):
+        rows = self.search(q="slack").json()
+        self.assertEqual([r["workflow"] for r in rows], [
+            "Slack alerts from Google Sheets", "Slack bot in ten minutes", "Slack approval flow",
+        ])
+        self.assertEqual([r["rank"] for r in rows], sorted((r["rank"] for r in rows), reverse=True))
+
+    def test_prefix_filters_and_limit(self):
+        self.assertEqual(self.titles(q="notio"), ["Notion CRM sync"])
+        self.assertEqual(self.titles(q="slack", platform="forum"), ["Slack approval flow"])
+        self.assertEqual(self.titles(q="slack sheets"), ["Slack alerts from Google Sheets"])
+        self.assertEqual(len(self.titles(q="slack", limit=-3)), 1)
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual(self.titles(q='slack" OR notion*'), [])
+        self.assertEqual(self.titles(q="🚀"), [])
+
+    def test_bad_parameters(self):
+        self.assertEqual(self.search().status_code, 400)
+        self.assertEqual(self.search(q="slack", limit="all").status_code, 400)
+        self.assertEqual(self.client.get("/api/workflows/", {"limit": "all"}).status_code, 400)
+
+
+@override_settings(YOUTUBE_DAILY_QUOTA=250)
+class KeyPoolTests(TestCase):
+    day = date(2026, 10, 18)
+
+    def pool(self, keys=("key-a", "key-b")):
+        return KeyPool(list(keys), day=self.day)
+
+    def test_least_used_key_is_charged_until_the_budget_is_gone(self):
+        pool = self.pool()
+        self.assertEqual(pool.remaining(), 500)
+
+        charged = [pool.reserve("search") for _ in range(4)]
+        self.assertEqual(sorted(charged), ["key-a", "key-a", "key-b", "key-b"])
+        self.assertIsNone(pool.reserve("search"))
+        self.assertIsNotNone(pool.reserve("videos"))
+        self.assertEqual((pool.spent, pool.remaining()), (401, 99))
+
+        # Only fingerprints reach the DB
+        self.assertFalse(YouTubeQuota.objects.filter(key_id__in=["key-a", "key-b"]).exists())
+
+    def test_pools_share_the_daily_budget(self):
+        first, second = self.pool(), self.pool()
+        first.reserve("search")
+        first.reserve("search")
+        self.assertEqual(second.remaining(), 300)
+        self.assertEqual(second.spent, 0)
+
+    def test_rejected_keys_rotate(self):
+        pool = self.pool()
+
+        def api(url, params):
+            status = 403 if params["key"] == "key-a" else 200
+            return make_response(url, status, b'{"items": []}')
+
+        with http_client.replay(api):
+            self.assertEqual(youtube_call(pool, "search", YOUTUBE_SEARCH_URL, {}), {"items": []})
+            self.assertEqual(youtube_call(pool, "search", YOUTUBE_SEARCH_URL, {}), {"items": []})
+            # key-a is out for the day and key-b can't afford a third search
+            self.assertIsNone(youtube_call(pool, "search", YOUTUBE_SEARCH_URL, {}))
+        self.assertEqual(pool.remaining(), 50)
+        self.assertEqual([row["exhausted"] for row in pool.usage()].count(True), 1)
+
+    def test_plan_fits_the_budget_and_rotates_daily(self):
+        keywords, regions = ["a", "b", "c"], ["US", "IN"]
+        self.assertEqual(len(plan_searches(keywords, regions, 10_000, day=self.day)), 6)
+        self.assertEqual(plan_searches(keywords, regions, 100, day=self.day), [])
+        self.assertEqual(len(plan_searches(keywords, regions, 202 * 2, pages=2, day=self.day)), 2)
+
+        days = [self.day + timedelta(days=i) for i in range(6)]
+        firsts = {plan_searches(keywords, regions, 101, day=d)[0] for d in days}
+        self.assertEqual(len(firsts), 6)
+
+
+class RefreshTierTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        rows = [
+            # (title, video id, trending_score, hours since last seen)
+            ("hot fresh", "hotFresh001", 500, 0.5),
+            ("hot stale", "hotStale001", 500, 2),
+            ("warm fresh", "warmFresh01", 10, 3),
+            ("warm stale", "warmStale01", 10, 7),
+            ("cold fresh", "coldFresh01", 0, 12),
+            ("cold stale", "coldStale01", 0, 25),
+        ]
+        for title, vid, trending, hours in rows:
+            Workflow.objects.create(
+                workflow=title, platform="YouTube", country="US",
+                source_url=f"https://www.youtube.com/watch?v={vid}",
+                trending_score=trending, last_seen=self.now - timedelta(hours=hours),
+            )
+        Workflow.objects.create(workflow="never seen", platform="YouTube", country="US",
+                                source_url="https://www.youtube.com/watch?v=neverSeen01")
+        Workflow.objects.create(workflow="other country", platform="YouTube", country="IN",
+                                source_url="https://www.youtube.com/watch?v=otherCtry01",
+                                trending_score=500, last_seen=self.now - timedelta(days=3))
+
+    def test_each_tier_is_due_after_its_own_interval(self):
+        due = list(collectors.due_for_refresh("US", now=self.now).values_list("workflow", flat=True))
+        # Hottest first; where NULL last_seen sorts among the cold rows is up to the DB
+        self.assertEqual(due[:2], ["hot stale", "warm stale"])
+        self.assertEqual(sorted(due[2:]), ["cold stale", "never seen"])
+
+    def test_refresh_fetches_stats_of_due_videos_only(self):
+        calls = []
+
+        def api(url, params):
+            calls.append((url, params))
+            ids = params["id"].split(",")
+            items = [{"id": vid, "statistics": {"viewCount": "100", "likeCount": "10"}} for vid in ids]
+            return make_response(url, 200, json.dumps({"items": items}))
+
+        pool = KeyPool(["key-a"], day=date(2026, 10, 18))
+        with http_client.replay(api):
+            items = list(collectors.iter_youtube_refresh("US", pool=pool, now=self.now))
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0][0], YOUTUBE_STATS_URL)
+        self.assertEqual(
+            sorted(calls[0][1]["id"].split(",")),
+            ["coldStale01", "hotStale001", "neverSeen01", "warmStale01"],
+        )
+        self.assertEqual(
+            sorted(item["workflow"] for item in items),
+            ["cold stale", "hot stale", "never seen", "warm stale"],
+        )
+        self.assertEqual(items[0]["metrics"]["views"], 100)
+        self.assertEqual(pool.spent, QUOTA_COST["videos"])
+
+
+class MetricsTests(TestCase):
+    def test_registry_renders_counters_and_histograms(self):
+        counter = metrics.Counter("test_total", "Test counter", ["kind"])
+        histogram = metrics.Histogram("test_seconds", "Test histogram", buckets=(0.1, 1))
+        self.addCleanup(metrics.REGISTRY.remove, counter)
+        self.addCleanup(metrics.REGISTRY.remove, histogram)
+
+        counter.inc(kind='a "b"')
+        counter.inc(2, kind='a "b"')
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+
+        lines = metrics.render().splitlines()
+        self.assertIn("# TYPE test_total counter", lines)
+        self.assertIn('test_total{kind="a \\"b\\""} 3', lines)
+        self.assertIn('test_seconds_bucket{le="0.1"} 1', lines)
+        self.assertIn('test_seconds_bucket{le="1"} 2', lines)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 3', lines)
+        self.assertIn("test_seconds_count 3", lines)
+
+    def test_endpoint_exposes_pipeline_and_api_metrics(self):
+        def forum(url, params):
+            return make_response(url, 429, b"")
+
+        with http_client.replay(forum):
+            http_client.get("https://community.n8n.io/latest.json")
+        save_items([_item("a", 100)], "YouTube", "US")
+        self.client.get("/api/workflows/")
+
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = response.content.decode()
+        for sample in (
+            'collector_http_request_seconds_count{source="forum",endpoint="latest.json"}',
+            'collector_http_rejections_total{source="forum",endpoint="latest.json",status="429"}',
+            'db_upsert_seconds_count{platform="YouTube"}',
+            'db_rows_changed_count{platform="YouTube",change="inserted"}',
+            'api_request_seconds_count{view="list_workflows",method="GET",status="200"}',
+        ):
+            self.assertIn(sample, body)
+
+    def test_stages_log_one_json_line(self):
+        with self.assertLogs("workflows.stages", level="INFO") as logs:
+            save_items([_item("a", 100)], "YouTube", "US")
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record["stage"], "save")
+        self.assertEqual(record["platform"], "YouTube")
+        self.assertIn("ts", record)
+
+
+@override_settings(
+    JOBS_EAGER=False,
+    SCHEDULE_INTERVALS={"forum": (0.5, 2, 12), "trends": (12, 24, 168)},
+)
+class ScheduleTests(TestCase):
+    def setUp(self):
+        scheduler.ensure_schedules(countries=["US", "IN"])
+        self.later = timezone.now() + timedelta(days=1)
+
+    def test_due_schedules_are_claimed_once(self):
+        queued = scheduler.enqueue_due(now=self.later)
+        self.assertEqual(
+            sorted((job.source, job.country) for job in queued),
+            [("forum", "IN"), ("forum", "US"), ("trends", "IN"), ("trends", "US")],
+        )
+        for schedule in FetchSchedule.objects.all():
+            self.assertGreater(schedule.next_run_at, self.later)
+
+        # A second scheduler at the same instant finds nothing due
+        self.assertEqual(scheduler.enqueue_due(now=self.later), [])
+        self.assertEqual(FetchJob.objects.count(), 4)
+
+    def test_concurrent_scheduler_claims_each_row_once(self):
+        enqueue = jobs.enqueue
+        other = []
+
+        def enqueue_while_another_scheduler_runs(source, country):
+            if not other:
+                # A second scheduler runs between our first claim and the rest
+                other.extend(scheduler.enqueue_due(now=self.later))
+            return enqueue(source, country)
+
+        with mock.patch.object(jobs, "enqueue", side_effect=enqueue_while_another_scheduler_runs) as m:
+            ours = scheduler.enqueue_due(now=self.later)
+
+        self.assertEqual((len(ours), len(other)), (1, 3))
+        # Rows the other scheduler claimed were not claimed (and enqueued) again
+        self.assertEqual(m.call_count, 4)
+
+    def test_active_job_coalesces(self):
+        manual, _ = jobs.enqueue("forum", "US")
+        queued = scheduler.enqueue_due(now=self.later)
+        self.assertEqual(len(queued), 3)
+        self.assertEqual(FetchJob.objects.filter(source="forum", country="US").count(), 1)
+        self.assertNotIn(manual, queued)
+
+
+class RetentionTests(TestCase):
+    def setUp(self):
+        save_items([_item(f"w{i}", 100 * i) for i in range(1, 7)], "YouTube", "US")
+        self.old = timezone.now() - timedelta(days=90)
+        Workflow.objects.filter(workflow__in=["w1", "w2", "w3"]).update(last_seen=self.old)
+
+    def test_expire_archives_stale_rows(self):
+        stats = retention.expire_workflows(days=30, batch_size=2)
+        self.assertEqual((stats["expired"], stats["batches"]), (3, 2))
+
+        self.assertEqual(sorted(Workflow.objects.values_list("workflow", flat=True)), ["w4", "w5", "w6"])
+        self.assertEqual(
+            sorted(ArchivedWorkflow.objects.values_list("workflow", flat=True)), ["w1", "w2", "w3"]
+        )
+        self.assertEqual(WorkflowSnapshot.objects.count(), 3)
+
+        incremental = _rollup("YouTube", "US")
+        self.assertEqual(incremental["count"], 3)
+        insights.recompute("YouTube", "US")
+        self.assertEqual(incremental, _rollup("YouTube", "US"))
+
+    def test_row_seen_during_expiry_is_kept(self):
+        atomic = transaction.atomic
+        fetched = []
+
+        def fetch_in_between(*args, **kwargs):
+            if not fetched:
+                # save_items sees w2 after the stale ids were read
+                fetched.append(None)
+                fetched[0] = save_items([_item("w2", 200)], "YouTube", "US")
+            return atomic(*args, **kwargs)
+
+        with mock.patch.object(retention.transaction, "atomic", fetch_in_between):
+            stats = retention.expire_workflows(days=30)
+
+        self.assertEqual(fetched, [{"inserted": 0, "updated": 0, "unchanged": 1}])
+        self.assertEqual(stats["expired"], 2)
+        self.assertTrue(Workflow.objects.filter(workflow="w2").exists())
+        self.assertFalse(ArchivedWorkflow.objects.filter(workflow="w2").exists())
+
+    def test_refetched_title_is_restored_from_archive(self):
+        retention.expire_workflows(days=30)
+        stats = save_items([_item("w1", 150)], "YouTube", "US")
+
+        self.assertEqual(stats["inserted"], 1)
+        self.assertTrue(Workflow.objects.filter(workflow="w1").exists())
+        self.assertFalse(ArchivedWorkflow.objects.filter(workflow="w1").exists())
+        self.assertEqual(ArchivedWorkflow.objects.count(), 2)
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_include_archived_merges_both_tables(self):
+        cache.clear()
+        retention.expire_workflows(days=30)
+        listed = self.client.get("/api/workflows/", {"sort": "score"}).json()
+        merged = self.client.get("/api/workflows/", {"sort": "score", "include_archived": "true"}).json()
+
+        self.assertEqual([row["workflow"] for row in merged], ["w6", "w5", "w4", "w3", "w2", "w1"])
+        self.assertEqual([row["archived"] for row in merged], [False] * 3 + [True] * 3)
+        # Same datetime format as the serialized listing
+        self.assertEqual(merged[0]["last_seen"], listed[0]["last_seen"])
+
+    def test_include_archived_ties_merge_on_the_original_id(self):
+        retention.expire_workflows(days=30)
+        # Archive ids ascending while their original ids descend
+        for original_id in (2000, 1000):
+            ArchivedWorkflow.objects.create(
+                original_id=original_id, workflow=f"old {original_id}", platform="YouTube",
+                country="US", created_at=self.old, archived_at=self.old,
+            )
+        Workflow.objects.update(popularity_score=0)
+        ArchivedWorkflow.objects.update(popularity_score=0)
+
+        merged = self.client.get("/api/workflows/", {"sort": "score", "include_archived": "true"}).json()
+        ids = [row["id"] for row in merged]
+        self.assertEqual(len(ids), 8)
+        self.assertEqual(ids, sorted(ids, reverse=True))
+
+    def test_include_archived_rejects_cursor_and_fields(self):
+        for params in ({"cursor": ""}, {"fields": "workflow"}):
+            response = self.client.get("/api/workflows/", {"include_archived": "true", **params})
+            self.assertEqual(response.status_code, 400, params)
+
+
+class ScoreSummaryTests(TestCase):
+    def test_percentiles_within_one_bucket(self):
+        save_items([_item(f"w{i}", i) for i in range(1, 101)], "YouTube", "US")
+        summary = insights.score_summary(WorkflowInsight.objects.get())
+
+        self.assertEqual(summary["mean"], 50.5)
+        self.assertEqual(summary["max"], 100)
+        # One bucket spans 10^(1/20) ≈ 12% of the score
+        width = 10 ** (1 / insights.BUCKETS_PER_DECADE)
+        for q in insights.PERCENTILES:
+            self.assertLess(abs(math.log((1 + summary[f"p{q}"]) / (1 + q))), math.log(width), q)
+
+    def test_empty_rollup(self):
+        summary = insights.score_summary(WorkflowInsight(platform="Forum", country="US"))
+        self.assertEqual(summary, {"mean": None, "max": None, "p50": None, "p75": None,
+                                   "p90": None, "p99": None})
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ContentHashTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        save_items([_item("a", 100)], "YouTube", "US")
+
+    def test_digest_is_stored_but_never_served(self):
+        self.assertTrue(Workflow.objects.get().content_hash)
+
+        listed = self.client.get("/api/workflows/").json()
+        self.assertEqual(len(listed), 1)
+        self.assertNotIn("content_hash", listed[0])
+
+        projected = self.client.get("/api/workflows/", {"fields": "content_hash"})
+        self.assertEqual(projected.status_code, 400)
+
+        ndjson = b"".join(self.client.get("/api/workflows/export/").streaming_content)
+        self.assertNotIn("content_hash", json.loads(ndjson))
+        self.assertNotIn("content_hash", EXPORT_FIELDS)
+
+
+class RendererTests(TestCase):
+    def test_orjson_matches_json_renderer(self):
+        data = {
+            "when": datetime(2026, 10, 18, 9, 30, tzinfo=dt_timezone.utc),
+            "price": Decimal("1.5"),
+            "label": gettext_lazy("Popularity"),
+            "title": "n8n जीमेल ऑटोमेशन",
+            "rows": [{"id": 1, "metrics": {"views": 10}}, None],
+        }
+        fast = ORJSONRenderer().render(data)
+        self.assertEqual(json.loads(fast), json.loads(JSONRenderer().render(data)))
+        self.assertIn(b'"2026-10-18T09:30:00Z"', fast)
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CompressionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        save_items([_item(f"workflow {i}", 100 * i) for i in range(1, 6)], "YouTube", "US")
+
+    def get(self, encoding, **headers):
+        return self.client.get("/api/workflows/", headers={"Accept-Encoding": encoding, **headers})
+
+    def test_gzip_when_accepted(self):
+        plain = self.get("identity")
+        self.assertFalse(plain.has_header("Content-Encoding"))
+
+        response = self.get("gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    @skipIf(brotli is None, "Brotli is not installed")
+    def test_brotli_preferred_when_accepted(self):
+        response = self.get("gzip, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(response.content), self.get("identity").content)
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_small_bodies_are_left_alone(self):
+        response = self.client.get(
+            "/api/workflows/", {"platform": "Myspace"}, headers={"Accept-Encoding": "gzip, br"}
+        )
+        self.assertEqual(response.content, b"[]")
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_compressed_etag_is_weak_and_still_revalidates(self):
+        for encoding in ("br", "gzip") if brotli else ("gzip",):
+            response = self.get(encoding)
+            self.assertEqual(response["Content-Encoding"], encoding)
+            etag = response["ETag"]
+            self.assertTrue(etag.startswith('W/"'), encoding)
+            self.assertEqual(self.get(encoding, **{"If-None-Match": etag}).status_code, 304, encoding)
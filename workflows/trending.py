@@ -0,0 +1,40 @@
+import math
+
+from django.conf import settings
+
+
+def _number(value):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def velocity(prev_metrics, metrics, hours):
+    """Weighted per-hour growth of the TRENDING_WEIGHTS counters."""
+    gained = sum(
+        weight * max(_number(metrics.get(name)) - _number(prev_metrics.get(name)), 0.0)
+        for name, weight in settings.TRENDING_WEIGHTS.items()
+    )
+    return gained / hours
+
+
+def trending_score(prev_trending, prev_metrics, prev_seen, metrics, now):
+    """
+    Exponentially decayed velocity.
+
+    Between two fetches `hours` apart the old value decays by
+    0.5 ** (hours / TRENDING_HALF_LIFE_HOURS) and the new velocity fills
+    the remainder, so a long quiet gap weighs the fresh velocity more and
+    a burst of frequent fetches smooths it out.
+    """
+    if prev_seen is None:
+        return 0.0
+
+    # Floor the gap so back-to-back fetches can't divide by ~0.
+    hours = max((now - prev_seen).total_seconds() / 3600, 1 / 60)
+    decay = math.pow(0.5, hours / settings.TRENDING_HALF_LIFE_HOURS)
+    return round(
+        (prev_trending or 0.0) * decay + (1 - decay) * velocity(prev_metrics, metrics, hours),
+        4,
+    )
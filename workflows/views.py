@@ -1,42 +1,388 @@
+import base64
+import heapq
+import json
+from itertools import islice
+
 from django.conf import settings
-from django.http import JsonResponse, HttpResponseForbidden
+from django.http import (
+    HttpResponse,
+    HttpResponseForbidden,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.views.decorators.csrf import csrf_exempt
 
+from rest_framework import serializers
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
-from .models import Workflow
-from .serializers import WorkflowSerializer
-from .tasks import get_cron_status
-from django.core.management import call_command
+from .jobs import enqueue, job_timings
+from .models import CanonicalWorkflow, FetchJob, Workflow, WorkflowInsight, WorkflowSnapshot
+from .orchestrator import SOURCES
+from . import metrics, search
+from .serializers import (
+    INTERNAL_FIELDS,
+    CanonicalWorkflowSerializer,
+    WorkflowInsightSerializer,
+    WorkflowSerializer,
+    WorkflowSnapshotSerializer,
+)
+from .exporters import export_rows, gzip_stream, iter_csv, iter_ndjson
+from .leaderboard import (
+    DEFAULT_SORT,
+    SORT_FIELDS,
+    archived_workflows,
+    filtered_workflows,
+    get_leaderboard,
+)
+from .renderers import dumps
+from .scheduler import schedule_status
+
+
+# Everything a client may ask for with ?fields=
+PROJECTABLE_FIELDS = [f.name for f in Workflow._meta.concrete_fields if f.name not in INTERNAL_FIELDS]
+
+# Columns of ?include_archived=true rows (both tables have them)
+ARCHIVE_LIST_FIELDS = [
+    "workflow", "platform", "country", "source_url", "popularity_metrics",
+    "popularity_score", "normalized_score", "trending_score", "last_seen", "created_at",
+]
+
+
+def _json_response(data, status=200):
+    """JsonResponse for the plain Django views, encoded like the DRF ones (orjson)."""
+    return HttpResponse(dumps(data), status=status, content_type="application/json")
+
+
+def _truthy(value):
+    return (value or "").lower() in ("1", "true", "yes")
+
+
+def _limit(request, default, maximum):
+    """?limit= clamped to 1..maximum, or None when it isn't an integer."""
+    try:
+        limit = int(request.GET.get("limit", default))
+    except ValueError:
+        return None
+    return min(max(limit, 1), maximum)
+
+
+def _encode_cursor(row, sort):
+    raw = json.dumps([sort, row[SORT_FIELDS[sort]], row["id"]]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(token):
+    """(sort, score, id) of a next_cursor; ValueError/TypeError if malformed."""
+    raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    sort, score, pk = json.loads(raw)
+    return sort, float(score), int(pk)
+
+
+# .values() rows bypass WorkflowSerializer; format datetimes the way it does
+DATETIME_FIELDS = {
+    f.name for f in Workflow._meta.concrete_fields if f.get_internal_type() == "DateTimeField"
+}
+_datetime_repr = serializers.DateTimeField().to_representation
+
+
+def _format_datetimes(rows):
+    for row in rows:
+        for name in DATETIME_FIELDS.intersection(row):
+            row[name] = _datetime_repr(row[name])
+    return rows
 
 
 @api_view(["GET"])
 def list_workflows(request):
     platform = request.GET.get("platform")
     country = request.GET.get("country")
-    limit = int(request.GET.get("limit", 100))
+    limit = _limit(request, 100, 1000)
+    if limit is None:
+        return Response({"error": "limit must be an integer"}, status=400)
+    sort = request.GET.get("sort", DEFAULT_SORT)
 
-    qs = Workflow.objects.all()
+    if sort not in SORT_FIELDS:
+        return Response({"error": f"sort must be one of {', '.join(SORT_FIELDS)}"}, status=400)
 
+    if _truthy(request.GET.get("include_archived")):
+        if "cursor" in request.GET or "fields" in request.GET:
+            return Response(
+                {"error": "cursor and fields are not supported with include_archived"}, status=400
+            )
+        return _list_with_archived(platform, country, sort, limit)
+
+    if "cursor" in request.GET or "fields" in request.GET:
+        return _list_workflows_lean(request, platform, country, sort, limit)
+
+    # Served from the pre-rendered leaderboard cache; save_items
+    # invalidates it whenever a fetch writes rows.
+    body, etag = get_leaderboard(platform, country, limit, sort)
+
+    if etag in request.headers.get("If-None-Match", ""):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+def _list_workflows_lean(request, platform, country, sort, limit):
+    """
+    Keyset-paginated, projected listing that skips WorkflowSerializer.
+
+    ?fields=workflow,popularity_score  -> .values() of just those columns
+    ?cursor=                           -> first page, wrapped as
+                                          {"results": [...], "next_cursor": ...}
+    ?cursor=<next_cursor>              -> rows strictly after that
+                                          (sort column, id) position;
+                                          400 if issued for another sort
+
+    Each page is an index range scan on (sort column, id), so deep pages
+    cost the same as the first one, unlike OFFSET.
+    """
+    fields = [f for f in request.GET.get("fields", "").split(",") if f] or PROJECTABLE_FIELDS
+    unknown = set(fields) - set(PROJECTABLE_FIELDS)
+    if unknown:
+        return Response({"error": f"Unknown fields: {', '.join(sorted(unknown))}"}, status=400)
+
+    qs = filtered_workflows(platform, country, sort)
+    field = SORT_FIELDS[sort]
+
+    paginate = "cursor" in request.GET
+    token = request.GET.get("cursor")
+    if token:
+        try:
+            cursor_sort, score, pk = _decode_cursor(token)
+        except (ValueError, TypeError):
+            return Response({"error": "Invalid cursor"}, status=400)
+        if cursor_sort != sort:
+            return Response({"error": f"cursor was issued for sort={cursor_sort}"}, status=400)
+        # score <= s AND NOT (score = s AND id >= pk): a plain range on the
+        # index, which SQLite and Postgres both seek into directly.
+        qs = qs.filter(**{f"{field}__lte": score}).exclude(**{field: score, "id__gte": pk})
+
+    # The cursor needs the sort keys even when they weren't requested.
+    columns = list(dict.fromkeys(fields + [field, "id"]))
+    rows = list(qs.values(*columns)[: limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = _encode_cursor(rows[-1], sort) if has_more and rows else None
+    extra = set(columns) - set(fields)
+    if extra:
+        for row in rows:
+            for key in extra:
+                del row[key]
+    _format_datetimes(rows)
+
+    if not paginate:
+        return Response(rows)
+    return Response({"results": rows, "next_cursor": next_cursor})
+
+
+def _list_with_archived(platform, country, sort, limit):
+    """
+    ?include_archived=true: hot and expired rows merged on the sort
+    column, each flagged "archived" (archived rows keep their old id).
+    Both sides are top-`limit` index scans, so at most 2 x limit rows
+    are read. Only the ArchivedWorkflow table is merged: rows expired
+    with WORKFLOW_ARCHIVE=ndjson live in files and never show up here.
+    """
+    field = SORT_FIELDS[sort]
+    hot = filtered_workflows(platform, country, sort).values("id", *ARCHIVE_LIST_FIELDS)[:limit]
+    cold = archived_workflows(platform, country, sort).values("original_id", *ARCHIVE_LIST_FIELDS)[:limit]
+
+    hot = [{**row, "archived": False} for row in hot]
+    cold = [{"id": row.pop("original_id"), **row, "archived": True} for row in cold]
+    rows = heapq.merge(hot, cold, key=lambda row: (row[field], row["id"]), reverse=True)
+    return Response(_format_datetimes(list(islice(rows, limit))))
+
+
+def export_workflows(request):
+    """
+    GET /api/workflows/export/?format=ndjson|csv&platform=...&country=...
+        &include_archived=true
+
+    Streams the whole (filtered) table; gzip-compressed on the fly when
+    the client accepts it. Memory stays flat whatever the table size.
+    """
+    fmt = request.GET.get("format", "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        return _json_response({"error": "format must be ndjson or csv"}, status=400)
+
+    rows = export_rows(
+        request.GET.get("platform"),
+        request.GET.get("country"),
+        include_archived=_truthy(request.GET.get("include_archived")),
+    )
+    chunks = iter_ndjson(rows) if fmt == "ndjson" else iter_csv(rows)
+    content_type = "application/x-ndjson" if fmt == "ndjson" else "text/csv"
+
+    if "gzip" in request.headers.get("Accept-Encoding", ""):
+        response = StreamingHttpResponse(gzip_stream(chunks), content_type=content_type)
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+    response["Vary"] = "Accept-Encoding"
+    response["Content-Disposition"] = f'attachment; filename="workflows.{fmt}"'
+    return response
+
+
+@api_view(["GET"])
+def workflow_history(request, pk):
+    """
+    GET /api/workflows/<id>/history/?resolution=raw|hourly|daily&since=<iso>
+
+    Snapshot points oldest first. Older history only exists at the
+    coarser resolutions once compact_snapshots has run.
+    """
+    workflow = get_object_or_404(Workflow, pk=pk)
+    qs = WorkflowSnapshot.objects.filter(workflow=workflow)
+
+    resolution = request.GET.get("resolution")
+    if resolution:
+        levels = {label: value for value, label in WorkflowSnapshot.RESOLUTION_CHOICES}
+        if resolution not in levels:
+            return Response({"error": "Unknown resolution"}, status=400)
+        qs = qs.filter(resolution=levels[resolution])
+
+    since = request.GET.get("since")
+    if since:
+        try:
+            since = parse_datetime(since)
+        except ValueError:  # well formed but out of range, e.g. month 13
+            since = None
+        if since is None:
+            return Response({"error": "Invalid since"}, status=400)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        qs = qs.filter(captured_at__gte=since)
+
+    return Response({
+        "id": workflow.pk,
+        "workflow": workflow.workflow,
+        "platform": workflow.platform,
+        "country": workflow.country,
+        "history": WorkflowSnapshotSerializer(qs.order_by("captured_at"), many=True).data,
+    })
+
+
+@api_view(["GET"])
+def search_workflows(request):
+    """
+    GET /api/workflows/search?q=slack+notion&platform=YouTube&limit=20
+
+    Full-text title search, ranked by text relevance weighted by
+    popularity_score. Each result carries its "rank".
+    """
+    q = request.GET.get("q", "").strip()
+    if not q:
+        return Response({"error": "q is required"}, status=400)
+    limit = _limit(request, 20, 100)
+    if limit is None:
+        return Response({"error": "limit must be an integer"}, status=400)
+
+    hits = search.search_workflows(
+        q,
+        platform=request.GET.get("platform"),
+        country=request.GET.get("country"),
+        limit=limit,
+    )
+    data = WorkflowSerializer([w for w, _ in hits], many=True).data
+    for row, (_, rank) in zip(data, hits):
+        row["rank"] = rank
+    return Response(data)
+
+
+@api_view(["GET"])
+def list_canonical_workflows(request):
+    """
+    GET /api/canonical/?platform=YouTube&limit=50
+
+    Cross-platform clusters from resolve_workflows, best aggregated score first.
+    """
+    limit = _limit(request, 100, 1000)
+    if limit is None:
+        return Response({"error": "limit must be an integer"}, status=400)
+    platform = request.GET.get("platform")
+
+    qs = CanonicalWorkflow.objects.order_by("-score", "-id")
     if platform:
-        qs = qs.filter(platform__iexact=platform)
-    if country:
-        qs = qs.filter(country__iexact=country)
+        qs = qs.filter(members__platform__iexact=platform).distinct()
 
-    qs = qs.order_by("-popularity_score")[: min(limit, 1000)]
-    serializer = WorkflowSerializer(qs, many=True)
+    serializer = CanonicalWorkflowSerializer(qs[:limit], many=True)
     return Response(serializer.data)
 
 
+@api_view(["GET"])
+def workflow_insights(request):
+    """
+    GET /api/insights/?platform=YouTube&country=US
+
+    Pre-aggregated dashboard numbers per (platform, country): row count,
+    views/likes/comments/replies totals, score mean/max/percentiles and
+    the top rows. With both filters this is one row by its unique key;
+    otherwise every matching rollup (one per platform x country).
+    """
+    platform = request.GET.get("platform")
+    country = request.GET.get("country")
+
+    if platform:
+        platforms = {p.upper(): p for p, _ in Workflow.PLATFORM_CHOICES}
+        if platform.upper() not in platforms:
+            return Response({"error": "Unknown platform"}, status=400)
+        platform = platforms[platform.upper()]
+
+    if platform and country:
+        insight = get_object_or_404(WorkflowInsight, platform=platform, country=country.upper())
+        return Response(WorkflowInsightSerializer(insight).data)
+
+    qs = WorkflowInsight.objects.all()
+    if platform:
+        qs = qs.filter(platform=platform)
+    if country:
+        qs = qs.filter(country=country.upper())
+    return Response(WorkflowInsightSerializer(qs, many=True).data)
+
+
+def prometheus_metrics(request):
+    """GET /metrics — Prometheus text exposition of this process's metrics."""
+    return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @api_view(["GET"])
 def cron_status(request):
-    last_run, next_run = get_cron_status()
+    """
+    GET /api/status/
+
+    Real schedule state from FetchSchedule (run_jobs --schedule): the
+    latest run, the next due run, the shortest current interval and one
+    entry per (source, country).
+    """
+    last_run, next_run, schedules = schedule_status()
     return Response(
         {
             "last_run": last_run,
             "next_run": next_run,
-            "interval_hours": 6,
+            "interval_hours": round(min(s.interval_seconds for s in schedules) / 3600, 2)
+            if schedules else None,
+            "schedules": [
+                {
+                    "source": s.source,
+                    "country": s.country,
+                    "interval_hours": round(s.interval_seconds / 3600, 2),
+                    "next_run": s.next_run_at,
+                    "last_run": s.last_run_at,
+                    "last_status": s.last_status,
+                    "change_rate": s.change_rate,
+                }
+                for s in schedules
+            ],
         }
     )
 
@@ -45,12 +391,13 @@ def cron_status(request):
 def trigger_fetch(request, source, country):
     """
     Manual trigger for cron / Streamlit / GitHub Actions.
+    Queues the fetch and answers 202 right away; poll /api/jobs/<id>/.
 
     POST /trigger/youtube/US/
     Header: X-Trigger-Secret: <TRIGGER_SECRET>
     """
     if request.method != "POST":
-        return JsonResponse({"detail": "Method not allowed"}, status=405)
+        return _json_response({"detail": "Method not allowed"}, status=405)
 
     # Secret check
     secret = request.headers.get("X-Trigger-Secret") or request.META.get(
@@ -59,11 +406,36 @@ def trigger_fetch(request, source, country):
     if not secret or secret != getattr(settings, "TRIGGER_SECRET", ""):
         return HttpResponseForbidden("Forbidden")
 
-    if source not in ("youtube", "forum", "trends"):
-        return JsonResponse({"error": "Unknown source"}, status=400)
+    if source not in SOURCES:
+        return _json_response({"error": "Unknown source"}, status=400)
 
-    try:
-        call_command(f"fetch_{source}", country)
-        return JsonResponse({"ok": True, "source": source, "country": country})
-    except Exception as exc:
-        return JsonResponse({"error": str(exc)}, status=500)
+    job, created = enqueue(source, country)
+    return _json_response(
+        {
+            "ok": True,
+            "job_id": job.pk,
+            "status": job.status,
+            "deduplicated": not created,
+            "source": source,
+            "country": country,
+            "status_url": f"/api/jobs/{job.pk}/",
+        },
+        status=202,
+    )
+
+
+@api_view(["GET"])
+def job_status(request, pk):
+    job = get_object_or_404(FetchJob, pk=pk)
+    return Response({
+        "id": job.pk,
+        "source": job.source,
+        "country": job.country,
+        "status": job.status,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        **job_timings(job),
+        "result": job.result,
+        "error": job.error,
+    })